@@ -1,139 +1,108 @@
-from dataclasses import dataclass
-from typing import List, Tuple
+import os
+from collections.abc import Sequence
 
-# Definição da "Struct"
-@dataclass
+import numpy as np
+
+from note_table import DEFAULT_OCTAVE, NOTAS, NOTE_MIDI
+
+# Notas escritas sem oitava ("D") ficam na oitava 4 (C4 = MIDI 60); com
+# oitava ("D5") valem como escritas. A4 = A4_REFERENCIA
+OITAVA_BASE = DEFAULT_OCTAVE
+A4_REFERENCIA = 440.0
+# Frequência de cada nota MIDI na afinação de referência (consulta por índice na carga)
+_FREQS_MIDI = (A4_REFERENCIA * 2 ** ((np.arange(128) - 69) / 12.0)).astype(np.float32)
+
+
+class NotasView(Sequence):
+    """
+    Visão somente leitura de uma Musica como a lista antiga de (nota,
+    duração): índice devolve uma tupla e fatia devolve uma lista de tuplas,
+    montadas sob demanda a partir dos arrays.
+    """
+    __slots__ = ("_musica",)
+
+    def __init__(self, musica):
+        self._musica = musica
+
+    def __len__(self):
+        return len(self._musica.midi)
+
+    def __getitem__(self, index):
+        musica = self._musica
+        if isinstance(index, slice):
+            midi = musica.midi[index].tolist()
+            duracoes = musica.duracoes[index].tolist()
+            return [(NOTAS[m % 12], d) for m, d in zip(midi, duracoes)]
+        return NOTAS[int(musica.midi[index]) % 12], float(musica.duracoes[index])
+
+    def __iter__(self):
+        return iter(self[:])
+
+    def __repr__(self):
+        return repr(self[:])
+
+
+# Definição da "Struct": arrays paralelos (nota MIDI, duração e frequência
+# pré-calculada) em vez de uma lista de tuplas por música
 class Musica:
-    nome: str
-    genero: str
-    # Uma lista de tuplas, onde cada tupla é (Nota, Duração em segundos)
-    notas: List[Tuple[str, float]] 
+    __slots__ = ("nome", "genero", "midi", "duracoes", "freqs")
+
+    def __init__(self, nome, genero, notas):
+        """notas: lista de (Nota, Duração em segundos); a nota pode ter oitava ("D5") ou não ("D")."""
+        midi = [NOTE_MIDI[nota] for nota, _ in notas]
+        duracoes = [duracao for _, duracao in notas]
+        self._set(nome, genero, np.array(midi, dtype=np.uint8), np.array(duracoes, dtype=np.float64))
+
+    @classmethod
+    def from_arrays(cls, nome, genero, midi, duracoes, freqs=None):
+        """
+        Monta a música direto dos arrays (carregadores em lote), sem passar por
+        tuplas. Arrays já no tipo certo (ex.: fatias do corpus mapeado) não são
+        copiados; freqs, se vier, também é usado como está.
+        """
+        musica = cls.__new__(cls)
+        musica._set(nome, genero, np.asarray(midi, dtype=np.uint8), np.asarray(duracoes, dtype=np.float64),
+                    None if freqs is None else np.asarray(freqs, dtype=np.float32))
+        return musica
+
+    def _set(self, nome, genero, midi, duracoes, freqs=None):
+        if len(midi) != len(duracoes) or (freqs is not None and len(freqs) != len(midi)):
+            raise ValueError(f"{nome}: {len(midi)} notas e {len(duracoes)} durações")
+        self.nome = nome
+        self.genero = genero
+        self.midi = midi
+        self.duracoes = duracoes
+        self.freqs = _FREQS_MIDI[midi] if freqs is None else freqs
+
+    @property
+    def notas(self):
+        """Lista de (Nota, Duração) compatível com o formato antigo."""
+        return NotasView(self)
+
+    def frequencias(self, a4=A4_REFERENCIA):
+        """Frequências das notas numa afinação; a de referência já vem pronta."""
+        if a4 == A4_REFERENCIA:
+            return self.freqs
+        return (self.freqs * (a4 / A4_REFERENCIA)).astype(np.float32)
+
+    def __repr__(self):
+        return f"Musica(nome={self.nome!r}, genero={self.genero!r}, notas={len(self.midi)})"
 
 # ==========================================
 # BANCO DE DADOS DE MÚSICAS
 # ==========================================
+# As músicas ficam em arquivos de dados em musicas/ (veja song_library.py).
+# BIBLIOTECA é aberta no primeiro uso: o corpus binário é mapeado em memória
+# e cada música sorteada é uma visão das colunas, sem cópia.
+
+DIRETORIO_MUSICAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "musicas")
+
 
-BIBLIOTECA = [
-    Musica(
-        nome="Brilha Brilha Estrelinha",
-        genero="Infantil",
-        notas=[
-            ("D", 0.5), ("D", 0.5), ("A", 0.5), ("A", 0.5), 
-            ("B", 0.5), ("B", 0.5), ("A", 1.0),
-            ("G", 0.5), ("G", 0.5), ("F#", 0.5), ("F#", 0.5), 
-            ("E", 0.5), ("E", 0.5), ("D", 1.0)
-        ]
-    ),
-
-    Musica(
-        nome="Parabéns pra Você",
-        genero="Festas",
-        notas=[
-            ("D", 0.3), ("D", 0.3), ("E", 0.8), ("D", 0.8), 
-            ("G", 0.8), ("F#", 1.5),("D", 0.3), ("D", 0.3), ("E", 0.8), ("D", 0.8), 
-            ("A", 0.8), ("G", 1.5)
-        ]
-    ),
-    Musica(
-        nome="Cinco Patinhos",
-        genero="Infantil",
-        notas=[
-            ("G",0.5), ("C",0.5), ("C",0.5),
-            ("C",0.5), ("B",0.5), ("A",0.5), ("G",1.0),
-            ("G",0.5), ("G",0.5), ("C",0.5), ("C",0.5),
-            ("F",0.5), ("F",0.5), ("E",0.5), ("E",0.5), ("D",1.0), ("D",1.0),
-            ("G",0.5), ("C",0.5), ("C",0.5), ("C",0.5), ("C",0.5),
-            ("C",0.5), ("B",0.5), ("A",0.5), ("G",1.0),
-            ("G",0.5), ("G",0.5), ("C",0.5), ("C",0.5),
-            ("F",0.5), ("F",0.5), ("F",0.5), ("E",0.5), ("D",0.5), ("C",1.2)
-        ]
-    ),
-
-    Musica(
-        nome="Marcha Soldado",
-        genero="Infantil",
-        notas=[
-            ("G",0.5), ("G",0.5), ("E",0.5), ("C",0.5), ("C",1.0),
-            ("E",0.5), ("G",0.5), ("G",0.5), ("G",0.5), ("E",0.5), ("D",1.0),
-            ("E",0.5), ("F",0.5), ("F",0.5), ("F",0.5), ("E",0.5), ("G",0.5), ("G",1.0),
-            ("A",0.5), ("G",0.5), ("F",0.5), ("E",0.5), ("D",0.5), ("C",1.2),
-            ("C",0.5), ("E",0.5), ("G",0.5), ("G",0.5), ("E",0.5), ("C",1.0),
-            ("C",0.5), ("E",0.5), ("G",0.5), ("G",0.5), ("G",0.5), ("E",0.5), ("D",1.0),
-            ("E",0.5), ("F",0.5), ("F",0.5), ("F",0.5), ("E",0.5), ("G",0.5), ("G",1.0),
-            ("A",0.5), ("G",0.5), ("F",0.5), ("E",0.5), ("D",0.5), ("C",1.2)
-        ]
-    ),
-
-    Musica(
-        nome="Borboletinha",
-        genero="Infantil",
-        notas=[
-            ("C",0.5), ("D",0.5), ("C",0.5), ("F",0.5), ("F",1.5),
-            ("C",0.5), ("D",0.5), ("C",0.5), ("E",0.5), ("E",1.5),
-            ("C",0.5), ("D",0.5), ("D",0.5), ("C",0.5), ("C",0.5), ("E",0.5), ("E",1.0),
-            ("C",0.5), ("D",1.0), ("E",1.0), ("F",0.5),
-            ("F",0.5)
-        ]
-    ),
-
-    Musica(
-        nome="Atirei o Pau no Gato",
-        genero="Infantil",
-        notas=[
-            ("G",0.4), ("F",0.4), ("E",0.4), ("D",0.4),
-            ("E",0.4), ("F",0.4), ("G",0.5), ("G",0.5), ("G",1.0),
-            ("A",0.5), ("G",0.5), ("F",0.5), ("F",0.5), ("F",1.0),
-            ("G",0.5), ("F",0.5), ("E",0.5), ("E",0.5), ("E",1.0),
-            ("C",0.5), ("C",0.5), ("A",0.5), ("A",0.5), ("A",1.0),
-            ("B",0.5), ("A",0.5), ("G",0.5), ("G",0.5), ("G",1.0),
-            ("E",0.4), ("F",0.4), ("G",0.6),
-            ("E",0.4), ("F",0.4), ("G",1.0),
-            ("F",0.5), ("E",0.5), ("D",0.5), ("C",1.2)
-        ]
-    ),
-    Musica(
-        nome="O Sapo Não Lava o Pé",
-        genero="Infantil",
-        notas=[
-            ("C",0.5), ("F",0.25), ("F",0.5),
-            ("C",0.5), ("D",0.5), ("C",0.5), ("A",1.0),
-            ("C",0.5), ("F",0.25), ("F",0.5),
-            ("C",0.25), ("D",0.5), ("C",0.5), ("A#",1.0),
-            ("C",0.25), ("C",0.25), ("E",0.25), ("E",0.5),
-            ("C",0.5), ("D",0.5), ("C",0.5), ("E",0.25), ("E",1.0),
-            ("C",0.25), ("D",0.5), ("C",0.5), ("E",0.5),
-            ("C",0.5), ("D",0.5), ("E",0.5), ("F",1.2)
-        ]
-    ),
-    Musica(
-        nome="Asa Branca",
-        genero="Baião",
-        notas=[
-            # Verso: "Quando olhei a terra ardendo..."
-            ("G", 0.25), ("G", 0.25), ("B", 0.5), ("D", 0.5), ("D", 0.5), ("B", 0.5), ("C", 1.0),
-            # "...Qual fogueira de São João"
-            ("D", 0.5), ("D", 0.5), ("B", 0.5), ("C", 1.0),
-            
-            # "Eu perguntei..."
-            ("G", 0.5), ("C", 0.5), ("C", 0.5), ("B", 0.5), ("A", 0.5), ("A", 1.0),
-            # "...a Deus do céu, ai"
-            ("A", 0.5), ("B", 0.5), ("D", 0.5), ("D", 0.5), ("C", 0.5), ("B", 1.0),
-            
-            # "Por que tamanha judiação"
-            ("A", 0.5), ("B", 0.5), ("A", 0.5), ("A", 0.5), ("G", 0.5), ("G", 1.2)
-        ]
-    ),
-    Musica(
-    nome="Não devo nada a ninguém",
-    genero="Brega",
-    notas=[
-        ("E", 0.25), ("E", 0.25), ("F#", 0.25), ("G", 0.25),
-        ("B", 0.5), ("B", 0.5), ("A", 2.5), ("A", 0.25),
-        ("B", 0.25), ("C", 0.25), ("A", 0.25), ("C", 0.5),
-        ("C", 0.5), ("E", 0.5), ("B", 0.5),
-        ("B", 0.25), ("E", 1.5), ("E", 0.25), ("E", 0.25),
-        ("D", 0.25), ("D", 0.25)
-    ]
-    )
-    
-]
+def __getattr__(name):
+    # Importação tardia: song_library importa Musica deste módulo
+    if name == "BIBLIOTECA":
+        from song_library import SongLibrary
+        global BIBLIOTECA
+        BIBLIOTECA = SongLibrary(DIRETORIO_MUSICAS)
+        return BIBLIOTECA
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,198 @@
+"""
+Fontes de áudio do detector de pitch.
+
+Toda fonte entrega blocos float32 mono de tamanho fixo através de
+blocks(block_size, keep_running). O microfone é naturalmente tempo real; as
+demais (arquivo WAV, array NumPy, sintetizador) rodam por padrão o mais
+rápido que a CPU permitir e podem ser cadenciadas com speed=1.0 para simular
+uma sessão ao vivo. Assim o mesmo PitchDetector roda sem placa de som.
+
+Fontes com vários canais (interface de áudio multicanal, WAV estéreo) também
+entregam blocos (block_size, canais) via multichannel_blocks(), usados pelo
+capture_engine para rodar um detector por canal.
+"""
+import time
+import wave
+
+import numpy as np
+
+from recorder import open_recording
+
+
+def synth_test_note(freq, duration, rate, rng, vibrato_cents=25.0, noise=0.01, volume=0.3):
+    """Nota no timbre do synth_piano_note, com vibrato e ruído branco somados."""
+    t = np.arange(int(rate * duration)) / rate
+    if freq <= 0:
+        return (rng.standard_normal(len(t)) * noise).astype(np.float32)
+    inst = freq * 2 ** (vibrato_cents / 1200.0 * np.sin(2 * np.pi * 5.5 * t + rng.uniform(0, 2 * np.pi)))
+    phase = 2 * np.pi * np.cumsum(inst) / rate
+    wave_ = np.sin(phase) + 0.4 * np.sin(2 * phase) + 0.1 * np.sin(3 * phase)
+    wave_ *= np.exp(-t)  # decaimento mais lento que o do piano: a voz sustenta
+    wave_ *= volume / np.max(np.abs(wave_))
+    wave_ += rng.standard_normal(len(t)) * noise
+    return wave_.astype(np.float32)
+
+
+class AudioSource:
+    """Interface das fontes: taxa de amostragem, canais + gerador de blocos."""
+    live = False
+    channels = 1
+
+    def __init__(self, rate, speed=0.0):
+        self.rate = rate
+        self.speed = speed  # 0 = o mais rápido possível, 1.0 = tempo real
+
+    def _chunks(self, block_size):
+        """Blocos crus da fonte, (n,) ou (n, canais); o último pode vir incompleto."""
+        raise NotImplementedError
+
+    def multichannel_blocks(self, block_size, keep_running=lambda: True):
+        """Blocos (block_size, canais); cada canal é uma view da coluna, sem cópia."""
+        period = block_size / self.rate / self.speed if self.speed > 0 else 0.0
+        next_t = time.perf_counter()
+        for chunk in self._chunks(block_size):
+            if not keep_running():
+                return
+            chunk = chunk.reshape(len(chunk), -1)
+            if len(chunk) < block_size:
+                chunk = np.concatenate((chunk, np.zeros((block_size - len(chunk), chunk.shape[1]), dtype=np.float32)))
+            yield chunk
+            if period:
+                next_t += period
+                time.sleep(max(0.0, next_t - time.perf_counter()))
+
+    def blocks(self, block_size, keep_running=lambda: True):
+        """Blocos mono de block_size amostras (fontes com vários canais são mixadas)."""
+        for block in self.multichannel_blocks(block_size, keep_running):
+            yield block[:, 0] if block.shape[1] == 1 else block.mean(axis=1, dtype=np.float32)
+
+
+class MicSource(AudioSource):
+    """Entrada de áudio padrão via PyAudio (interfaces multicanal com channels > 1)."""
+    live = True
+
+    def __init__(self, rate=44100, channels=1):
+        super().__init__(rate)
+        self.channels = channels
+
+    def multichannel_blocks(self, block_size, keep_running=lambda: True):
+        import pyaudio
+
+        p = pyaudio.PyAudio()
+        stream = None
+        try:
+            stream = p.open(format=pyaudio.paFloat32, channels=self.channels, rate=self.rate, input=True, frames_per_buffer=block_size)
+            while keep_running():
+                try:
+                    audio_data = stream.read(block_size, exception_on_overflow=False)
+                except Exception:
+                    continue
+                # PyAudio entrega os canais intercalados: o reshape só muda os strides
+                yield np.frombuffer(audio_data, dtype=np.float32).reshape(-1, self.channels)
+        finally:
+            if stream is not None:
+                stream.stop_stream()
+                stream.close()
+            p.terminate()
+
+
+class ArraySource(AudioSource):
+    """
+    Um array NumPy já em memória: (frames,) mono ou (frames, canais).
+
+    Com loop=True o array é repetido até o detector parar.
+    """
+
+    def __init__(self, samples, rate, speed=0.0, loop=False):
+        super().__init__(rate, speed)
+        self.samples = np.asarray(samples, dtype=np.float32)
+        self.channels = self.samples.shape[1] if self.samples.ndim == 2 else 1
+        self.loop = loop
+
+    def _chunks(self, block_size):
+        if not self.loop:
+            for start in range(0, len(self.samples), block_size):
+                yield self.samples[start:start + block_size]
+            return
+        # Em loop os blocos atravessam a emenda sem virar blocos parciais
+        index = np.arange(block_size)
+        start = 0
+        while True:
+            yield self.samples.take(index + start, axis=0, mode="wrap")
+            start = (start + block_size) % len(self.samples)
+
+
+class WavFileSource(AudioSource):
+    """
+    Arquivo WAV lido em streaming.
+
+    WAV float32 (como os gravados pelo recorder) é mapeado com memmap; PCM
+    de 8/16/24/32 bits é lido bloco a bloco pelo módulo wave.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.path = path
+        self._float = False
+        try:
+            with wave.open(path, "rb") as w:
+                rate, channels = w.getframerate(), w.getnchannels()
+        except wave.Error:
+            # O módulo wave não entende WAV float; o recorder entende
+            samples, rate = open_recording(path)
+            channels = samples.shape[1] if samples.ndim == 2 else 1
+            self._float = True
+        super().__init__(rate, speed)
+        self.channels = channels
+
+    def _chunks(self, block_size):
+        if self._float:
+            samples, _ = open_recording(self.path)
+            for start in range(0, len(samples), block_size):
+                yield np.asarray(samples[start:start + block_size], dtype=np.float32)
+            return
+        with wave.open(self.path, "rb") as w:
+            channels, width = w.getnchannels(), w.getsampwidth()
+            while True:
+                raw = w.readframes(block_size)
+                if not raw:
+                    return
+                yield _pcm_to_float(raw, width, channels)
+
+
+def _pcm_to_float(raw, width, channels):
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        x = ((b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)) << 8 >> 8).astype(np.float32) / 8388608.0
+    else:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    return x.reshape(-1, channels) if channels > 1 else x
+
+
+class SynthSource(AudioSource):
+    """
+    Voz sintética: lista de (freq em Hz, duração em s); freq 0 é silêncio.
+
+    Cada nota é gerada na hora em que é consumida, então sequências longas
+    não precisam caber na memória.
+    """
+
+    def __init__(self, notes, rate=44100, speed=0.0, seed=0, noise=0.01):
+        super().__init__(rate, speed)
+        self.notes = list(notes)
+        self.seed = seed
+        self.noise = noise
+
+    def _chunks(self, block_size):
+        rng = np.random.default_rng(self.seed)
+        pending = np.zeros(0, dtype=np.float32)
+        for freq, duration in self.notes:
+            pending = np.concatenate((pending, synth_test_note(freq, duration, self.rate, rng, noise=self.noise)))
+            while len(pending) >= block_size:
+                yield pending[:block_size]
+                pending = pending[block_size:]
+        if len(pending):
+            yield pending
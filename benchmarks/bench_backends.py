@@ -0,0 +1,76 @@
+"""
+Comparação dos estimadores de pitch: latência, CPU por frame e precisão.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_backends [--decimation 4]
+
+Cada configuração roda o mesmo corpus sintético (benchmarks/corpus.py) pelo
+PitchDetector, sem porteiro de voz. "janela" é a latência algorítmica (quanto
+áudio o estimador precisa ver); "p95" é o tempo de parede por chamada.
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from pitch_backends import aubio_available
+from pitch_detector import PitchDetector
+from benchmarks.corpus import note_corpus, note_name
+
+WARMUP_BLOCKS = 3
+
+CONFIGS = [
+    ("aubio default", "aubio", {"method": "default"}),
+    ("aubio yin", "aubio", {"method": "yin"}),
+    ("aubio yinfast", "aubio", {"method": "yinfast"}),
+    ("aubio mcomb", "aubio", {"method": "mcomb"}),
+    ("numpy yin", "yin", {}),
+]
+
+
+def evaluate(detector, corpus):
+    hits = total = 0
+    cents, wall, cpu = [], [], []
+    for midi, blocks in corpus:
+        detector._reset_analysis()
+        target = 440.0 * 2 ** ((midi - 69) / 12)
+        for i, block in enumerate(blocks):
+            w0, c0 = time.perf_counter(), time.process_time()
+            freq = detector._analyze(block)[0]
+            wall.append(time.perf_counter() - w0)
+            cpu.append(time.process_time() - c0)
+            if i < WARMUP_BLOCKS:
+                continue
+            total += 1
+            hits += detector._freq_para_nota(freq) == note_name(midi)
+            if freq > 0:
+                cents.append(abs(1200 * math.log2(freq / target)))
+    return {
+        "accuracy": hits / total,
+        "cents": float(np.median(cents)) if cents else float("nan"),
+        "p95_ms": float(np.percentile(wall, 95)) * 1000,
+        "cpu_us": float(np.mean(cpu)) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decimation", type=int, default=4)
+    args = parser.parse_args()
+
+    corpus = note_corpus()
+    print(f"{'backend':<15} {'janela':>8} {'p95':>8} {'CPU/frame':>10} {'acerto':>8} {'erro':>8}")
+    for label, backend, options in CONFIGS:
+        if backend == "aubio" and not aubio_available():
+            print(f"{label:<15} (aubio não instalado)")
+            continue
+        detector = PitchDetector(use_vad=False, decimation=args.decimation, backend=backend, backend_options=options)
+        window_ms = detector.window_factor * detector.BUFFER_SIZE / detector.RATE * 1000
+        r = evaluate(detector, corpus)
+        print(f"{label:<15} {window_ms:6.0f}ms {r['p95_ms']:6.2f}ms {r['cpu_us']:8.0f}us "
+              f"{r['accuracy'] * 100:7.1f}% {r['cents']:6.1f}ct")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Precisão e CPU do detector com e sem a decimação antes do aubio.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_decimation [--factors 1 2 4]
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+
+from pitch_detector import PitchDetector
+from benchmarks.corpus import note_corpus, note_name
+
+WARMUP_BLOCKS = 3  # blocos até a janela do aubio estar só com a nota nova
+
+
+def evaluate(decimation, corpus):
+    detector = PitchDetector(use_vad=False, decimation=decimation)
+    hits = total = 0
+    cents = []
+    cpu = 0.0
+    blocks_run = 0
+    for midi, blocks in corpus:
+        detector._reset_analysis()
+        for i, block in enumerate(blocks):
+            start = time.process_time()
+            freq = detector._analyze(block)[0]
+            cpu += time.process_time() - start
+            blocks_run += 1
+            if i < WARMUP_BLOCKS:
+                continue
+            total += 1
+            if detector._freq_para_nota(freq) == note_name(midi):
+                hits += 1
+            if freq > 0:
+                cents.append(abs(1200 * math.log2(freq / (440.0 * 2 ** ((midi - 69) / 12)))))
+    return hits / total, float(np.median(cents)) if cents else float("nan"), cpu / blocks_run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    corpus = note_corpus()
+    print(f"{'fator':>5} {'taxa':>7} {'acerto':>8} {'erro mediano':>13} {'CPU/bloco':>11}")
+    for factor in args.factors:
+        accuracy, cents, cpu = evaluate(factor, corpus)
+        print(f"{factor:>5} {44100 // factor:>7} {accuracy * 100:7.1f}% {cents:10.1f} ct {cpu * 1e6:8.0f} us")
+
+
+if __name__ == "__main__":
+    main()
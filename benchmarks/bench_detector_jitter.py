@@ -0,0 +1,87 @@
+"""
+Jitter do loop de render com o detector na mesma thread/processo vs. num
+processo filho.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_detector_jitter [--seconds 5] [--fps 60] [--speed 0]
+
+--speed 1 alimenta o detector em tempo real; 0 alimenta o mais rápido possível
+(pior caso de disputa pelo GIL).
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from audio_sources import ArraySource
+from pitch_detector import PitchDetector
+
+
+def synthetic_detector(speed, **kwargs):
+    """Detector alimentado por uma voz sintética (220 Hz em loop) em vez do microfone."""
+    rate = 44100
+    t = np.arange(rate) / rate
+    voice = (0.3 * np.sin(2 * np.pi * 220.0 * t)).astype(np.float32)
+    return PitchDetector(source=ArraySource(voice, rate, speed=speed, loop=True), **kwargs)
+
+
+def render_frame(surf):
+    # Mesma ordem de grandeza do fundo em gradiente desenhado a cada frame
+    w, h = surf.get_size()
+    for y in range(h):
+        c = int(60 * (1 - y / h))
+        pygame.draw.line(surf, (c, 20, 80), (0, y), (w, y))
+
+
+def measure(detector, seconds, fps):
+    surf = pygame.Surface((1000, 700))
+    budget = 1.0 / fps
+    if detector is not None:
+        detector.start()
+        time.sleep(0.5)  # deixa o processo filho subir antes de medir
+    intervals = []
+    last = time.perf_counter()
+    end = last + seconds
+    while last < end:
+        render_frame(surf)
+        if detector is not None:
+            detector.get_freq()
+        elapsed = time.perf_counter() - last
+        if elapsed < budget:
+            time.sleep(budget - elapsed)
+        now = time.perf_counter()
+        intervals.append(now - last)
+        last = now
+    if detector is not None:
+        detector.close()
+    return intervals
+
+
+def report(label, intervals):
+    ms = sorted(i * 1000 for i in intervals)
+    p99 = ms[int(len(ms) * 0.99) - 1]
+    print(f"{label:<22} frames={len(ms):5d}  média={statistics.mean(ms):6.2f} ms  "
+          f"desvio={statistics.pstdev(ms):5.2f} ms  p99={p99:6.2f} ms  max={ms[-1]:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--fps", type=int, default=60)
+    parser.add_argument("--speed", type=float, default=0.0)
+    args = parser.parse_args()
+
+    pygame.init()
+    report("sem detector", measure(None, args.seconds, args.fps))
+    report("detector em thread", measure(synthetic_detector(args.speed), args.seconds, args.fps))
+    report("detector em processo", measure(synthetic_detector(args.speed, use_process=True), args.seconds, args.fps))
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
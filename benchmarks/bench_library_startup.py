@@ -0,0 +1,127 @@
+"""
+Tempo de abertura da biblioteca conforme o catálogo cresce: SongLibrary
+(corpus binário mapeado com numpy.memmap; cada música é uma visão das
+colunas) vs. ler e converter todas as músicas dos arquivos de dados na
+inicialização.
+
+Para cada tamanho gera um diretório temporário com as músicas em JSON Lines
+(mais um CSV com parte delas), compila o corpus uma vez e mede:
+  - a abertura com o corpus já em disco (o caso de toda inicialização);
+  - o primeiro acesso a uma música (fatias das colunas mapeadas);
+  - uma varredura das notas de todas as músicas pelo corpus;
+  - a carga completa dos arquivos de dados (referência).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_library_startup [--songs 9 1000 10000 50000]
+"""
+import argparse
+import csv
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from Musicas import Musica
+from note_table import NOTAS
+from song_library import SongLibrary, build_corpus
+
+
+def write_catalog(directory, n_songs, rng, csv_share=0.1):
+    """Grava n_songs músicas aleatórias: a maioria em .jsonl, uma parte em .csv."""
+    n_csv = int(n_songs * csv_share)
+    durations = [0.25, 0.3, 0.5, 0.8, 1.0]
+    songs = []
+    for k in range(n_songs):
+        n = max(4, int(rng.poisson(40)))
+        notas = [[NOTAS[p], durations[d]] for p, d in zip(rng.integers(12, size=n), rng.integers(5, size=n))]
+        songs.append({"nome": f"Música {k}", "genero": "Teste", "notas": notas})
+    with open(os.path.join(directory, "catalogo.jsonl"), "w", encoding="utf-8") as f:
+        for song in songs[n_csv:]:
+            f.write(json.dumps(song, ensure_ascii=False) + "\n")
+    if n_csv:
+        with open(os.path.join(directory, "extra.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["nome", "genero", "nota", "duracao"])
+            for song in songs[:n_csv]:
+                writer.writerows([song["nome"], song["genero"], nota, d] for nota, d in song["notas"])
+    return songs
+
+
+def load_everything(directory):
+    """Referência: parse de todos os arquivos e uma Musica por música."""
+    library = []
+    with open(os.path.join(directory, "catalogo.jsonl"), encoding="utf-8") as f:
+        for line in f:
+            song = json.loads(line)
+            library.append(Musica(song["nome"], song["genero"], song["notas"]))
+    path = os.path.join(directory, "extra.csv")
+    if os.path.exists(path):
+        rows = {}
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            for nome, genero, nota, d in reader:
+                rows.setdefault((nome, genero), []).append((nota, float(d)))
+        library += [Musica(nome, genero, notas) for (nome, genero), notas in rows.items()]
+    return library
+
+
+def timed(fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def check_without_genres():
+    """Catálogo em que nenhuma música diz o gênero: todas ficam no gênero ""."""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "sem_genero.jsonl"), "w", encoding="utf-8") as f:
+            for k in range(2):
+                f.write(json.dumps({"nome": f"Música {k}", "notas": [["C", 0.5], ["D", 0.5]]}) + "\n")
+        for library in (SongLibrary(directory), SongLibrary(directory)):  # compilado e já em disco
+            assert library.generos == [""]
+            assert [library[k].genero for k in range(2)] == ["", ""]
+            del library
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, nargs="+", default=[9, 1000, 10000, 50000])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    check_without_genres()
+    rng = np.random.default_rng(args.seed)
+    print(f"{'músicas':>8} {'compilar':>10} {'abrir':>9} {'1º acesso':>10} {'acesso':>9} {'varredura':>10} "
+          f"{'carga completa':>15}")
+    for n in args.songs:
+        with tempfile.TemporaryDirectory() as directory:
+            songs = write_catalog(directory, n, rng)
+            build_s, _ = timed(lambda: build_corpus(directory), repeat=1)
+            open_s, library = timed(lambda: SongLibrary(directory))
+            assert len(library) == n
+
+            k = int(rng.integers(n))
+            start = time.perf_counter()
+            musica = library[k]
+            first_s = time.perf_counter() - start
+            assert [list(t) for t in musica.notas] == next(s["notas"] for s in songs if s["nome"] == musica.nome)
+            access_s, _ = timed(lambda: library[k], repeat=100)
+            # Histograma de classes de nota do catálogo inteiro, direto da coluna mapeada
+            scan_s, histogram = timed(lambda: np.bincount(library.midi % 12, minlength=12))
+            assert histogram.sum() == sum(len(s["notas"]) for s in songs)
+
+            full_s, _ = timed(lambda: load_everything(directory), repeat=1 if n > 10000 else 3)
+            del library, musica  # solta os mapeamentos antes de apagar o diretório
+        print(f"{n:>8} {build_s * 1000:8.0f}ms {open_s * 1000:7.1f}ms {first_s * 1e6:8.0f}us "
+              f"{access_s * 1e6:7.1f}us {scan_s * 1000:8.1f}ms {full_s * 1000:13.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Latência e acerto da busca por melodia (melody_search.py) em catálogos grandes.
+
+Gera músicas aleatórias com melodias plausíveis (passos pequenos, alguns
+saltos, notas repetidas), compila o corpus com SongLibrary e monta o índice
+de trigramas. Cada consulta é um trecho de uma música sorteada, transposto
+para outro tom e com erros de quem canta: uma nota desafinada meio tom e,
+às vezes, uma nota esquecida. Mede a latência (mediana, p95, máximo) e em
+quantas consultas a música certa vem em 1º lugar e entre as 10 primeiras.
+Num catálogo aleatório grande muitos trechos curtos se repetem em várias
+músicas, então o acerto cai com consultas curtas (--length).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_melody_search [--songs 1000 10000 100000] [--queries 200]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from melody_search import MelodyIndex
+from note_table import NOTAS
+from song_library import SongLibrary
+
+BUDGET_MS = 50.0
+
+
+def random_melodies(n_songs, rng):
+    """Notas MIDI de cada música: passeio com passos de -2..+2 e saltos ocasionais."""
+    steps = np.array([-2, -1, 0, 1, 2, -5, 5, -7, 7, 4, -3])
+    weights = np.array([0.18, 0.16, 0.14, 0.16, 0.18, 0.03, 0.03, 0.02, 0.02, 0.04, 0.04])
+    melodies = []
+    for n in np.maximum(8, rng.poisson(40, n_songs)):
+        walk = 60 + np.cumsum(rng.choice(steps, size=n, p=weights / weights.sum()))
+        melodies.append(walk % 12 + 60)
+    return melodies
+
+
+def write_catalog(directory, melodies):
+    with open(os.path.join(directory, "catalogo.jsonl"), "w", encoding="utf-8") as f:
+        for k, midi in enumerate(melodies):
+            notas = [[NOTAS[m % 12], 0.5] for m in midi.tolist()]
+            f.write(json.dumps({"nome": f"Música {k}", "genero": "Teste", "notas": notas}) + "\n")
+
+
+def make_query(midi, rng, length):
+    """Trecho transposto com uma nota meio tom fora e, em metade das vezes, uma nota a menos."""
+    start = int(rng.integers(0, max(1, len(midi) - length)))
+    query = (midi[start:start + length] + int(rng.integers(1, 12))).tolist()
+    k = int(rng.integers(1, len(query)))
+    query[k] += int(rng.choice([-1, 1]))
+    if rng.random() < 0.5:
+        del query[int(rng.integers(1, len(query)))]
+    return query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--length", type=int, default=16, help="notas por consulta")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'músicas':>8} {'índice':>9} {'mediana':>9} {'p95':>8} {'máximo':>8} {'top-1':>6} {'top-10':>7}")
+    for n in args.songs:
+        melodies = random_melodies(n, rng)
+        with tempfile.TemporaryDirectory() as directory:
+            write_catalog(directory, melodies)
+            library = SongLibrary(directory)
+            start = time.perf_counter()
+            index = MelodyIndex(library)
+            build_s = time.perf_counter() - start
+
+            times, top1, top10 = [], 0, 0
+            for _ in range(args.queries):
+                target = int(rng.integers(n))
+                query = make_query(melodies[target], rng, args.length)
+                start = time.perf_counter()
+                matches = index.search(query)
+                times.append(time.perf_counter() - start)
+                found = [m.index for m in matches]
+                top1 += bool(found) and found[0] == target
+                top10 += target in found
+            del library, index
+        ms = np.array(times) * 1000
+        p95 = np.percentile(ms, 95)
+        flag = "" if p95 < BUDGET_MS else f"  <- acima de {BUDGET_MS:.0f} ms"
+        print(f"{n:>8} {build_s * 1000:7.0f}ms {np.median(ms):7.1f}ms {p95:6.1f}ms {ms.max():6.1f}ms "
+              f"{top1 / args.queries:6.0%} {top10 / args.queries:7.0%}{flag}")
+
+
+if __name__ == "__main__":
+    main()
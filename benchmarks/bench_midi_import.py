@@ -0,0 +1,158 @@
+"""
+Vazão e fidelidade do importador MIDI (midi_import.py).
+
+Gera arquivos SMF sintéticos parecidos com os de uma coleção real: tipo 1
+(andamentos na trilha 0, melodia, acordes de acompanhamento, baixo e
+bateria no canal 10) e tipo 0 (tudo numa trilha, canais misturados), com
+mudanças de andamento no meio e running status. Confere se a melodia
+extraída bate com a gerada (nomes e durações em segundos) e mede arquivos
+por segundo em série e no pool de processos de import_directory.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_midi_import [--files 200] [--notes 300] [--workers 4]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from midi_import import import_directory, melody_notes
+from note_table import NOTE_NAMES
+
+DIVISION = 480
+
+
+def _varlen(value):
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def _track(events):
+    """Chunk MTrk de [(tick, bytes do evento)]; status repetido vira running status."""
+    data = bytearray()
+    last_tick, last_status = 0, None
+    for tick, event in sorted(events, key=lambda e: (e[0], e[1][0] & 0xF0 != 0x80)):
+        data += _varlen(tick - last_tick)
+        last_tick = tick
+        if event[0] < 0xF0 and event[0] == last_status:
+            data += event[1:]
+        else:
+            data += event
+            last_status = event[0] if event[0] < 0xF0 else None
+    data += b"\x00\xff\x2f\x00"
+    return b"MTrk" + len(data).to_bytes(4, "big") + bytes(data)
+
+
+def _notes(channel, notes):
+    events = []
+    for on, off, pitch in notes:
+        events.append((on, bytes([0x90 | channel, pitch, 90])))
+        # Metade dos note-off como note-on com velocidade 0, como muitos sequenciadores
+        events.append((off, bytes([0x80 | channel, pitch, 0]) if pitch % 2 else bytes([0x90 | channel, pitch, 0])))
+    return events
+
+
+def random_song(n_notes, rng):
+    """(bytes do arquivo tipo 1, bytes do tipo 0, melodia esperada [(nome, segundos)])."""
+    lengths = rng.choice([240, 480, 720, 960], size=n_notes)
+    onsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    pitches = rng.integers(60, 84, size=n_notes)
+    # Algumas notas soltas antes do próximo ataque (pausa) e uma sysex no começo
+    offs = onsets + np.where(rng.random(n_notes) < 0.2, lengths // 2, lengths)
+    melody = list(zip(onsets.tolist(), offs.tolist(), pitches.tolist()))
+    end = int(onsets[-1] + lengths[-1])
+    chords = [(t, t + 960, p) for t in range(0, end, 960) for p in (48, 52, 55)]
+    bass = [(t, t + 480, 36 + (t // 480) % 5) for t in range(0, end, 480)]
+    drums = [(t, t + 60, 42) for t in range(0, end, 240)]
+
+    tempo_ticks = [0, end // 3, 2 * end // 3]
+    tempos = [500000, 400000, 600000]
+    meta = [(t, b"\xff\x51\x03" + u.to_bytes(3, "big")) for t, u in zip(tempo_ticks, tempos)]
+    meta += [(0, b"\xff\x03\x05Teste"), (0, b"\xf0\x05\x7e\x7f\x09\x01\xf7")]
+
+    tracks = [meta, _notes(0, melody), _notes(1, chords), _notes(2, bass), _notes(9, drums)]
+    type1 = b"MThd" + (6).to_bytes(4, "big") + (1).to_bytes(2, "big") + len(tracks).to_bytes(2, "big") \
+        + DIVISION.to_bytes(2, "big") + b"".join(_track(t) for t in tracks)
+    type0 = b"MThd" + (6).to_bytes(4, "big") + (0).to_bytes(2, "big") + (1).to_bytes(2, "big") \
+        + DIVISION.to_bytes(2, "big") + _track([e for t in tracks for e in t])
+
+    def seconds(tick):
+        total, prev_t, prev_u = 0.0, 0, tempos[0]
+        for t, u in zip(tempo_ticks[1:], tempos[1:]):
+            if tick <= t:
+                break
+            total += (t - prev_t) * prev_u / 1e6 / DIVISION
+            prev_t, prev_u = t, u
+        return total + (tick - prev_t) * prev_u / 1e6 / DIVISION
+
+    starts = [seconds(t) for t in onsets.tolist()] + [seconds(int(offs[-1]))]
+    expected = [(NOTE_NAMES[p], round(b - a, 3)) for p, a, b in zip(pitches.tolist(), starts, starts[1:])]
+    return type1, type0, expected
+
+
+def check(expected, got):
+    assert [n for n, _ in got] == [n for n, _ in expected]
+    assert max(abs(a - b) for (_, a), (_, b) in zip(got, expected)) <= 0.002
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200, help="arquivos por tipo (tipo 0 e tipo 1)")
+    parser.add_argument("--notes", type=int, default=300, help="notas da melodia por arquivo")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        root = os.path.join(directory, "midi")
+        os.makedirs(os.path.join(root, "tipo0"))
+        os.makedirs(os.path.join(root, "tipo1"))
+        expected, paths, size = {}, [], 0
+        for k in range(args.files):
+            type1, type0, melody = random_song(args.notes, rng)
+            for kind, data in (("tipo1", type1), ("tipo0", type0)):
+                path = os.path.join(root, kind, f"{kind}_{k}.mid")
+                with open(path, "wb") as f:
+                    f.write(data)
+                expected[os.path.relpath(path, root)] = melody
+                paths.append(path)
+                size += len(data)
+
+        start = time.perf_counter()
+        for path in paths:
+            check(expected[os.path.relpath(path, root)], melody_notes(path))
+        serial = time.perf_counter() - start
+
+        # Um arquivo quebrado: vira uma falha registrada, não derruba a importação
+        with open(os.path.join(root, "quebrado.mid"), "wb") as f:
+            f.write(b"MThd nada disso")
+
+        out = os.path.join(directory, "midi.jsonl")
+        start = time.perf_counter()
+        imported, failed = import_directory(root, out, args.workers)
+        pooled = time.perf_counter() - start
+        assert (imported, failed) == (len(paths), 1)
+        with open(out, encoding="utf-8") as f:
+            for line in f:
+                song = json.loads(line)
+                check(expected[song["origem"]], [tuple(n) for n in song["notas"]])
+        # Retomada: nada a fazer na segunda passada (nem com o arquivo quebrado),
+        # a não ser que as falhas sejam tentadas de novo
+        assert import_directory(root, out, args.workers) == (0, 0)
+        assert import_directory(root, out, args.workers, retry_failed=True) == (0, 1)
+
+    print(f"{len(paths)} arquivos, {size / 2**20:.1f} MB, {args.notes} notas de melodia cada: melodias conferidas")
+    print(f"série:             {len(paths) / serial:7.0f} arquivos/s ({size / serial / 2**20:.1f} MB/s)")
+    print(f"pool ({args.workers} processos): {len(paths) / pooled:7.0f} arquivos/s (inclui subir os processos)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Escalonamento do CaptureEngine com o número de canais (alunos cantando juntos).
+
+Cada canal recebe uma voz sintética diferente; a fonte roda o mais rápido
+possível e mede-se o tempo de CPU gasto por canal por segundo de áudio e o
+fator de tempo real do conjunto, com workers em threads e em processos (no
+modo processo a CPU inclui subir os workers, custo fixo que se dilui com mais
+canais ou --seconds maior).
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_multichannel [--channels 1 2 4 8] [--seconds 20]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from audio_sources import ArraySource, synth_test_note
+from capture_engine import CaptureEngine
+from note_table import get_note_table
+
+RATE = 44100
+
+
+def multichannel_voices(channels, seconds, seed=0, note=1.5):
+    """Cada canal repete a sua nota (ataque a cada note segundos), como um aluno treinando."""
+    rng = np.random.default_rng(seed)
+    table = get_note_table()
+    midis = rng.integers(48, 72, channels)
+    repeats = int(np.ceil(seconds / note))
+    voices = [np.concatenate([synth_test_note(table.freqs[m], note, RATE, rng) for _ in range(repeats)])
+              for m in midis]
+    return np.stack(voices, axis=1)[:int(seconds * RATE)], midis
+
+
+def channel_note(detector):
+    """Classe da nota mais frequente no histórico do canal."""
+    frames = detector.ring.snapshot()
+    info = detector.note_table.lookup_array(frames["freq"][frames["voiced"] > 0])
+    pcs = info["pitch_class"][info["midi"] >= 0]
+    return int(np.bincount(pcs, minlength=12).argmax()) if len(pcs) else None
+
+
+def run(channels, seconds, use_process, workers=None):
+    audio, midis = multichannel_voices(channels, seconds)
+    engine = CaptureEngine(ArraySource(audio, RATE), workers=workers, use_process=use_process, decimation=4,
+                           ring_capacity=1024)
+    cpu0 = os.times()
+    wall0 = time.perf_counter()
+    engine.start()
+    engine.wait()
+    wall = time.perf_counter() - wall0
+    hits = sum(channel_note(d) == m % 12 for d, m in zip(engine.detectors, midis))
+    engine.stop()
+    cpu1 = os.times()
+    cpu = sum(cpu1[i] - cpu0[i] for i in range(4))  # user + sys, próprio + filhos
+    return {"cpu_per_channel": cpu / channels / seconds, "realtime": seconds / wall,
+            "workers": engine.workers, "hits": hits}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    print(f"{'modo':<9} {'canais':>6} {'workers':>7} {'CPU/canal':>10} {'x tempo real':>13} {'notas ok':>9}")
+    for use_process in (False, True):
+        for channels in args.channels:
+            r = run(channels, args.seconds, use_process, args.workers)
+            print(f"{'processo' if use_process else 'thread':<9} {channels:>6} {r['workers']:>7} "
+                  f"{r['cpu_per_channel'] * 100:8.2f}% {r['realtime']:12.0f}x {r['hits']:>5}/{channels}")
+
+
+if __name__ == "__main__":
+    main()
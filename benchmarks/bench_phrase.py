@@ -0,0 +1,131 @@
+"""
+Segmentação + alinhamento DTW do modo frase em performances sintéticas longas.
+
+Gera melodias aleatórias com andamento diferente do esperado, vibrato, erros
+de oitava do estimador e algumas notas erradas; mede o tempo de segmentar e
+alinhar, compara o DTW por antidiagonais com o laço duplo em Python e confere
+quantas notas foram julgadas corretamente. --audio roda a primeira performance
+pelo detector de verdade (SynthSource) em vez da trilha de pitch sintética.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_phrase [--notes 50 200 800] [--audio]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from audio_sources import SynthSource
+from note_table import NOTAS, get_note_table
+from phrase import STEP_PENALTY, dtw_align, pitch_cost, score_phrase, segment_track
+from pitch_detector import PitchDetector
+
+HOP = 1024
+RATE = 44100
+
+
+def random_performance(n_notes, rng, wrong=0.05, tempo=1.15):
+    """Retorna (notas da música, [(freq, duração)] cantadas, acertos esperados por nota)."""
+    table = get_note_table()
+    notes, sung, truth = [], [], []
+    for _ in range(n_notes):
+        name = NOTAS[rng.integers(12)]
+        duration = float(rng.choice([0.3, 0.5, 0.5, 0.8, 1.0]))
+        ok = rng.random() >= wrong
+        pc = NOTAS.index(name) if ok else (NOTAS.index(name) + rng.choice([-2, 2])) % 12
+        freq = table.freq(NOTAS[pc], 4 if pc < 5 else 3)
+        notes.append((name, duration))
+        sung += [(freq, duration * tempo * 0.9), (0.0, duration * tempo * 0.1)]
+        truth.append(ok)
+    return notes, sung, np.array(truth)
+
+
+def synthetic_track(sung, rng, octave_errors=0.02):
+    """Trilha de pitch frame a frame, sem rodar o detector."""
+    period = HOP / RATE
+    freqs = []
+    for freq, duration in sung:
+        n = max(1, int(round(duration / period)))
+        if freq <= 0:
+            freqs.append(np.zeros(n))
+            continue
+        t = np.arange(n) * period
+        track = freq * 2 ** (25 / 1200 * np.sin(2 * np.pi * 5.5 * t) + rng.normal(0, 8 / 1200, n))
+        track[rng.random(n) < octave_errors] /= 2
+        freqs.append(track)
+    freqs = np.concatenate(freqs)
+    return np.arange(len(freqs)) * period, freqs
+
+
+def detector_track(sung):
+    detector = PitchDetector(source=SynthSource(sung), buffer_size=HOP, decimation=4)
+    frames = list(detector.iter_frames())
+    return np.array([f[0] for f in frames]), np.array([f[1] for f in frames])
+
+
+def dtw_reference(cost, step_penalty=STEP_PENALTY):
+    """Mesma recorrência com laço duplo em Python (referência)."""
+    n, m = cost.shape
+    acc = [[float("inf")] * (m + 1) for _ in range(n + 1)]
+    acc[0][0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            acc[i][j] = cost[i - 1, j - 1] + min(acc[i - 1][j - 1],
+                                                 min(acc[i - 1][j], acc[i][j - 1]) + step_penalty)
+    return acc[n][m]
+
+
+def run(n_notes, rng, audio=False):
+    notes, sung, truth = random_performance(n_notes, rng)
+    times, freqs = detector_track(sung) if audio else synthetic_track(sung, rng)
+    table = get_note_table()
+
+    start = time.perf_counter()
+    segments = segment_track(times, freqs, table)
+    seg_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    scores = score_phrase(segments, notes)
+    score_ms = (time.perf_counter() - start) * 1000
+
+    cost = pitch_cost([s.pitch_class for s in segments], [NOTAS.index(n) for n, _ in notes])
+    start = time.perf_counter()
+    fast, _ = dtw_align(cost)
+    dtw_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    slow = dtw_reference(cost)
+    ref_ms = (time.perf_counter() - start) * 1000
+    assert abs(fast - slow) < 1e-9
+
+    passed = np.array([s.passed for s in scores])
+    timing = [abs(s.timing_error) for s in scores if s.timing_error is not None]
+    return {
+        "segments": len(segments),
+        "seconds": times[-1] if len(times) else 0.0,
+        "seg_ms": seg_ms,
+        "score_ms": score_ms,
+        "dtw_ms": dtw_ms,
+        "ref_ms": ref_ms,
+        "agreement": float(np.mean(passed == truth)),
+        "timing_ms": float(np.median(timing)) * 1000 if timing else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--audio", action="store_true", help="passa a primeira performance pelo detector")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'notas':>6} {'áudio':>7} {'trechos':>8} {'segmentar':>10} {'pontuar':>9} "
+          f"{'DTW':>8} {'DTW laço':>9} {'acordo':>7} {'|atraso|':>9}")
+    for k, n in enumerate(args.notes):
+        r = run(n, rng, audio=args.audio and k == 0)
+        print(f"{n:>6} {r['seconds']:6.0f}s {r['segments']:>8} {r['seg_ms']:8.1f}ms {r['score_ms']:7.1f}ms "
+              f"{r['dtw_ms']:6.1f}ms {r['ref_ms']:7.1f}ms {r['agreement'] * 100:6.1f}% {r['timing_ms']:7.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Custo por frame do gráfico rolante de pitch: PitchTrace (rola a Surface e
+pinta só os frames novos) vs. redesenhar todo o histórico visível a cada frame.
+
+Simula a tela a 60 FPS com o detector publicando um frame a cada hop.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_pitch_trace [--frames 3000] [--hop 1024]
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from pitch_detector import PitchRing
+from pitch_trace import PitchTrace
+
+FPS = 60
+SIZE = (190, 180)
+
+
+def naive_draw(surf, ring, trace, now):
+    """Referência: recalcula e desenha todos os pontos visíveis a cada frame."""
+    surf.fill(trace.background)
+    frames = ring.snapshot()
+    frames = frames[frames["timestamp"] > now - trace.seconds]
+    rows = trace._rows(np.where(frames["voiced"] > 0, frames["freq"], 0.0))
+    xs = trace.width - 1 - (now - frames["timestamp"]) * trace.px_per_second
+    points = [(x, y) for x, y in zip(xs, rows) if y >= 0]
+    if len(points) > 1:
+        pygame.draw.lines(surf, trace.color, False, points, 3)
+
+
+def run(frames, hop, naive):
+    screen = pygame.display.set_mode((400, 300))
+    ring = PitchRing(2048, shared=False)
+    trace = PitchTrace(SIZE)
+    target = pygame.Surface(SIZE)
+    period = hop / 44100
+    now = 0.0
+    next_frame = 0.0
+    times = []
+    for i in range(frames):
+        now += 1.0 / FPS
+        while next_frame <= now:
+            ring.publish(next_frame, 220.0 * 2 ** (np.sin(next_frame * 2) / 6), 0.9, True)
+            next_frame += period
+        start = time.perf_counter()
+        if naive:
+            naive_draw(target, ring, trace, now)
+            screen.blit(target, (10, 10))
+        else:
+            trace.update(ring, now)
+            trace.draw(screen, (10, 10), 9)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(label, times):
+    times = sorted(times)
+    p99 = times[int(len(times) * 0.99)]
+    print(f"{label:<22} média={statistics.mean(times) * 1e6:7.0f} us  p99={p99 * 1e6:7.0f} us  "
+          f"({statistics.mean(times) * FPS * 100:.2f}% do orçamento de 60 FPS)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--hop", type=int, default=1024, help="amostras por frame do detector")
+    args = parser.parse_args()
+
+    pygame.init()
+    report("redesenho completo", run(args.frames, args.hop, naive=True))
+    report("PitchTrace", run(args.frames, args.hop, naive=False))
+
+
+if __name__ == "__main__":
+    main()
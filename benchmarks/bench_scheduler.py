@@ -0,0 +1,93 @@
+"""
+Custo e distribuição do sorteio de músicas (song_scheduler.SongScheduler).
+
+Compila bibliotecas sintéticas (gêneros de tamanhos bem diferentes, músicas
+de 2 a 60 notas, parte delas com histórico de acertos/erros) e mede o tempo
+de montar o sorteador e de cada next(). Confere que nenhuma música se repete
+dentro da janela e compara a frequência sorteada por gênero com a esperada
+pelos pesos. Para referência, mede também o sorteio antigo: random.choice
+repetido até cair numa música fora da janela.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_scheduler [--songs 1000 10000 100000] [--draws 20000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from song_library import SongLibrary
+from song_scheduler import WINDOW, SongScheduler
+
+GENRES = {"Infantil": 0.02, "Folclore": 0.08, "Forró": 0.2, "MIDI": 0.7}
+
+
+def make_library(n, rng, directory):
+    names = list(GENRES)
+    genres = rng.choice(len(names), size=n, p=list(GENRES.values()))
+    with open(os.path.join(directory, "musicas.jsonl"), "w", encoding="utf-8") as f:
+        for k in range(n):
+            notes = [["CDEFGAB"[int(m)], 0.5] for m in rng.integers(7, size=int(rng.integers(2, 61)))]
+            f.write(json.dumps({"nome": f"Música {k}", "genero": names[genres[k]], "notas": notes}) + "\n")
+    return SongLibrary(directory)
+
+
+def rejection(n, recent, rng):
+    """Sorteio antigo: tenta de novo enquanto cair numa música recente."""
+    index = rng.randrange(n)
+    while index in recent:
+        index = rng.randrange(n)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--draws", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'músicas':>8} {'montar':>8} {'next mediana':>13} {'p99':>8} {'antigo (janela)':>16} "
+          f"{'repetições':>11} {'maior desvio por gênero':>24}")
+    for n in args.songs:
+        with tempfile.TemporaryDirectory() as directory:
+            library = make_library(n, rng, directory)
+            history = {library.nomes[int(k)]: [int(rng.integers(5)), int(rng.integers(5))]
+                       for k in rng.integers(n, size=n // 10)}
+            start = time.perf_counter()
+            scheduler = SongScheduler(library, history=history, history_path=os.devnull,
+                                      rng=random.Random(args.seed))
+            build_s = time.perf_counter() - start
+            expected = np.bincount(library.codigos_genero, weights=scheduler._base,
+                                   minlength=len(library.generos))
+
+            times, drawn, repeats = [], [], 0
+            for _ in range(args.draws):
+                start = time.perf_counter()
+                index = scheduler.next()
+                times.append(time.perf_counter() - start)
+                repeats += index in drawn[-scheduler.window:]
+                drawn.append(index)
+
+            old_rng, recent = random.Random(args.seed), []
+            start = time.perf_counter()
+            for _ in range(args.draws):
+                recent.append(rejection(n, recent[-scheduler.window:], old_rng))
+            old_us = (time.perf_counter() - start) / args.draws * 1e6
+
+            # A janela tira um pouco de peso de cada gênero; o desvio deve ficar pequeno
+            share = np.bincount(library.codigos_genero[drawn], minlength=len(library.generos)) / len(drawn)
+            deviation = np.abs(share - expected / expected.sum()).max()
+            us = np.array(times) * 1e6
+            print(f"{n:>8} {build_s * 1000:6.0f}ms {np.median(us):11.1f}us {np.percentile(us, 99):6.1f}us "
+                  f"{old_us:14.1f}us {repeats:>11} {deviation:24.3f}")
+    print(f"(janela de {WINDOW} músicas; 'antigo' não pondera nada)")
+
+
+if __name__ == "__main__":
+    main()
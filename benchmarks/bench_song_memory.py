@@ -0,0 +1,117 @@
+"""
+Memória e tempo de carga de bibliotecas grandes: Musica com arrays paralelos
+(__slots__, MIDI uint8, duração float64, frequência float32) vs. a dataclass
+antiga com uma lista de tuplas (nota, duração) por música.
+
+A memória é medida com tracemalloc (tudo o que a construção da biblioteca
+aloca, inclusive os buffers NumPy). Também mede uma consulta típica sobre a
+biblioteca inteira: duração total e histograma de classes de nota.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_song_memory [--songs 1000 10000 50000] [--notes 40]
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from Musicas import Musica
+from note_table import NOTAS, PITCH_CLASS
+
+
+@dataclass
+class MusicaLista:
+    """Referência: o formato antigo."""
+    nome: str
+    genero: str
+    notas: List[Tuple[str, float]]
+
+
+def random_specs(n_songs, mean_notes, rng):
+    """(nome, gênero, classes de nota, durações) de cada música, como arrays (o "arquivo" lido)."""
+    lengths = np.maximum(4, rng.poisson(mean_notes, n_songs))
+    durations = np.array([0.25, 0.3, 0.5, 0.5, 0.8, 1.0, 1.2, 1.5])
+    return [(f"Música {k}", "Teste", rng.integers(12, size=n), rng.choice(durations, size=n))
+            for k, n in enumerate(lengths)]
+
+
+def load_lists(specs):
+    return [MusicaLista(nome, genero, list(zip([NOTAS[p] for p in pcs.tolist()], durs.tolist())))
+            for nome, genero, pcs, durs in specs]
+
+
+def load_tuples(specs):
+    """Musica pelo construtor com tuplas (o formato do banco em Musicas.py)."""
+    return [Musica(nome, genero, list(zip([NOTAS[p] for p in pcs.tolist()], durs.tolist())))
+            for nome, genero, pcs, durs in specs]
+
+
+def load_arrays(specs):
+    """Musica direto dos arrays (from_arrays, o caminho dos carregadores em lote)."""
+    return [Musica.from_arrays(nome, genero, pcs + 60, durs) for nome, genero, pcs, durs in specs]
+
+
+def build(specs, loader):
+    """(biblioteca, bytes que continuam alocados depois da carga, segundos)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    library = loader(specs)
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return library, size, seconds
+
+
+def query_lists(library):
+    total = sum(d for musica in library for _, d in musica.notas)
+    histogram = [0] * 12
+    for musica in library:
+        for nota, _ in musica.notas:
+            histogram[PITCH_CLASS[nota]] += 1
+    return total, histogram
+
+
+def query_arrays(library):
+    total = float(sum(musica.duracoes.sum() for musica in library))
+    midi = np.concatenate([musica.midi for musica in library])
+    return total, np.bincount(midi % 12, minlength=12).tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--songs", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--notes", type=int, default=40, help="notas por música (média)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'músicas':>8} {'lista':>9} {'arrays':>9} {'razão':>6} {'carga lista':>12} {'tuplas->arrays':>15} "
+          f"{'from_arrays':>12} {'consulta lista':>15} {'consulta arrays':>16}")
+    for n in args.songs:
+        specs = random_specs(n, args.notes, rng)
+        old, old_bytes, old_load = build(specs, load_lists)
+        new, new_bytes, tuple_load = build(specs, load_tuples)
+        del new
+        new, _, array_load = build(specs, load_arrays)
+
+        start = time.perf_counter()
+        old_total, old_hist = query_lists(old)
+        old_query = time.perf_counter() - start
+        start = time.perf_counter()
+        new_total, new_hist = query_arrays(new)
+        new_query = time.perf_counter() - start
+        assert old_hist == new_hist and abs(old_total - new_total) < 1e-6 * old_total
+
+        print(f"{n:>8} {old_bytes / 2**20:7.1f}MB {new_bytes / 2**20:7.1f}MB {old_bytes / new_bytes:5.1f}x "
+              f"{old_load * 1000:10.0f}ms {tuple_load * 1000:13.0f}ms {array_load * 1000:10.0f}ms "
+              f"{old_query * 1000:13.1f}ms {new_query * 1000:14.1f}ms")
+        del old, new
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Tempo de frame quando uma nota é confirmada: animação de acerto com o atlas de
+sprites (game.SuccessAtlas) vs. a versão antiga, que criava o overlay, o card
+com gradiente, a fonte do ✓ e as 12 estrelas a cada frame.
+
+Simula a tela a 60 FPS: alguns frames parados, o acerto, e os 2 s da animação.
+O relógio da animação é simulado (success_animation_start_time é recuado a
+cada frame), então o benchmark não espera em tempo real.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_success_animation [--idle 60] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import game
+
+FPS = 60
+
+
+def legacy_frame(screen, elapsed, ticks):
+    """Referência: a draw_success_animation antiga, tudo criado no frame."""
+    fade_start = game.SUCCESS_ANIMATION_DURATION - 0.5
+    alpha = int(255 * (1 - (elapsed - fade_start) / 0.5)) if elapsed > fade_start else 255
+    scale = 1.0 + game.math.sin(ticks * 0.02) * 0.2
+    width, height = game.WIDTH, game.HEIGHT
+
+    overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+    overlay.fill((0, 255, 100, int(30 * (alpha / 255))))
+    screen.blit(overlay, (0, 0))
+
+    scaled_width, scaled_height = int(500 * scale), int(250 * scale)
+    scaled_y = (height - scaled_height) // 2
+    card_surf = pygame.Surface((scaled_width, scaled_height), pygame.SRCALPHA)
+    card_rect = pygame.Rect(0, 0, scaled_width, scaled_height)
+    game.draw_gradient(card_surf, card_rect, (50, 255, 150), (80, 220, 120), vertical=True)
+    pygame.draw.rect(card_surf, (100, 255, 180, alpha), card_rect, width=4, border_radius=25)
+    card_surf.set_alpha(alpha)
+    screen.blit(card_surf, ((width - scaled_width) // 2, scaled_y))
+
+    check_surf = game.get_font("Montserrat", int(80 * scale), bold=True).render("✓", True, (255, 255, 255))
+    check_surf.set_alpha(alpha)
+    screen.blit(check_surf, (width // 2 - check_surf.get_width() // 2, scaled_y + 40))
+
+    success_surf = game.FONT_TITLE.render("NOTA ACERTADA!", True, (255, 255, 255))
+    success_shadow = game.FONT_TITLE.render("NOTA ACERTADA!", True, (0, 0, 0))
+    temp = pygame.Surface(success_surf.get_size(), pygame.SRCALPHA)
+    temp.blit(success_shadow, (2, 2))
+    temp.blit(success_surf, (0, 0))
+    temp.set_alpha(alpha)
+    screen.blit(temp, (width // 2 - success_surf.get_width() // 2, scaled_y + 120))
+
+    for i in range(12):
+        angle = (i / 12) * 2 * game.math.pi
+        radius = 100 + 30 * game.math.sin(ticks * 0.005 + i)
+        star_x = width // 2 + radius * game.math.cos(angle)
+        star_y = height // 2 + radius * game.math.sin(angle)
+        star_size = int(15 * (1 + 0.5 * game.math.sin(ticks * 0.01 + i)))
+        star_surf = pygame.Surface((star_size * 2, star_size * 2), pygame.SRCALPHA)
+        pygame.draw.circle(star_surf, (255, 255, 255, int(alpha * 0.7)), (star_size, star_size), star_size)
+        screen.blit(star_surf, (star_x - star_size, star_y - star_size))
+
+
+def run(screen, background, idle, legacy):
+    """Tempos (s) de cada frame: idle frames parados e depois a animação inteira."""
+    frames = idle + int(game.SUCCESS_ANIMATION_DURATION * FPS)
+    times = []
+    for i in range(frames):
+        start = time.perf_counter()
+        screen.blit(background, (0, 0))
+        if i >= idle:
+            elapsed = (i - idle) / FPS
+            if legacy:
+                legacy_frame(screen, elapsed, pygame.time.get_ticks())
+            else:
+                game.show_success_animation = True
+                game.success_animation_start_time = pygame.time.get_ticks() - int(elapsed * 1000)
+                game.draw_success_animation()
+        times.append(time.perf_counter() - start)
+    game.show_success_animation = False
+    return times[:idle], times[idle:]
+
+
+def report(label, idle, firsts, anim):
+    ordered = sorted(anim)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    print(f"{label:<10} parado={statistics.median(idle) * 1e3:5.2f} ms  "
+          f"animação: 1º frame={max(firsts) * 1e3:5.2f} ms  mediana={statistics.median(anim) * 1e3:5.2f} ms  "
+          f"p99={p99 * 1e3:5.2f} ms  máx={ordered[-1] * 1e3:5.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=int, default=60, help="frames parados antes do acerto")
+    parser.add_argument("--runs", type=int, default=5, help="acertos simulados por versão")
+    args = parser.parse_args()
+
+    game.init()
+    screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+    game.screen = screen
+    background = pygame.Surface((game.WIDTH, game.HEIGHT))
+    game.draw_gradient(background, background.get_rect(), (60, 20, 80), (20, 40, 100))
+
+    start = time.perf_counter()
+    game.SuccessAtlas()
+    print(f"construção do atlas (uma vez, na inicialização): {(time.perf_counter() - start) * 1e3:.1f} ms")
+    print(f"orçamento de um frame a {FPS} FPS: {1000 / FPS:.1f} ms")
+
+    for label, legacy in (("antiga", True), ("atlas", False)):
+        idle, firsts, anim = [], [], []
+        for _ in range(args.runs):
+            i, a = run(screen, background, args.idle, legacy)
+            idle += i
+            firsts.append(a[0])
+            anim += a
+        report(label, idle, firsts, anim)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Latência por tecla das sugestões do modal de adivinhar (title_match.TitleCompleter).
+
+Simula jogadores digitando nomes do catálogo letra a letra (sem acentos, às
+vezes em maiúsculas, às vezes apagando e redigitando uma letra ou
+começando por uma palavra do meio) e mede o tempo de cada update(), contra
+a referência que refaz a busca varrendo todos os nomes normalizados a cada
+tecla. O orçamento é um frame a 60 FPS.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_title_complete [--titles 1000 10000 100000] [--sessions 200]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_title_match import random_titles
+from title_match import TitleCompleter, normalize_prefix
+from utils import normalize_title
+
+FRAME_MS = 1000 / 60
+
+
+def keystrokes(title, rng):
+    """Textos do campo depois de cada tecla."""
+    text = normalize_title(title)
+    if rng.random() < 0.3 and " " in text:
+        text = text[text.index(" ") + 1:]
+    if rng.random() < 0.3:
+        text = text.upper()
+    typed, states = "", []
+    for ch in text[:int(rng.integers(min(3, len(text)), len(text) + 1))]:
+        if rng.random() < 0.1:
+            typed += "x"
+            states.append(typed)
+            typed = typed[:-1]
+            states.append(typed)
+        typed += ch
+        states.append(typed)
+    return states
+
+
+def rescan(normalized, titles, text, limit):
+    """Referência: varre todos os nomes a cada tecla."""
+    prefix = normalize_prefix(text)
+    if not prefix:
+        return []
+    start = [k for k, t in enumerate(normalized) if t.startswith(prefix)]
+    word = [k for k, t in enumerate(normalized) if (" " + prefix) in t and not t.startswith(prefix)]
+    return start[:limit] + word[:limit - len(start[:limit])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--sessions", type=int, default=200, help="nomes digitados")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'nomes':>7} {'índice':>8} {'teclas':>7} {'mediana':>9} {'p99':>8} {'máximo':>8} "
+          f"{'varredura/tecla':>16}")
+    for n in args.titles:
+        titles = random_titles(n, rng)
+        start = time.perf_counter()
+        completer = TitleCompleter(titles)
+        build_s = time.perf_counter() - start
+        normalized = [normalize_title(t) for t in titles]
+
+        times, scan_times = [], []
+        for session in range(args.sessions):
+            completer.reset()
+            for text in keystrokes(titles[int(rng.integers(n))], rng):
+                start = time.perf_counter()
+                suggestions = completer.update(text)
+                times.append(time.perf_counter() - start)
+                if session < 10:
+                    # Mesmas sugestões (em conjunto) que a varredura completa
+                    start = time.perf_counter()
+                    expected = rescan(normalized, titles, text, completer.limit)
+                    scan_times.append(time.perf_counter() - start)
+                    got = {k for k, _ in suggestions}
+                    assert len(got) == len(expected)
+                    assert all(normalized[k].startswith(normalize_prefix(text))
+                               or (" " + normalize_prefix(text)) in normalized[k] for k in got)
+
+        ms = np.array(times) * 1000
+        flag = "" if ms.max() < FRAME_MS else f"  <- acima de um frame ({FRAME_MS:.1f} ms)"
+        print(f"{n:>7} {build_s * 1000:6.0f}ms {len(times):>7} {np.median(ms) * 1000:7.0f}us "
+              f"{np.percentile(ms, 99) * 1000:6.0f}us {ms.max():6.2f}ms {np.mean(scan_times) * 1000:14.2f}ms{flag}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Latência e concordância da busca aproximada de nomes (title_match.py).
+
+Gera catálogos de nomes com palavras em português (com acentos) e palpites
+como os de quem joga: nome sem acentos, em maiúsculas, com uma ou duas
+letras trocadas/faltando, ou só um pedaço do nome. Mede a latência da busca
+dos 5 melhores (mediana, p95, máximo), em quantos palpites o nome certo está
+entre eles e, numa parte dos palpites, compara com a referência: os 5 nomes
+de maior similaridade entre os aceitos por utils.is_similar_enough, testando
+todos os nomes do catálogo um por um.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_title_match [--titles 1000 10000 100000] [--queries 500] [--check 20]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from title_match import TitleIndex
+from utils import calculate_similarity, is_similar_enough, normalize_title
+
+TOP = 5
+
+WORDS = ("asa branca parabéns você cinco patinhos marcha soldado borboletinha sapo lava pé ciranda "
+         "cirandinha atirei pau gato brilha estrelinha não devo nada ninguém canção noite luar sertão "
+         "saudade coração menina morena lua céu mar amor sol chuva vento flor jardim caminho estrada "
+         "trem viola forró baião xote samba frevo maracatu ação paixão ilusão canário sabiá pássaro "
+         "rio cachoeira São João Maria José festa junina fogueira balão quadrilha").split()
+
+
+def random_titles(n, rng):
+    titles, seen = [], set()
+    while len(titles) < n:
+        title = " ".join(rng.choice(WORDS, size=int(rng.integers(2, 6)))).capitalize()
+        if title not in seen:
+            seen.add(title)
+            titles.append(title)
+    return titles
+
+
+def make_guess(title, rng):
+    letters = list(title.upper() if rng.random() < 0.3 else title)
+    kind = rng.random()
+    if kind < 0.25:
+        # Só um pedaço do nome
+        words = title.split()
+        return " ".join(words[:max(1, len(words) // 2 + 1)])
+    for _ in range(int(rng.integers(1, 3))):
+        k = int(rng.integers(len(letters)))
+        if rng.random() < 0.5:
+            del letters[k]
+        else:
+            letters[k] = chr(ord("a") + int(rng.integers(26)))
+    guess = "".join(letters)
+    if kind < 0.6:
+        guess = guess.replace("ã", "a").replace("é", "e").replace("ç", "c").replace("ó", "o")
+    return guess
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--titles", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--check", type=int, default=20, help="palpites conferidos contra a referência")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'nomes':>7} {'índice':>8} {'mediana':>9} {'p95':>8} {'máximo':>8} {'alvo no top-5':>14} "
+          f"{'concordância':>13} {'referência/palpite':>19}")
+    for n in args.titles:
+        titles = random_titles(n, rng)
+        start = time.perf_counter()
+        index = TitleIndex(titles)
+        build_s = time.perf_counter() - start
+
+        guesses = []
+        for _ in range(args.queries):
+            target = int(rng.integers(n))
+            guesses.append((target, make_guess(titles[target], rng)))
+        times, found = [], 0
+        for target, guess in guesses:
+            start = time.perf_counter()
+            matches = index.search(guess, k=TOP)
+            times.append(time.perf_counter() - start)
+            found += target in {m.index for m in matches}
+
+        agree, ref_s = 0, 0.0
+        for target, guess in guesses[:args.check]:
+            start = time.perf_counter()
+            query = normalize_title(guess)
+            accepted = [(calculate_similarity(query, normalize_title(t)), k)
+                        for k, t in enumerate(titles) if is_similar_enough(guess, t)]
+            ref_s += time.perf_counter() - start
+            expected = sorted(accepted, key=lambda p: (-p[0], p[1]))[:TOP]
+            agree += expected == [(m.similaridade, m.index) for m in index.search(guess, k=TOP)]
+
+        ms = np.array(times) * 1000
+        print(f"{n:>7} {build_s * 1000:6.0f}ms {np.median(ms):7.2f}ms {np.percentile(ms, 95):6.2f}ms "
+              f"{ms.max():6.2f}ms {found / len(guesses):14.0%} {agree:>6}/{args.check:<6} "
+              f"{ref_s / args.check * 1000:16.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
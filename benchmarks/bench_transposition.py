@@ -0,0 +1,108 @@
+"""
+Custo de síntese por cantor com o cache de transposição (transposition.py).
+
+Simula uma sessão: rodadas com músicas sorteadas da biblioteca, cada rodada
+tocando as notas reveladas uma a uma e repetindo o trecho (botão "Repetir
+Notas"), e a cada --switch rodadas troca o cantor (tipo de voz). Compara
+três estratégias: sintetizar toda nota tocada (como antes), ressintetizar a
+biblioteca inteira a cada troca de cantor e o TranspositionCache (por
+música e deslocamento, sob demanda). Mostra as sínteses feitas, o tempo de
+síntese e a memória dos buffers guardados. Com --songs, usa uma biblioteca
+sintética desse tamanho em vez da BIBLIOTECA do jogo.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_transposition [--rounds 60] [--switch 10] [--songs 200]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np  # noqa: E402
+
+import game  # noqa: E402
+from benchmarks.bench_scheduler import make_library  # noqa: E402
+from Musicas import BIBLIOTECA, _FREQS_MIDI  # noqa: E402
+from transposition import MAX_SONGS, VOICE_TYPES, TranspositionCache, best_shift, voice_profile  # noqa: E402
+
+
+def session(library, rounds, switch, rng):
+    """[(cantor, música, notas tocadas)] de cada rodada."""
+    voices = list(VOICE_TYPES)
+    plan, voice = [], rng.choice(voices)
+    for r in range(rounds):
+        if r and r % switch == 0:
+            voice = rng.choice([v for v in voices if v != voice])
+        song = rng.randrange(len(library))
+        revealed = rng.randint(1, len(library[song].midi))
+        # Cada nota nova mais uma repetição do trecho revelado
+        plays = [k for n in range(1, revealed + 1) for k in [n - 1, *range(n)]]
+        plan.append((voice_profile(voice), song, plays))
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=60)
+    parser.add_argument("--switch", type=int, default=10, help="rodadas entre trocas de cantor")
+    parser.add_argument("--songs", type=int, default=None, help="tamanho da biblioteca sintética")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.songs is None:
+        run(BIBLIOTECA, args)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            run(make_library(args.songs, np.random.default_rng(args.seed), directory), args)
+
+
+def run(library, args):
+    plan = session(library, args.rounds, args.switch, random.Random(args.seed))
+    plays = sum(len(p) for _, _, p in plan)
+    print(f"{len(library)} músicas, {args.rounds} rodadas, {plays} notas tocadas, "
+          f"troca de cantor a cada {args.switch} rodadas\n")
+    print(f"{'estratégia':<30} {'sínteses':>9} {'tempo':>9} {'buffers guardados':>18}")
+
+    # 1. Sintetiza cada nota tocada
+    start, count = time.perf_counter(), 0
+    for profile, song, notes in plan:
+        musica = library[song]
+        shift = best_shift(musica.midi, profile)
+        for k in notes:
+            game.synth_piano_note(float(_FREQS_MIDI[int(musica.midi[k]) + shift]),
+                                  float(musica.duracoes[k]))
+            count += 1
+    print(f"{'sem cache':<30} {count:>9} {time.perf_counter() - start:8.2f}s {'-':>18}")
+
+    # 2. Ressintetiza a biblioteca inteira a cada cantor novo (as notas distintas de cada música)
+    start, count, stored, last = time.perf_counter(), 0, 0, None
+    for profile, _, _ in plan:
+        if profile == last:
+            continue
+        last, stored = profile, 0
+        for musica in library:
+            shift = best_shift(musica.midi, profile)
+            for midi, dur in set(zip((musica.midi.astype(int) + shift).tolist(), musica.duracoes.tolist())):
+                stored += game.synth_piano_note(float(_FREQS_MIDI[midi]), dur).nbytes
+                count += 1
+    print(f"{'biblioteca a cada troca':<30} {count:>9} {time.perf_counter() - start:8.2f}s "
+          f"{stored / 2**20:15.1f} MB")
+
+    # 3. TranspositionCache: por (música, deslocamento), só o que toca
+    cache = TranspositionCache(game.synth_piano_note)
+    start = time.perf_counter()
+    for profile, song, notes in plan:
+        entry = cache.prepare(song, library[song], profile)
+        for k in notes:
+            cache.buffer(entry, k)
+    stored = sum(b.nbytes for e in cache._entries.values() for b in e.buffers.values())
+    print(f"{'TranspositionCache':<30} {cache.synthesized:>9} {time.perf_counter() - start:8.2f}s "
+          f"{stored / 2**20:15.1f} MB  (até {MAX_SONGS} músicas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Custo de CPU do detector com e sem o porteiro de voz (VAD) numa sessão
+sintética com longos trechos de silêncio.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_vad [--seconds 60] [--voice 0.3]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from pitch_detector import PitchDetector
+
+
+def synth_session(seconds, voice_ratio, rate, hop, seed=0):
+    """Sessão com ruído de fundo e frases cantadas; retorna (áudio, máscara de voz por bloco)."""
+    rng = np.random.default_rng(seed)
+    n_blocks = int(seconds * rate / hop)
+    audio = (rng.standard_normal(n_blocks * hop) * 5e-4).astype(np.float32)
+    voiced = np.zeros(n_blocks, dtype=bool)
+    t = np.arange(hop * 8) / rate
+    b = 0
+    while b < n_blocks:
+        gap = int(rng.integers(4, 12) * (1 - voice_ratio) / max(voice_ratio, 1e-3))
+        b += gap
+        length = int(rng.integers(4, 9))
+        if b + length > n_blocks:
+            break
+        freq = 440.0 * 2 ** ((rng.integers(-9, 3)) / 12)
+        tt = t[:length * hop]
+        phase = 2 * np.pi * freq * tt + 0.3 * np.sin(2 * np.pi * 5.5 * tt)
+        note = 0.2 * np.sin(phase) + 0.08 * np.sin(2 * phase) + 0.04 * np.sin(3 * phase)
+        audio[b * hop:(b + length) * hop] += note.astype(np.float32)
+        voiced[b:b + length] = True
+        b += length
+    return audio, voiced
+
+
+def run(detector, blocks):
+    detector._reset_analysis()
+    freqs = np.zeros(len(blocks))
+    analyzed = np.zeros(len(blocks), dtype=bool)
+    start = time.process_time()
+    for i, block in enumerate(blocks):
+        freqs[i], _, analyzed[i] = detector._analyze(block)
+    return freqs, analyzed, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--voice", type=float, default=0.3, help="fração aproximada do tempo com voz")
+    args = parser.parse_args()
+
+    base = PitchDetector(use_vad=False)
+    gated = PitchDetector(use_vad=True)
+    audio, voiced = synth_session(args.seconds, args.voice, base.RATE, base.BUFFER_SIZE)
+    blocks = audio.reshape(-1, base.BUFFER_SIZE)
+
+    f_base, _, cpu_base = run(base, blocks)
+    f_gated, analyzed, cpu_gated = run(gated, blocks)
+
+    notes_base = np.array([base._freq_para_nota(f) for f in f_base])
+    notes_gated = np.array([gated._freq_para_nota(f) for f in f_gated])
+    same_on_voice = np.mean(notes_base[voiced] == notes_gated[voiced]) if voiced.any() else 1.0
+    false_on_silence = np.mean(f_base[~voiced] > 0), np.mean(f_gated[~voiced] > 0)
+
+    n = len(blocks)
+    print(f"blocos: {n} ({np.mean(voiced) * 100:.0f}% com voz, {np.mean(analyzed) * 100:.0f}% passaram pelo porteiro)")
+    print(f"sem VAD: {cpu_base * 1000:8.1f} ms CPU  ({cpu_base / n * 1e6:7.1f} us/bloco)")
+    print(f"com VAD: {cpu_gated * 1000:8.1f} ms CPU  ({cpu_gated / n * 1e6:7.1f} us/bloco)  "
+          f"-> {100 * (1 - cpu_gated / cpu_base):.0f}% menos CPU")
+    print(f"mesma nota nos blocos com voz: {same_on_voice * 100:.1f}%")
+    print(f"pitch espúrio no silêncio: sem VAD {false_on_silence[0] * 100:.1f}%, com VAD {false_on_silence[1] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""Corpus sintético de notas cantadas usado pelos benchmarks do detector."""
+import numpy as np
+
+from audio_sources import synth_test_note
+from calibration import note_name  # noqa: F401 (reexportado para os benchmarks)
+
+
+def midi_to_freq(midi, a4=440.0):
+    return a4 * 2 ** ((midi - 69) / 12.0)
+
+
+def note_corpus(low=45, high=79, blocks_per_note=6, hop=8192, rate=44100, seed=0):
+    """
+    Uma nota por semitom de low a high (MIDI; padrão A2..G5).
+
+    Retorna lista de (midi, blocos) com blocos no formato (n_blocos, hop).
+    """
+    rng = np.random.default_rng(seed)
+    corpus = []
+    for midi in range(low, high + 1):
+        wave = synth_test_note(midi_to_freq(midi), blocks_per_note * hop / rate, rate, rng)
+        corpus.append((midi, wave.reshape(blocks_per_note, hop)))
+    return corpus
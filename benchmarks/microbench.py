@@ -0,0 +1,159 @@
+"""
+Micro-benchmarks das funções quentes em Python puro, com baseline e
+alerta de regressão.
+
+Casos: utils.calculate_similarity e is_similar_enough em nomes curtos,
+médios e longos; PitchDetector._freq_para_nota; cents_difference;
+synth_piano_note em várias durações; draw_gradient e Button.draw. Os de
+desenho rodam sem tela (SDL com drivers "dummy"), então a suíte roda numa
+máquina Linux sem placa de som nem display.
+
+Para cada caso: operações por segundo (melhor de --repeat rodadas de
+timeit, cada uma com pelo menos 0.2 s) e memória de uma chamada medida com
+tracemalloc (pico e o que fica alocado depois). tracemalloc vê alocações
+do Python e do NumPy; as de superfícies do SDL não aparecem.
+
+Os resultados são comparados com o arquivo de baseline (por máquina; gere
+com --save). Um caso regride se ficar mais lento ou usar mais memória que o
+baseline além de --threshold; nesse caso o script sai com código 1.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.microbench [--save] [--threshold 0.3] [--filter similarity]
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import timeit
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+
+import game  # noqa: E402
+from pitch_detector import PitchDetector  # noqa: E402
+from utils import calculate_similarity, is_similar_enough  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+# Memória abaixo disso (KB) é ruído de alocações pequenas, não regressão
+MEMORY_SLACK_KB = 4.0
+
+TITLES = {
+    "curto": ("Asa Brnca", "Asa Branca"),
+    "medio": ("parabens pra voce nessa data", "Parabéns pra Você nesta data querida"),
+    "longo": ("O sapo nao lava o pe, nao lava porque nao quer, ele mora la na lagoa",
+              "O Sapo Não Lava o Pé, não lava porque não quer; ele mora lá na lagoa e não lava o pé"),
+}
+
+
+def _cases():
+    """{nome: função sem argumentos} de todos os casos."""
+    game.init()  # fontes e botões do jogo
+    cases = {}
+    for size, (guess, title) in TITLES.items():
+        cases[f"calculate_similarity/{size}"] = lambda g=guess, t=title: calculate_similarity(g, t)
+        cases[f"is_similar_enough/{size}"] = lambda g=guess, t=title: is_similar_enough(g, t)
+
+    detector = PitchDetector()
+    freqs = [55.0 * 2 ** (k / 7.3) for k in range(40)]
+    cases["PitchDetector._freq_para_nota/40 freqs"] = lambda: [detector._freq_para_nota(f) for f in freqs]
+    cases["cents_difference/40 freqs"] = lambda: [game.cents_difference(f, 440.0) for f in freqs]
+
+    for duration in (0.25, 1.0, 3.0):
+        cases[f"synth_piano_note/{duration}s"] = lambda d=duration: game.synth_piano_note(261.63, d)
+
+    surface = pygame.Surface((game.WIDTH, game.HEIGHT))
+    cases["draw_gradient/card 300x200"] = lambda: game.draw_gradient(
+        surface, (0, 0, 300, 200), game.BG_CARD, game.BG_SURFACE)
+    cases["draw_gradient/tela 1000x700"] = lambda: game.draw_gradient(
+        surface, (0, 0, game.WIDTH, game.HEIGHT), game.BG_CARD, game.BG_SURFACE)
+    cases["Button.draw"] = lambda: game.btn_start.draw(surface)
+    return cases
+
+
+def measure(fn, repeat):
+    """(operações por segundo, pico KB, KB retidos) de fn."""
+    fn()  # aquece caches (fontes, tabelas, lru_cache)
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    del result
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return number / best, (peak - before) / 1024, max(0, after - before) / 1024
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if data.get("plataforma") != platform.platform() or data.get("python") != platform.python_version():
+        print(f"Aviso: baseline gravado em {data.get('plataforma')} / Python {data.get('python')}; "
+              "os números podem não ser comparáveis")
+    return data.get("casos", {})
+
+
+def save_baseline(path, results, previous):
+    cases = dict(previous)
+    cases.update({name: {"ops_por_s": ops, "pico_kb": peak} for name, (ops, peak, _) in results.items()})
+    data = {"plataforma": platform.platform(), "python": platform.python_version(), "casos": cases}
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def compare(ops, peak, base, threshold):
+    """Situação do caso contra o baseline."""
+    if base is None:
+        return "novo"
+    problems = []
+    if ops < base["ops_por_s"] * (1 - threshold):
+        problems.append("tempo")
+    if peak > base["pico_kb"] * (1 + threshold) + MEMORY_SLACK_KB:
+        problems.append("memória")
+    return "REGRESSÃO (" + ", ".join(problems) + ")" if problems else "ok"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="arquivo JSON de baseline")
+    parser.add_argument("--save", action="store_true", help="grava os resultados como novo baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="tolerância relativa (0.3 = 30%%)")
+    parser.add_argument("--filter", default="", help="só casos cujo nome contém este texto")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline)
+    cases = {name: fn for name, fn in _cases().items() if args.filter in name}
+    print(f"{'caso':<40} {'ops/s':>12} {'baseline':>12} {'Δ':>7} {'pico KB':>9} {'retido KB':>10}  situação")
+    results, regressions = {}, 0
+    for name, fn in cases.items():
+        ops, peak, retained = measure(fn, args.repeat)
+        results[name] = (ops, peak, retained)
+        base = baseline.get(name)
+        status = compare(ops, peak, base, args.threshold)
+        regressions += status.startswith("REGRESSÃO")
+        base_ops = f"{base['ops_por_s']:12.0f}" if base else f"{'-':>12}"
+        delta = f"{ops / base['ops_por_s'] - 1:+6.0%}" if base else f"{'-':>6}"
+        print(f"{name:<40} {ops:12.0f} {base_ops} {delta:>7} {peak:9.1f} {retained:10.1f}  {status}")
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline)
+        print(f"Baseline gravado em {args.baseline}")
+    elif regressions:
+        print(f"{regressions} caso(s) com regressão acima de {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Calibração automática do detector de pitch para a máquina local.
+
+Sintetiza um corpus de notas (mesmo timbre do synth_piano_note, com vibrato e
+ruído), roda cada combinação de estimador / buffer / janela / decimação pelo
+PitchDetector, mede o custo de CPU e a taxa de acerto e grava o perfil mais
+barato que atinge a precisão pedida. O jogo carrega esse perfil ao iniciar.
+
+Uso:
+    python calibration.py [--target 0.95] [--quick] [--profile caminho.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from audio_sources import synth_test_note
+from pitch_backends import aubio_available
+from pitch_detector import PitchDetector
+from note_table import get_note_table
+
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".solfejo", "pitch_profile.json")
+PROFILE_VERSION = 1
+
+AUBIO_METHODS = ["yin", "yinfft", "yinfast", "mcomb", "schmitt", "fcomb"]
+BUFFER_SIZES = [2048, 4096, 8192]
+WINDOW_FACTORS = [2, 4]
+DECIMATIONS = [1, 2, 4]
+
+# Configurações que passam disso (fração de um núcleo) são descartadas cedo
+MAX_CPU_LOAD = 0.5
+
+
+def test_corpus(low=45, high=79, step=1, duration=1.5, rate=44100, seed=0, a4=440.0,
+                noise_levels=(0.005, 0.05)):
+    """
+    Lista de (midi, áudio) cobrindo a região vocal (padrão A2..G5).
+
+    Cada nota é gerada uma vez por nível de ruído: métodos que só funcionam
+    com sinal limpo não devem ganhar a calibração.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        (midi, synth_test_note(a4 * 2 ** ((midi - 69) / 12.0), duration, rate, rng, noise=noise))
+        for midi in range(low, high + 1, step)
+        for noise in noise_levels
+    ]
+
+
+def note_name(midi):
+    return get_note_table().names[midi]
+
+
+def candidate_configs(quick=False):
+    backends = [("yin", {})]
+    if aubio_available():
+        backends += [("aubio", {"method": m}) for m in AUBIO_METHODS]
+    buffers = [4096, 8192] if quick else BUFFER_SIZES
+    decimations = [2, 4] if quick else DECIMATIONS
+    for (backend, options), buffer_size, window_factor, decimation in itertools.product(
+            backends, buffers, WINDOW_FACTORS, decimations):
+        yield {
+            "backend": backend,
+            "backend_options": options,
+            "buffer_size": buffer_size,
+            "window_factor": window_factor,
+            "decimation": decimation,
+        }
+
+
+def score_config(config, corpus, rate=44100):
+    """
+    Roda o corpus com uma configuração.
+
+    Retorna dict com accuracy (acertos de nota+oitava depois que a janela
+    está só com a nota nova) e cpu_load (segundos de CPU por segundo de áudio),
+    ou None se a configuração for inválida ou lenta demais.
+    """
+    try:
+        detector = PitchDetector(use_vad=False, **config)
+    except (ValueError, ImportError):
+        return None
+    hop = detector.BUFFER_SIZE
+    warmup = detector.window_factor
+    hits = total = 0
+    cpu = 0.0
+    audio_seconds = 0.0
+    for i, (midi, wave) in enumerate(corpus):
+        try:
+            detector._reset_analysis()
+        except Exception:
+            return None
+        blocks = wave[:len(wave) // hop * hop].reshape(-1, hop)
+        start = time.process_time()
+        freqs = [detector._analyze(block)[0] for block in blocks]
+        cpu += time.process_time() - start
+        audio_seconds += len(blocks) * hop / rate
+        target = note_name(midi)
+        for freq in freqs[warmup:]:
+            total += 1
+            hits += detector._freq_para_nota(freq) == target
+        if i == 3 and cpu / audio_seconds > MAX_CPU_LOAD:
+            return None
+    if total == 0:
+        return None
+    return {
+        "accuracy": hits / total,
+        "cpu_load": cpu / audio_seconds,
+        "latency": warmup * hop / rate,
+    }
+
+
+def calibrate(target=0.95, quick=False, verbose=False):
+    """Retorna o perfil mais barato com accuracy >= target (ou o mais preciso, se nenhum atingir)."""
+    corpus = test_corpus(step=4 if quick else 2)
+    results = []
+    for config in candidate_configs(quick):
+        result = score_config(config, corpus)
+        if result is None:
+            continue
+        results.append((config, result))
+        if verbose:
+            opts = config["backend_options"].get("method", "")
+            print(f"{config['backend']:<6} {opts:<8} buf={config['buffer_size']:<5} win=x{config['window_factor']} "
+                  f"dec={config['decimation']}  acerto={result['accuracy'] * 100:5.1f}%  "
+                  f"CPU={result['cpu_load'] * 100:6.3f}%")
+    if not results:
+        return None
+    good = [r for r in results if r[1]["accuracy"] >= target]
+    if good:
+        config, result = min(good, key=lambda r: (r[1]["cpu_load"], r[1]["latency"]))
+    else:
+        config, result = max(results, key=lambda r: (r[1]["accuracy"], -r[1]["cpu_load"]))
+    return {**config, **result, "target": target}
+
+
+def host_fingerprint():
+    """Identifica a máquina/ambiente; um perfil de outra máquina é ignorado."""
+    return {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "aubio": aubio_available(),
+    }
+
+
+def save_profile(profile, path=None):
+    path = path or PROFILE_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    data = {**profile, "version": PROFILE_VERSION, "host": host_fingerprint(), "created": time.time()}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_profile(path=None):
+    """Perfil salvo para esta máquina, ou None se não existir / for de outra máquina."""
+    path = path or PROFILE_PATH
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != PROFILE_VERSION or data.get("host") != host_fingerprint():
+        return None
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", type=float, default=0.95, help="taxa de acerto mínima (0 a 1)")
+    parser.add_argument("--quick", action="store_true", help="grade e corpus reduzidos")
+    parser.add_argument("--profile", default=None, help=f"onde salvar (padrão: {PROFILE_PATH})")
+    args = parser.parse_args()
+
+    profile = calibrate(args.target, args.quick, verbose=True)
+    if profile is None:
+        print("Nenhuma configuração pôde ser avaliada.")
+        return
+    save_profile(profile, args.profile)
+    opts = profile["backend_options"].get("method", "")
+    print(f"\nEscolhido: {profile['backend']} {opts} buf={profile['buffer_size']} win=x{profile['window_factor']} "
+          f"dec={profile['decimation']} (acerto {profile['accuracy'] * 100:.1f}%, "
+          f"CPU {profile['cpu_load'] * 100:.3f}%)")
+
+
+if __name__ == "__main__":
+    main()
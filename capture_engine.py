@@ -0,0 +1,272 @@
+"""
+Captura multicanal: vários alunos cantando ao mesmo tempo.
+
+Um único stream (interface de áudio multicanal, WAV ou array) é lido por uma
+thread de captura. Cada bloco chega intercalado como (amostras, canais); o
+canal c é a view block[:, c], sem cópia. Cada canal tem o seu próprio
+PitchDetector (porteiro de voz, decimador e estimador independentes) e o seu
+PitchRing, então a UI lê engine.detectors[c].get_note() como leria o detector
+global do jogo.
+
+Os canais são repartidos entre workers (canal c vai para o worker
+c % workers, o que mantém a ordem dos blocos de cada canal). Com
+use_process=False os workers são threads; com use_process=True são processos
+filhos que leem os blocos de um ring de áudio em memória compartilhada (o
+stream nunca é copiado por canal) e publicam em PitchRings compartilhados.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from pitch_detector import PitchDetector, PitchRing, _attach_shared_memory
+
+BLOCK_SLOTS = 32  # blocos de áudio em trânsito no modo processo
+STOP_TIMEOUT = 1.0  # espera máxima pelo aviso de fim na fila de cada worker
+
+
+class AudioBlockRing:
+    """
+    Ring de blocos (amostras, canais) float32 em memória compartilhada.
+
+    Só a thread de captura escreve, e ela não espera os workers: com a fila
+    cheia ela continua escrevendo, então um slot pode ser reaproveitado a
+    qualquer momento. Cada slot guarda o seq do bloco que está nele (0 durante
+    a escrita); o worker copia o bloco e confere o seq antes e depois da cópia
+    (seqlock), descartando o bloco se ele foi sobrescrito no meio. A análise
+    usa a cópia, nunca a memória compartilhada.
+    """
+
+    def __init__(self, slots, block_size, channels, name=None, create=True):
+        self.slots = slots
+        self.shape = (slots, block_size, channels)
+        seq_bytes = slots * 8
+        nbytes = seq_bytes + int(np.prod(self.shape)) * 4
+        if create:
+            self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        else:
+            self._shm = _attach_shared_memory(name)
+        self._seq = np.ndarray((slots,), dtype="<u8", buffer=self._shm.buf)
+        self._data = np.ndarray(self.shape, dtype="<f4", buffer=self._shm.buf, offset=seq_bytes)
+        if create:
+            self._seq[:] = 0
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    def write(self, seq, block):
+        slot = seq % self.slots
+        self._seq[slot] = 0
+        self._data[slot] = block
+        self._seq[slot] = seq
+
+    def read(self, seq):
+        """Cópia do bloco seq, ou None se o slot já foi (ou foi durante a cópia) reaproveitado."""
+        slot = seq % self.slots
+        if int(self._seq[slot]) != seq:
+            return None
+        block = self._data[slot].copy()
+        if int(self._seq[slot]) != seq:
+            return None
+        return block
+
+    def close(self):
+        self._seq = None
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+
+    def unlink(self):
+        self._shm.unlink()
+
+
+def _make_detector(rate, settings):
+    detector = PitchDetector(**settings)
+    detector.RATE = rate
+    detector._check_decimation()
+    detector._reset_analysis()
+    return detector
+
+
+def _analyze_channels(detectors, channels, timestamp, block):
+    for channel in channels:
+        detector = detectors[channel]
+        try:
+            freq, confidence, voiced = detector._analyze(block[:, channel])
+        except Exception:
+            continue
+        detector._ring.publish(timestamp, freq, confidence, voiced)
+
+
+class CaptureEngine:
+    def __init__(self, source, workers=None, use_process=False, ring_capacity=256, max_blocks=8, **detector_options):
+        self.source = source
+        self.channels = source.channels
+        self.workers = max(1, min(workers or os.cpu_count() or 1, self.channels))
+        self.use_process = use_process
+        self.max_blocks = max_blocks
+        self._settings = {**detector_options, "ring_capacity": ring_capacity}
+        self.detectors = [_make_detector(source.rate, self._settings) for _ in range(self.channels)]
+        self.BUFFER_SIZE = self.detectors[0].BUFFER_SIZE
+        self.groups = [list(range(w, self.channels, self.workers)) for w in range(self.workers)]
+        self.dropped_blocks = 0
+        self.running = False
+        self._capture = None
+        self._workers = []
+        self._queues = []
+        self._audio = None
+
+    def _keep_running(self):
+        return self.running
+
+    def start(self):
+        if self.running:
+            return
+        self.running = True
+        self.dropped_blocks = 0
+        shared = self.use_process
+        for detector in self.detectors:
+            detector._ring = PitchRing(detector.ring_capacity, create=True, shared=shared)
+            detector._reset_analysis()
+
+        if self.use_process:
+            ctx = multiprocessing.get_context("spawn")
+            self._audio = AudioBlockRing(BLOCK_SLOTS, self.BUFFER_SIZE, self.channels)
+            # Fila menor que o ring: um worker em dia lê cada bloco antes de o slot
+            # voltar; um worker atrasado pode perder blocos (AudioBlockRing.read
+            # devolve None), mas nunca analisa um bloco sobrescrito
+            depth = min(self.max_blocks, BLOCK_SLOTS - 2)
+            for group in self.groups:
+                q = ctx.Queue(maxsize=depth)
+                rings = [self.detectors[c]._ring.name for c in group]
+                p = ctx.Process(target=_run_channel_worker,
+                                args=(self.source.rate, self._settings, group, rings, self._audio.name,
+                                      self._audio.shape, q),
+                                daemon=True)
+                p.start()
+                self._queues.append(q)
+                self._workers.append(p)
+        else:
+            for group in self.groups:
+                q = queue.Queue(maxsize=self.max_blocks)
+                t = threading.Thread(target=self._thread_worker, args=(group, q), daemon=True)
+                t.start()
+                self._queues.append(q)
+                self._workers.append(t)
+
+        self._capture = threading.Thread(target=self._capture_loop, daemon=True)
+        self._capture.start()
+
+    def _thread_worker(self, group, q):
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            timestamp, block = item
+            _analyze_channels(self.detectors, group, timestamp, block)
+
+    def _capture_loop(self):
+        live = self.source.live
+        hop_seconds = self.BUFFER_SIZE / self.source.rate
+        try:
+            for seq, block in enumerate(self.source.multichannel_blocks(self.BUFFER_SIZE, self._keep_running), 1):
+                timestamp = time.time() if live else seq * hop_seconds
+                if self._audio is not None:
+                    self._audio.write(seq, block)
+                    item = (seq, timestamp)
+                else:
+                    item = (timestamp, block)
+                for q, worker in zip(self._queues, self._workers):
+                    if not live:
+                        # Fonte offline: espera o worker em vez de perder blocos
+                        # (enquanto ele estiver vivo e a captura não for parada)
+                        while self.running and not _put(q, worker, item, 0.1):
+                            if not worker.is_alive():
+                                break
+                        continue
+                    try:
+                        q.put_nowait(item)
+                    except queue.Full:
+                        self.dropped_blocks += 1
+        except Exception as e:
+            print(f"Erro na captura: {e}")
+        finally:
+            # Um worker morto não esvazia a fila: o aviso de fim não bloqueia, e
+            # a captura termina mesmo assim (stop encerra o worker)
+            for q, worker in zip(self._queues, self._workers):
+                _put(q, worker, None, STOP_TIMEOUT)
+
+    def is_alive(self):
+        """True enquanto houver captura ou análise em andamento (fontes finitas terminam sozinhas)."""
+        return any(w.is_alive() for w in [self._capture, *self._workers] if w is not None)
+
+    def wait(self, timeout=None):
+        """Espera a fonte acabar e os workers esvaziarem as filas."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in [self._capture, *self._workers]:
+            if worker is not None:
+                worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not self.is_alive()
+
+    def stop(self):
+        self.running = False
+        if self._capture is not None:
+            self._capture.join(timeout=1.0)
+            self._capture = None
+        for worker in self._workers:
+            worker.join(timeout=2.0)
+            if self.use_process and worker.is_alive():
+                worker.terminate()
+        self._workers = []
+        self._queues = []
+        if self._audio is not None:
+            self._audio.close()
+            self._audio.unlink()
+            self._audio = None
+        for detector in self.detectors:
+            ring, detector._ring = detector._ring, None
+            if ring is not None:
+                ring.close()
+                ring.unlink()
+
+
+def _put(q, worker, item, timeout):
+    """Enfileira item esperando no máximo timeout; False se a fila continuou cheia ou o worker morreu."""
+    if not worker.is_alive():
+        return False
+    try:
+        q.put(item, timeout=timeout)
+    except queue.Full:
+        return False
+    return True
+
+
+def _run_channel_worker(rate, settings, channels, ring_names, audio_name, audio_shape, q):
+    """Ponto de entrada do processo worker: analisa os canais do seu grupo."""
+    audio = AudioBlockRing(audio_shape[0], audio_shape[1], audio_shape[2], name=audio_name, create=False)
+    detectors = {}
+    for channel, ring_name in zip(channels, ring_names):
+        detector = _make_detector(rate, settings)
+        detector._ring = PitchRing(detector.ring_capacity, name=ring_name, create=False, shared=True)
+        detectors[channel] = detector
+    try:
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            seq, timestamp = item
+            block = audio.read(seq)
+            if block is None:
+                continue
+            _analyze_channels(detectors, channels, timestamp, block)
+    finally:
+        for detector in detectors.values():
+            detector._ring.close()
+        audio.close()
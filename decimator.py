@@ -0,0 +1,51 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def lowpass_taps(num_taps, cutoff):
+    """
+    FIR passa-baixa por janela (sinc * Blackman).
+
+    cutoff é a frequência de corte normalizada pela taxa de amostragem
+    (0.5 = Nyquist). O ganho em DC é normalizado para 1.
+    """
+    n = np.arange(num_taps) - (num_taps - 1) / 2.0
+    taps = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(num_taps)
+    return taps / np.sum(taps)
+
+
+class Decimator:
+    """
+    Reduz a taxa de amostragem por um fator inteiro com filtro anti-aliasing.
+
+    Processa um bloco por chamada, de forma vetorizada: só as amostras que
+    sobrevivem à decimação são filtradas (um produto matricial sobre janelas
+    deslizantes). O histórico do filtro e a fase da decimação são mantidos
+    entre blocos, então a saída é contínua mesmo com blocos de tamanho
+    arbitrário.
+    """
+
+    def __init__(self, factor, num_taps=64, cutoff=0.8):
+        if factor < 1:
+            raise ValueError("factor deve ser >= 1")
+        self.factor = int(factor)
+        # Corte em 80% do novo Nyquist: a voz (e os harmônicos que o
+        # estimador usa) fica intacta e o que dobraria de volta é atenuado.
+        self._taps = lowpass_taps(num_taps, cutoff * 0.5 / self.factor)[::-1].astype(np.float32)
+        self.reset()
+
+    def reset(self):
+        self._history = np.zeros(len(self._taps) - 1, dtype=np.float32)
+        self._phase = 0
+
+    def __call__(self, block):
+        block = np.asarray(block, dtype=np.float32)
+        if self.factor == 1:
+            return block
+        x = np.concatenate((self._history, block))
+        # A janela j termina na amostra j do bloco atual
+        windows = sliding_window_view(x, len(self._taps))[self._phase::self.factor]
+        out = windows @ self._taps
+        self._phase = self._phase + self.factor * len(out) - len(block)
+        self._history = x[len(x) - len(self._history):]
+        return out
@@ -2,14 +2,22 @@ import pygame
 import numpy as np
 import threading
 import time
-import pyaudio
-import aubio
 import math
-import random
+import multiprocessing
+from functools import lru_cache
 from utils import calculate_similarity, is_similar_enough
-
-# IMPORTAÇÃO DA NOVA ESTRUTURA
-from Musicas import BIBLIOTECA, Musica
+from pitch_detector import PitchDetector
+from note_table import get_note_table, NOTE_NAMES
+from stability import StabilityEvaluator, CONFIRMED, HOLDING, WRONG
+from phrase import score_track
+from pitch_trace import PitchTrace
+from game_state import GameStore
+import title_match
+import song_scheduler
+import transposition
+
+# IMPORTAÇÃO DA NOVA ESTRUTURA (Musicas.BIBLIOTECA só é aberta na primeira rodada)
+import Musicas
 button_cooldown_until = 0
 
 # ==============================================================================
@@ -24,86 +32,61 @@ A4_TUNING = 440.0
 TUNING_OFFSET = 0  
 TUNING_MULTIPLIER = 2 ** (TUNING_OFFSET / 12.0)
 
+# Roda captura + análise de pitch num processo filho (resultados via memória
+# compartilhada) em vez de uma thread disputando o GIL com o render
+DETECTOR_IN_PROCESS = False
+# Só roda o aubio nos blocos em que o porteiro de voz (RMS + flatness) detecta canto
+DETECTOR_VAD = True
+# Decima o áudio antes do aubio (44100/4 = 11025 Hz); a voz fica bem abaixo do novo Nyquist
+DETECTOR_DECIMATION = 4
+# Estimador de pitch: "aubio", "yin" (NumPy puro) ou "auto" (aubio se estiver instalado)
+DETECTOR_BACKEND = "auto"
+# Usa o perfil calibrado desta máquina (calibration.py), sobrescrevendo as opções
+# acima; se ainda não existir, calibra em segundo plano na primeira execução
+DETECTOR_AUTO_TUNE = True
+# Pasta onde cada sessão do detector é gravada (WAV float32); None desliga a gravação
+RECORDINGS_DIR = None
+# Modo frase: em vez de segurar uma nota, canta de uma vez as notas reveladas
+# mais a próxima; a frase é segmentada e alinhada por DTW (phrase.py)
+PHRASE_MODE = False
+# Fração das notas da frase que precisa estar certa para desbloquear a próxima
+PHRASE_PASS_RATIO = 0.8
+# Tempo de escuta = duração da frase x fator + folga (o aluno pode cantar mais devagar)
+PHRASE_TIME_FACTOR = 1.5
+PHRASE_MARGIN = 2.0
+# Extensão vocal de quem canta (transposition.py, escolhida nas configurações):
+# cada música é transposta em oitavas para caber nela e a nota só vale na
+# oitava pedida. None toca na oitava original e aceita a nota em qualquer oitava.
+# Lida do disco em init()
+singer_profile = None
+
 # ==============================================================================
-# 1. CLASSE PITCH DETECTOR
+# 1. PITCH DETECTOR
 # ==============================================================================
-class PitchDetector:
-    def __init__(self):
-        self.BUFFER_SIZE = 8192
-        self.FORMAT = pyaudio.paFloat32
-        self.CHANNELS = 1
-        self.RATE = 44100 
-        self.A4 = A4_TUNING
-        self.NOTAS = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-        self.running = False
-        self.current_note = None
-        self.current_freq = 0.0
-        self._thread = None
-
-    def _freq_para_nota(self, freq):
-        if freq <= 0: return None
-        try:
-            n = 12 * math.log2(freq / self.A4) + 69
-            n_round = int(round(n))
-            nome = self.NOTAS[n_round % 12]
-            oitava = (n_round // 12) - 1
-            return f"{nome}{oitava}"
-        except ValueError:
-            return None
+# Criados em init(), como tudo que só o jogo aberto usa: com DETECTOR_IN_PROCESS
+# o processo filho (spawn) reimporta este arquivo como __mp_main__, e o nível do
+# módulo não pode inicializar pygame, fontes, detectores nem a biblioteca
+detector = None
+phrase_detector = None  # modo frase
+
+def start_auto_tune():
+    """Aplica o perfil salvo ou dispara a calibração rápida numa thread."""
+    if detector.load_profile():
+        return
 
-    def _listen_loop(self):
-        p = pyaudio.PyAudio()
-        pitch_detector = aubio.pitch("default", self.BUFFER_SIZE*4, self.BUFFER_SIZE, self.RATE)
-        pitch_detector.set_unit("Hz")
+    def run():
+        from calibration import calibrate, save_profile
+        profile = calibrate(quick=True)
+        if profile is not None:
+            save_profile(profile)
+            detector.apply_profile(profile)
 
-        try:
-            stream = p.open(format=self.FORMAT, channels=self.CHANNELS, rate=self.RATE, input=True, frames_per_buffer=self.BUFFER_SIZE)
-            while self.running:
-                try:
-                    audio_data = stream.read(self.BUFFER_SIZE, exception_on_overflow=False)
-                    samples = np.frombuffer(audio_data, dtype=np.float32)
-                    freq = pitch_detector(samples)[0]
-                    self.current_freq = float(freq)
-                    self.current_note = self._freq_para_nota(freq)
-                except Exception:
-                    pass
-        except Exception as e:
-            print(f"Erro no detector: {e}")
-        finally:
-            if 'stream' in locals():
-                stream.stop_stream()
-                stream.close()
-            p.terminate()
-
-    def start(self):
-        if not self.running:
-            self.running = True
-            self._thread = threading.Thread(target=self._listen_loop, daemon=True)
-            self._thread.start()
-
-    def stop(self):
-        self.running = False
-        if self._thread:
-            self._thread.join(timeout=1.0)
-            self._thread = None
-        self.current_note = None
-        self.current_freq = 0.0
-
-    def get_note(self): return self.current_note
-    def get_freq(self): return self.current_freq
-
-detector = PitchDetector()
+    threading.Thread(target=run, daemon=True).start()
 
 # ==============================================================================
 # 2. INICIALIZAÇÃO E UI
 # ==============================================================================
-# Aumentei o buffer para 4096 para evitar "estalos" (crackling)
-pygame.mixer.pre_init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=4096)
-pygame.init()
-
 WIDTH, HEIGHT = 1000, 700
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Solfejo - Jogo Musical Interativo")
 
 # Cores - Tema Gradiente Roxo-Azul
 BG_DARK = (20, 15, 35)  # Roxo escuro base
@@ -182,23 +165,10 @@ def get_font(name, size, bold=False):
     # Fallback final: fonte padrão do pygame
     return pygame.font.Font(None, size)
 
-# Inicializa as fontes com Montserrat (ou fallback)
-FONT_TITLE = get_font("Montserrat", 72, bold=True)  # Aumentado de 56 para 72
-FONT_TITLE_LARGE = get_font("Montserrat", 96, bold=True)  # Fonte extra grande para animação
-FONT_SUBTITLE = get_font("Montserrat", 32, bold=True)
-FONT_HEADING = get_font("Montserrat", 28, bold=True)
-FONT = get_font("Montserrat", 22, bold=False)
-FONT_SMALL = get_font("Montserrat", 18, bold=False)
-FONT_TINY = get_font("Montserrat", 14, bold=False)
-CLOCK = pygame.time.Clock()
-
-# Tabela de Frequências Base
-NOTAS = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
-NOTE_FREQS = {}
-for i, nome in enumerate(NOTAS):
-    distancia = i - 9
-    freq = A4_TUNING * (2 ** (distancia / 12.0))
-    NOTE_FREQS[nome] = freq
+# Fontes (Montserrat ou fallback), relógio e gráfico do detector: criados em init()
+FONT_TITLE = FONT_TITLE_LARGE = FONT_SUBTITLE = FONT_HEADING = FONT = FONT_SMALL = FONT_TINY = None
+CLOCK = None
+pitch_trace = None
 
 # ==============================================================================
 # 3. SINTETIZADOR DE PIANO CORRIGIDO (LIMITER + VOLUME BAIXO)
@@ -290,7 +260,6 @@ class Button:
 
 played_notes = []
 played_past_notes = []
-currently_playing = False
 
 # Função para desenhar gradiente
 def draw_gradient(surf, rect, color_start, color_end, vertical=True):
@@ -391,29 +360,39 @@ def cents_difference(freq, target_freq):
     return 1200 * math.log2(freq / target_freq)
 
 
-def draw_needle_gauge(surf, rect, current_freq, target_freq, tolerance_hz=None, min_freq=0.0, max_freq=500.0):
-    """Mostra uma agulha absoluta de 0 Hz a 400 Hz, destacando a posição do alvo."""
-    rect = pygame.Rect(rect)
-    pygame.draw.rect(surf, BG_CARD, rect, border_radius=16)
-    pygame.draw.rect(surf, GRAY_700, rect, width=1, border_radius=16)
+def _gauge_geometry(rect):
+    """(bar_x, bar_y, bar_w, bar_h) da barra dentro do card do medidor."""
+    return rect.x + 30, rect.y + rect.h // 2 - 6, rect.w - 60, 12
 
-    # Normaliza limites
+
+def _gauge_range(min_freq, max_freq):
     min_f = max(0.0, float(min_freq))
     max_f = max(min_f + 1.0, float(max_freq))  # evita divisão por zero
-    span = max_f - min_f
+    return min_f, max_f
 
-    # Valores atuais
-    curr = None if current_freq is None or current_freq <= 0 else float(current_freq)
-    tgt = None if target_freq is None or target_freq <= 0 else float(target_freq)
 
-    tol = tolerance_hz if tolerance_hz is not None else 5.0
+GAUGE_COLORKEY = (255, 0, 255)
+
 
-    bar_x = rect.x + 30
-    bar_w = rect.w - 60
-    bar_y = rect.y + rect.h // 2 - 6
-    bar_h = 12
+@lru_cache(maxsize=32)
+def _gauge_background(size, min_f, max_f, tgt, tol):
+    """
+    Parte estática do medidor (card, borda, barra, faixa de tolerância,
+    marcador do alvo e rótulos), desenhada uma vez por combinação de
+    tamanho, faixa, alvo e tolerância.
+    """
+    # Colorkey em vez de alfa por pixel: os cantos arredondados são o único
+    # trecho transparente e o blit com RLE custa uma fração do blit com alfa
+    layer = pygame.Surface(size)
+    layer.fill(GAUGE_COLORKEY)
+    layer.set_colorkey(GAUGE_COLORKEY, pygame.RLEACCEL)
+    rect = layer.get_rect()
+    pygame.draw.rect(layer, BG_CARD, rect, border_radius=16)
+    pygame.draw.rect(layer, GRAY_700, rect, width=1, border_radius=16)
 
-    pygame.draw.rect(surf, GRAY_800, (bar_x, bar_y, bar_w, bar_h), border_radius=8)
+    span = max_f - min_f
+    bar_x, bar_y, bar_w, bar_h = _gauge_geometry(rect)
+    pygame.draw.rect(layer, GRAY_800, (bar_x, bar_y, bar_w, bar_h), border_radius=8)
 
     # Faixa verde em torno do alvo
     if tgt is not None:
@@ -422,29 +401,72 @@ def draw_needle_gauge(surf, rect, current_freq, target_freq, tolerance_hz=None,
         tol_right = min(max_f, tgt_clamped + tol)
         tol_px_start = bar_x + int((tol_left - min_f) / span * bar_w)
         tol_px_end = bar_x + int((tol_right - min_f) / span * bar_w)
-        pygame.draw.rect(surf, SUCCESS, (tol_px_start, bar_y, tol_px_end - tol_px_start, bar_h), border_radius=8)
+        pygame.draw.rect(layer, SUCCESS, (tol_px_start, bar_y, tol_px_end - tol_px_start, bar_h), border_radius=8)
 
-    # Agulha (frequência atual)
-    if curr is not None:
-        curr_clamped = max(min_f, min(max_f, curr))
-        needle_x = bar_x + int((curr_clamped - min_f) / span * bar_w)
-        pygame.draw.line(surf, WARNING, (needle_x, bar_y - 14), (needle_x, bar_y + bar_h + 14), 3)
-        pygame.draw.circle(surf, WHITE, (needle_x, bar_y + bar_h + 16), 6)
-
-    # Marcador do alvo
-    if tgt is not None:
+        # Marcador do alvo
         target_x = bar_x + int((tgt_clamped - min_f) / span * bar_w)
-        pygame.draw.line(surf, ACCENT, (target_x, bar_y - 10), (target_x, bar_y + bar_h + 10), 2)
-        pygame.draw.circle(surf, ACCENT, (target_x, bar_y - 12), 4)
+        pygame.draw.line(layer, ACCENT, (target_x, bar_y - 10), (target_x, bar_y + bar_h + 10), 2)
+        pygame.draw.circle(layer, ACCENT, (target_x, bar_y - 12), 4)
 
     label_font = FONT_TINY
     left = label_font.render(f"{min_f:.0f} Hz", True, TEXT_SECONDARY)
     mid_val = (min_f + max_f) / 2
     mid = label_font.render(f"{mid_val:.0f} Hz", True, TEXT_SECONDARY)
     right = label_font.render(f"{max_f:.0f} Hz", True, TEXT_SECONDARY)
-    surf.blit(left, (bar_x, bar_y + 20))
-    surf.blit(mid, (bar_x + (bar_w - mid.get_width()) // 2, bar_y + 20))
-    surf.blit(right, (bar_x + bar_w - right.get_width(), bar_y + 20))
+    layer.blit(left, (bar_x, bar_y + 20))
+    layer.blit(mid, (bar_x + (bar_w - mid.get_width()) // 2, bar_y + 20))
+    layer.blit(right, (bar_x + bar_w - right.get_width(), bar_y + 20))
+    return layer
+
+
+def draw_needle_gauge(surf, rect, current_freq, target_freq, tolerance_hz=None, min_freq=0.0, max_freq=500.0):
+    """Mostra uma agulha absoluta de 0 Hz a 400 Hz, destacando a posição do alvo."""
+    rect = pygame.Rect(rect)
+    min_f, max_f = _gauge_range(min_freq, max_freq)
+    tgt = None if target_freq is None or target_freq <= 0 else round(float(target_freq), 2)
+    tol = tolerance_hz if tolerance_hz is not None else 5.0
+
+    # Fundo em cache; por frame só a agulha é desenhada
+    surf.blit(_gauge_background(rect.size, min_f, max_f, tgt, tol), rect)
+
+    curr = None if current_freq is None or current_freq <= 0 else float(current_freq)
+    if curr is not None:
+        bar_x, bar_y, bar_w, bar_h = _gauge_geometry(rect)
+        curr_clamped = max(min_f, min(max_f, curr))
+        needle_x = bar_x + int((curr_clamped - min_f) / (max_f - min_f) * bar_w)
+        pygame.draw.line(surf, WARNING, (needle_x, bar_y - 14), (needle_x, bar_y + bar_h + 14), 3)
+        pygame.draw.circle(surf, WHITE, (needle_x, bar_y + bar_h + 16), 6)
+
+
+class NeedleSmoother:
+    """
+    Suaviza a agulha do medidor: quando chega uma leitura nova do detector, a
+    agulha desliza da posição atual até ela ao longo de duration segundos (o
+    intervalo entre frames do detector) em vez de saltar.
+    """
+    def __init__(self, duration=0.2):
+        self.duration = duration
+        self.value = None
+        self._start = None
+        self._end = None
+        self._t0 = 0.0
+
+    def update(self, freq, now=None):
+        """Valor a desenhar neste frame da tela (None = sem agulha)."""
+        now = time.perf_counter() if now is None else now
+        if freq is None or freq <= 0:
+            self.value = self._start = self._end = None
+            return None
+        if self._end is None:
+            self.value = self._start = self._end = freq
+        elif freq != self._end:
+            self._start, self._end, self._t0 = self.value, freq, now
+        progress = min(1.0, (now - self._t0) / self.duration) if self.duration > 0 else 1.0
+        self.value = self._start + (self._end - self._start) * progress
+        return self.value
+
+# Agulha suavizada do medidor da tela do detector
+needle_smoother = NeedleSmoother()
 
 def synth_piano_note(base_freq, duration=1.0, volume=0.3): # Volume padrão reduzido para 0.3
     """
@@ -488,15 +510,17 @@ def synth_piano_note(base_freq, duration=1.0, volume=0.3): # Volume padrão redu
     stereo = np.column_stack((wave, wave))
     return stereo
 
-def play_note(freq, duration, record=True):
-    global currently_playing
-    currently_playing = True
+# Notas e buffers de cada música já transposta para o cantor (sintetizados uma vez)
+song_cache = transposition.TranspositionCache(synth_piano_note)
+
+def play_note(freq, duration, record=True, buffer=None):
+    game_state.post(currently_playing=True)
     
     if record:
         played_notes.append((float(freq), duration))
     
     try:
-        stereo_buf = synth_piano_note(freq, duration)
+        stereo_buf = synth_piano_note(freq, duration) if buffer is None else buffer
         
         if stereo_buf is not None:
             snd = pygame.sndarray.make_sound(stereo_buf)
@@ -517,144 +541,199 @@ def play_note(freq, duration, record=True):
         time.sleep(duration)
     
     time.sleep(0.05)
-    currently_playing = False
+    game_state.post(currently_playing=False)
+
+def play_song_note(song, k, record=True):
+    """Toca a k-ésima nota da música transposta (transposition.Transposed) com o buffer guardado."""
+    play_note(float(song.freqs[k]), float(song.duracoes[k]), record, song_cache.buffer(song, k))
 
 
 # ==============================================================================
 # 4. LÓGICA DO DETECTOR
 # ==============================================================================
-def detector_process(target_note_name):
-    global message, detected_name, detected_freq, detector_result, detected_deviation_hz
-
+def detector_process(target_note_name, target_midi=None):
+    game_state.post(detected_name=None, detected_freq=None, detector_result=None, detected_deviation_cents=None)
     detected_name = None
-    detected_freq = None
-    detector_result = None
-    detected_deviation_hz = None
 
-    while currently_playing:
+    while game_state.get("currently_playing"):
         time.sleep(0.01)
 
-    detector.start()
-    message = "Prepare-se... Cante e SEGURE a nota!"
-    target_freq = NOTE_FREQS.get(target_note_name)
-    tolerance_hz = 30.0
+    detector.start(tag=target_note_name)
+    game_state.post(message="Prepare-se... Cante e SEGURE a nota!")
+    # Consultada a cada sessão: se A4_TUNING/TUNING_OFFSET mudarem, vem outra tabela
+    note_table = get_note_table(A4_TUNING, TUNING_OFFSET)
+    target_freq = note_table.freq(target_note_name) if target_midi is None else note_table.freqs[target_midi]
+    evaluator = StabilityEvaluator(target_note_name, REQUIRED_STABILITY, note_table, target_midi)
     
     session_start_time = time.time()
-    stable_start_time = None 
     found_match = False
     
     while time.time() - session_start_time < LISTEN_DURATION:
-        note_completa = detector.get_note()
-        freq = detector.get_freq()
+        status = evaluator.update(time.time(), detector.get_freq())
+        detected_deviation_cents = status.deviation_cents
+        changes = {"detected_deviation_cents": detected_deviation_cents}
         
-        if note_completa:
-            detected_name = note_completa
-            detected_freq = freq
-            detected_deviation_hz = (freq - target_freq) if target_freq else None
-            note_only_name = ''.join([c for c in note_completa if not c.isdigit()])
-            within_tolerance = (note_only_name == target_note_name)
-
-
-            if within_tolerance:
-                if stable_start_time is None:
-                    stable_start_time = time.time()
-
-                elapsed = time.time() - stable_start_time
-                message = f"Mantenha por {REQUIRED_STABILITY - elapsed:.1f}s" if elapsed < REQUIRED_STABILITY else "Nota estável!"
-
-                if elapsed >= REQUIRED_STABILITY:
-                    detector_result = True
-                    message = f"Nota {target_note_name} confirmada."
-                    found_match = True
-                    break
+        if status.info:
+            detected_name = note_table.names[status.info.midi]
+            changes.update(detected_name=detected_name, detected_freq=status.freq)
+
+        if status.state == CONFIRMED:
+            game_state.post(**changes, detector_result=True, message=f"Nota {target_note_name} confirmada.")
+            found_match = True
+            break
+        elif status.state == HOLDING:
+            message = f"Mantenha por {REQUIRED_STABILITY - status.held:.1f}s"
+        elif status.state == WRONG:
+            if detected_deviation_cents is None:
+                message = f"Detectado: {detected_name}. Alvo: {target_note_name}"
             else:
-                stable_start_time = None
-                if detected_deviation_hz is None:
-                    message = f"Detectado: {detected_name}. Alvo: {target_note_name}"
-                else:
-                    direction = "Suba" if detected_deviation_hz < 0 else "Desça"
-                    message = f"{direction} {abs(detected_deviation_hz):.2f} Hz até {target_note_name}"
+                direction = "Suba" if detected_deviation_cents < 0 else "Desça"
+                message = f"{direction} {abs(detected_deviation_cents):.0f} cents até {target_note_name}"
         else:
-            stable_start_time = None
-            detected_deviation_hz = None
             if target_freq:
                 message = f"Silêncio... alvo {target_note_name} ({target_freq:.1f} Hz)"
             else:
                 message = "Silêncio..."
+        game_state.post(**changes, message=message)
         
         time.sleep(0.05)
 
     detector.stop()
 
     if not found_match:
-        detector_result = False
-        message = "Tempo esgotado."
+        game_state.post(detector_result=False, message="Tempo esgotado.")
+
+def phrase_process(notes, target_midi=None):
+    game_state.post(detected_name=None, detected_freq=None, detector_result=None, detected_deviation_cents=None)
+
+    while game_state.get("currently_playing"):
+        time.sleep(0.01)
+
+    phrase_detector.start(tag="frase")
+    note_table = get_note_table(A4_TUNING, TUNING_OFFSET)
+    listen = sum(d for _, d in notes) * PHRASE_TIME_FACTOR + PHRASE_MARGIN
 
-def start_detector_thread(target_note):
-    t = threading.Thread(target=detector_process, args=(target_note,), daemon=True)
+    session_start_time = time.time()
+    while time.time() - session_start_time < listen and phrase_detector.running:
+        freq = phrase_detector.get_freq()
+        info = note_table.lookup(freq)
+        changes = {"message": f"Cante a frase! {listen - (time.time() - session_start_time):.1f}s"}
+        if info:
+            changes.update(detected_name=note_table.names[info.midi], detected_freq=freq)
+        game_state.post(**changes)
+        time.sleep(0.05)
+
+    ring = phrase_detector.ring
+    frames = ring.snapshot() if ring is not None else None
+    phrase_detector.stop()
+    if frames is None:
+        return
+
+    scores = score_track(frames["timestamp"], frames["freq"], notes, note_table, target_midi)
+    hits = sum(s.passed for s in scores)
+    missed = [s.target for s in scores if not s.passed]
+    message = f"Frase: {hits}/{len(notes)} notas certas."
+    if missed:
+        message += " Erradas: " + " ".join(missed[:6])
+    game_state.post(detector_result=hits >= PHRASE_PASS_RATIO * len(notes), message=message)
+
+def song_target(k):
+    """(nome, nota MIDI) da k-ésima nota: com oitava se houver cantor, senão só a classe (MIDI None)."""
+    if singer_profile is None:
+        return current_song_seq[k][0], None
+    midi = int(current_song.midi[k])
+    return NOTE_NAMES[midi], midi
+
+def song_phrase(count):
+    """(notas, notas MIDI) das count primeiras notas, como song_target: oitava só se houver cantor."""
+    if singer_profile is None:
+        return current_song_seq[:count], None
+    midi = current_song.midi[:count].tolist()
+    return [(NOTE_NAMES[m], d) for m, d in zip(midi, current_song.duracoes[:count].tolist())], midi
+
+def start_detector_thread(target_note, target_midi=None):
+    if PHRASE_MODE:
+        t = threading.Thread(target=phrase_process, args=song_phrase(game_state.get("current_index") + 1), daemon=True)
+    else:
+        t = threading.Thread(target=detector_process, args=(target_note, target_midi), daemon=True)
     t.start()
 
 # ==============================================================================
 # 5. UI E LOOP
 # ==============================================================================
 state = "menu"
-lives = 3
-score = 0
 
-current_song_data = None    
+current_song_index = None
+current_song_data = None
+current_song = None         # música transposta para o cantor (transposition.Transposed)
 current_song_seq = []       
-current_index = 0
 
-message = ""
+# Estado lido pelo render e escrito pelas threads de detector e de reprodução:
+# elas enfileiram mudanças (game_state.post) e o loop principal as aplica a
+# cada frame; quem desenha lê game_state.snapshot()
+game_state = GameStore(
+    message="",
+    detected_name=None,
+    detected_freq=None,
+    detected_deviation_cents=None,
+    detector_result=None,
+    currently_playing=False,
+    current_index=0,
+    score=0,
+    lives=3,
+)
+
 user_text = ""
 input_active = False
 guess_modal_open = False
-currently_playing = False
-detected_name = None
-detected_freq = None
-detected_deviation_hz = None
-detector_result = None
+# Sugestões de nome no modal de adivinhar: [(índice, nome)], a destacada
+# (setas) e os retângulos desenhados (cliques)
+guess_suggestions = []
+guess_selected = -1
+suggestion_rects = []
+GUESS_MODAL_SIZE = (600, 470)
+SUGGESTION_ROW = 32
 show_success_animation = False
 success_animation_start_time = 0
 SUCCESS_ANIMATION_DURATION = 2.0  # Duração em segundos
+# Telas com animação contínua; as outras só são redesenhadas quando chega um
+# evento ou o estado do jogo muda
+ANIMATED_SCREENS = ("menu", "play", "detector")
 
-btn_start = Button("INICIAR", (WIDTH//2 - 160, 220, 320, 70), color=ACCENT, font=FONT_HEADING)
-btn_rules = Button("REGRAS", (WIDTH//2 - 160, 310, 320, 60), color=(100, 70, 150), hover=(120, 90, 170), font=FONT)
-btn_conf = Button("CONFIGURAÇÕES", (WIDTH//2 - 160, 390, 320, 60), color=(100, 70, 150), hover=(120, 90, 170), font=FONT)
-btn_back = Button("VOLTAR", (30, HEIGHT-80, 140, 50), color=GRAY_700, hover=(100, 90, 130), font=FONT_SMALL)
-btn_menu = Button("MENU", (WIDTH-180, HEIGHT-80, 150, 50), color=DANGER, hover=DANGER_HOVER, font=FONT_SMALL)
-
-btn_repeat = Button("Repetir Notas", (60, 280, 300, 60), color=(80, 60, 120), hover=(100, 80, 140))
-btn_action_sing = Button("CANTAR NOTA", (60, 360, 300, 60), color=WARNING)
-btn_guess = Button("ADVINHAR MÚSICA", (60, 440, 300, 60), color=ACCENT)
-
-btn_play_target = Button("Ouvir Nota Alvo", (WIDTH-280, 140, 240, 55), color=WARNING)
-btn_start_listen = Button("Gravar (Mic)", (WIDTH-280, 215, 240, 55), color=SUCCESS)
-btn_skip_confirm = Button("Confirmar", (WIDTH-280, 290, 240, 55), color=ACCENT)
+# Botões das telas: criados em init(), depois das fontes
+btn_start = btn_rules = btn_conf = btn_back = btn_singer = btn_menu = None
+btn_repeat = btn_action_sing = btn_guess = None
+btn_play_target = btn_start_listen = btn_skip_confirm = None
 
 # Botões do modal de adivinhar música (serão criados dinamicamente)
 btn_modal_confirm = None
 btn_modal_cancel = None
 
 
-def start_round(force_new=False):
-    global current_song_data, current_song_seq, current_index, message, played_notes, played_past_notes
+def update_guess_suggestions(reset=False):
+    """Atualiza as sugestões a partir do texto digitado (incremental, veja title_match.TitleCompleter)."""
+    global guess_suggestions, guess_selected
+    completer = title_match.completer()
+    if reset:
+        completer.reset()
+    guess_suggestions = completer.update(user_text)
+    guess_selected = -1
+
+
+def start_round():
+    global current_song_index, current_song_data, current_song, current_song_seq, played_notes, played_past_notes
     
-    # Se force_new=True, escolhe uma música diferente da atual
-    if force_new and current_song_data and len(BIBLIOTECA) > 1:
-        nova_musica = random.choice(BIBLIOTECA)
-        # Continua escolhendo até encontrar uma música diferente
-        while nova_musica == current_song_data:
-            nova_musica = random.choice(BIBLIOTECA)
-        current_song_data = nova_musica
-    else:
-        current_song_data = random.choice(BIBLIOTECA)
+    # O sorteador nunca repete as últimas músicas (veja song_scheduler), então
+    # a nova rodada sempre traz uma música diferente da atual
+    # Sorteia pelo índice (só metadados); as notas são lidas só da escolhida
+    current_song_index = song_scheduler.scheduler().next()
+    current_song_data = Musicas.BIBLIOTECA[current_song_index]
     
     current_song_seq = current_song_data.notas 
-    current_index = 0
+    current_song = song_cache.prepare(current_song_index, current_song_data, singer_profile, A4_TUNING)
     played_notes = []
     played_past_notes = []
-    message = "Ouça a primeira nota ou tente advinhar a música."
+    game_state.set(current_index=0, message="Ouça a primeira nota ou tente advinhar a música.")
 
 def draw_note_symbol(surf, x, y, size=30, color=(255, 255, 255)):
     """Desenha uma nota musical decorativa"""
@@ -865,6 +944,14 @@ def draw_settings():
     desc_surf = FONT_SMALL.render("Ajuste fino da afinação base (A4 = 440Hz)", True, TEXT_SECONDARY)
     screen.blit(desc_surf, (card_rect.x + 40, y + 85))
 
+    # Voz de quem canta (extensão para a transposição das músicas)
+    singer_x = WIDTH // 2 + 20
+    label_surf = FONT.render("Voz de quem canta", True, TEXT_PRIMARY)
+    screen.blit(label_surf, (singer_x, y))
+    value_surf = FONT.render(transposition.describe(singer_profile), True, ACCENT)
+    screen.blit(value_surf, (singer_x, y + 40))
+    btn_singer.draw(screen)
+
     # Informações adicionais
     y += 160
     pygame.draw.line(screen, GRAY_700, (card_rect.x + 40, y), (card_rect.right - 40, y), 1)
@@ -885,6 +972,79 @@ def draw_settings():
 
     btn_back.draw(screen)
 
+# A escala do card pulsa entre 0.8 e 1.2; o atlas guarda um card (e um ✓)
+# pré-renderizado por degrau desse intervalo
+SUCCESS_PULSE = 0.2
+SUCCESS_SCALE_STEPS = 13
+SUCCESS_STAR_COUNT = 12
+SUCCESS_STAR_SIZES = range(7, 23)  # raios possíveis de int(15 * (1 ± 0.5))
+
+
+class SuccessAtlas:
+    """
+    Sprites da animação de acerto, renderizados uma vez na inicialização:
+    overlay verde da tela inteira, cards com gradiente e ✓ em cada escala
+    quantizada, o texto com sombra e as estrelas em cada raio inteiro. Por
+    frame a animação só ajusta o alfa dos sprites e faz blits.
+    """
+    CARD_SIZE = (500, 250)
+
+    def __init__(self):
+        self.overlay = pygame.Surface((WIDTH, HEIGHT))
+        self.overlay.fill((0, 255, 100))
+
+        self.scales = [1.0 - SUCCESS_PULSE + 2 * SUCCESS_PULSE * k / (SUCCESS_SCALE_STEPS - 1)
+                       for k in range(SUCCESS_SCALE_STEPS)]
+        self.cards = [self._card(scale) for scale in self.scales]
+        self.checks = [get_font("Montserrat", int(80 * scale), bold=True).render("✓", True, (255, 255, 255))
+                       for scale in self.scales]
+
+        success_surf = FONT_TITLE.render("NOTA ACERTADA!", True, (255, 255, 255))
+        success_shadow = FONT_TITLE.render("NOTA ACERTADA!", True, (0, 0, 0))
+        self.text = pygame.Surface(success_surf.get_size(), pygame.SRCALPHA)
+        self.text.blit(success_shadow, (2, 2))
+        self.text.blit(success_surf, (0, 0))
+
+        # Estrelas opacas com colorkey: o alfa de cada frame vem de set_alpha
+        self.stars = {}
+        for size in SUCCESS_STAR_SIZES:
+            star = pygame.Surface((size * 2, size * 2))
+            star.set_colorkey((0, 0, 0))
+            pygame.draw.circle(star, (255, 255, 255), (size, size), size)
+            self.stars[size] = star
+
+    def _card(self, scale):
+        width, height = int(self.CARD_SIZE[0] * scale), int(self.CARD_SIZE[1] * scale)
+        card = pygame.Surface((width, height))
+        card_rect = card.get_rect()
+        draw_gradient(card, card_rect, (50, 255, 150), (80, 220, 120), vertical=True)
+        pygame.draw.rect(card, (100, 255, 180), card_rect, width=4, border_radius=25)
+        return card
+
+    def step(self, pulse):
+        """Índice do degrau de escala mais próximo de pulse."""
+        k = round((pulse - (1.0 - SUCCESS_PULSE)) / (2 * SUCCESS_PULSE) * (SUCCESS_SCALE_STEPS - 1))
+        return min(max(k, 0), SUCCESS_SCALE_STEPS - 1)
+
+    @staticmethod
+    def faded(surf, alpha):
+        """
+        Aplica o alfa da animação. Numa Surface sem alfa por pixel, opaco vira
+        None: set_alpha(255) ainda passaria pelo blit com mistura.
+        """
+        if alpha >= 255 and not surf.get_flags() & pygame.SRCALPHA:
+            alpha = None
+        surf.set_alpha(alpha)
+        return surf
+
+    def star(self, size):
+        size = min(max(size, SUCCESS_STAR_SIZES.start), SUCCESS_STAR_SIZES.stop - 1)
+        return self.stars[size]
+
+# Construído uma vez em init(), depois das fontes, para que o primeiro acerto não pague a renderização
+success_atlas = None
+
+
 def draw_success_animation():
     """Desenha uma animação visual quando o jogador acerta uma nota"""
     global show_success_animation, success_animation_start_time
@@ -911,78 +1071,35 @@ def draw_success_animation():
     
     # Calcula o tamanho pulsante da animação
     pulse_speed = 0.02
-    pulse = 1.0 + math.sin(pygame.time.get_ticks() * pulse_speed) * 0.2
+    pulse = 1.0 + math.sin(current_time * pulse_speed) * SUCCESS_PULSE
+    step = success_atlas.step(pulse)
     
     # Overlay semi-transparente verde
-    overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-    overlay_alpha = int(30 * (alpha / 255))
-    overlay.fill((0, 255, 100, overlay_alpha))
-    screen.blit(overlay, (0, 0))
-    
-    # Card central com mensagem de sucesso
-    card_width = 500
-    card_height = 250
-    card_x = (WIDTH - card_width) // 2
-    card_y = (HEIGHT - card_height) // 2
-    
-    # Efeito de escala pulsante
-    scale = pulse
-    scaled_width = int(card_width * scale)
-    scaled_height = int(card_height * scale)
-    scaled_x = (WIDTH - scaled_width) // 2
-    scaled_y = (HEIGHT - scaled_height) // 2
+    screen.blit(success_atlas.faded(success_atlas.overlay, int(30 * (alpha / 255))), (0, 0))
     
-    # Card com gradiente verde
-    card_surf = pygame.Surface((scaled_width, scaled_height), pygame.SRCALPHA)
-    card_rect = pygame.Rect(0, 0, scaled_width, scaled_height)
-    
-    # Gradiente verde brilhante
-    color_start = (50, 255, 150)
-    color_end = (80, 220, 120)
-    draw_gradient(card_surf, card_rect, color_start, color_end, vertical=True)
-    
-    # Borda brilhante
-    pygame.draw.rect(card_surf, (100, 255, 180, alpha), card_rect, width=4, border_radius=25)
-    
-    card_surf.set_alpha(alpha)
-    screen.blit(card_surf, (scaled_x, scaled_y))
+    # Card central com gradiente verde, na escala pulsante (quantizada)
+    card_surf = success_atlas.faded(success_atlas.cards[step], alpha)
+    scaled_y = (HEIGHT - card_surf.get_height()) // 2
+    screen.blit(card_surf, ((WIDTH - card_surf.get_width()) // 2, scaled_y))
     
     # Ícone de check/certo grande
-    check_size = int(80 * scale)
-    check_font = get_font("Montserrat", check_size, bold=True)
-    check_text = "✓"
-    check_surf = check_font.render(check_text, True, (255, 255, 255))
-    check_alpha = alpha
-    check_surf.set_alpha(check_alpha)
+    check_surf = success_atlas.faded(success_atlas.checks[step], alpha)
     screen.blit(check_surf, (WIDTH//2 - check_surf.get_width()//2, scaled_y + 40))
     
-    # Texto "NOTA ACERTADA!"
-    success_text = "NOTA ACERTADA!"
-    success_font = FONT_TITLE
-    success_surf = success_font.render(success_text, True, (255, 255, 255))
-    success_shadow = success_font.render(success_text, True, (0, 0, 0))
-    
-    # Aplica alpha
-    success_surf_temp = pygame.Surface(success_surf.get_size(), pygame.SRCALPHA)
-    success_surf_temp.blit(success_shadow, (2, 2))
-    success_surf_temp.blit(success_surf, (0, 0))
-    success_surf_temp.set_alpha(check_alpha)
-    
-    screen.blit(success_surf_temp, (WIDTH//2 - success_surf.get_width()//2, scaled_y + 120))
-    
-    # Efeito de partículas/estrelas ao redor (opcional - adiciona mais dinamismo)
-    star_count = 12
-    for i in range(star_count):
-        angle = (i / star_count) * 2 * math.pi
-        radius = 100 + 30 * math.sin(pygame.time.get_ticks() * 0.005 + i)
+    # Texto "NOTA ACERTADA!" (com sombra)
+    success_surf = success_atlas.faded(success_atlas.text, alpha)
+    screen.blit(success_surf, (WIDTH//2 - success_surf.get_width()//2, scaled_y + 120))
+    
+    # Partículas/estrelas ao redor
+    star_alpha = int(alpha * 0.7)
+    for i in range(SUCCESS_STAR_COUNT):
+        angle = (i / SUCCESS_STAR_COUNT) * 2 * math.pi
+        radius = 100 + 30 * math.sin(current_time * 0.005 + i)
         star_x = WIDTH//2 + radius * math.cos(angle)
         star_y = HEIGHT//2 + radius * math.sin(angle)
         
-        star_size = int(15 * (1 + 0.5 * math.sin(pygame.time.get_ticks() * 0.01 + i)))
-        star_alpha = int(alpha * 0.7)
-        
-        star_surf = pygame.Surface((star_size * 2, star_size * 2), pygame.SRCALPHA)
-        pygame.draw.circle(star_surf, (255, 255, 255, star_alpha), (star_size, star_size), star_size)
+        star_size = int(15 * (1 + 0.5 * math.sin(current_time * 0.01 + i)))
+        star_surf = success_atlas.faded(success_atlas.star(star_size), star_alpha)
         screen.blit(star_surf, (star_x - star_size, star_y - star_size))
 
 def draw_guess_modal():
@@ -995,8 +1112,7 @@ def draw_guess_modal():
     screen.blit(overlay, (0, 0))
     
     # Card do modal centralizado
-    modal_width = 600
-    modal_height = 350
+    modal_width, modal_height = GUESS_MODAL_SIZE
     modal_x = (WIDTH - modal_width) // 2
     modal_y = (HEIGHT - modal_height) // 2
     
@@ -1054,7 +1170,18 @@ def draw_guess_modal():
         cursor_time = pygame.time.get_ticks() // 500  # Pisca a cada 500ms
         if cursor_time % 2 == 0:
             pygame.draw.line(screen, TEXT_PRIMARY, (cursor_x, input_rect.y + 15), (cursor_x, input_rect.y + input_height - 15), 2)
-    
+
+    # Sugestões abaixo do campo (setas escolhem, Tab ou clique completa)
+    suggestion_rects.clear()
+    mouse_pos = pygame.mouse.get_pos()
+    for k, (_, nome) in enumerate(guess_suggestions):
+        row = pygame.Rect(input_x, input_y + input_height + 8 + k * SUGGESTION_ROW, input_width, SUGGESTION_ROW - 4)
+        if k == guess_selected or row.collidepoint(mouse_pos):
+            pygame.draw.rect(screen, GRAY_700, row, border_radius=8)
+        label = FONT_SMALL.render(nome, True, TEXT_PRIMARY if k == guess_selected else TEXT_SECONDARY)
+        screen.blit(label, (row.x + 20, row.y + (row.height - label.get_height()) // 2))
+        suggestion_rects.append(row)
+
     # Botões do modal
     btn_width = 200
     btn_height = 55
@@ -1081,6 +1208,10 @@ def draw_guess_modal():
     return btn_modal_confirm, btn_modal_cancel
 
 def draw_play():
+    # Um snapshot por frame: os campos vêm todos da mesma versão do estado
+    snapshot = game_state.snapshot()
+    message, score, lives, current_index = snapshot.message, snapshot.score, snapshot.lives, snapshot.current_index
+
     # Background com gradiente roxo-azul
     purple_start = (60, 20, 80)  # Roxo escuro
     blue_end = (20, 40, 100)     # Azul escuro
@@ -1290,22 +1421,33 @@ def draw_play():
     draw_success_animation()
 
 def draw_detector():
+    snapshot = game_state.snapshot()
+    message, current_index, detector_result = snapshot.message, snapshot.current_index, snapshot.detector_result
+    detected_name, detected_freq = snapshot.detected_name, snapshot.detected_freq
+    detected_deviation_cents = snapshot.detected_deviation_cents
+
     purple_start = (60, 20, 80)
     blue_end = (20, 40, 100)    
     draw_gradient(screen, (0, 0, WIDTH, HEIGHT), purple_start, blue_end, vertical=True)
 
     draw_text_with_shadow(screen, "DETECTOR DE PITCH", FONT_SUBTITLE, ACCENT, (50, 30), shadow_offset=3)
 
-    target = current_song_seq[current_index][0] if current_index < len(current_song_seq) else "-"
+    target, _ = song_target(current_index) if current_index < len(current_song_seq) else ("-", None)
+    # Nota que o jogo toca (já transposta): alvo do medidor e do gráfico
+    sounding = int(current_song.midi[current_index]) if current_index < len(current_song_seq) else None
     card_target = draw_card(screen, (50, 100, WIDTH-350, 200), BG_CARD, gradient=True)
 
-    target_label = FONT_SMALL.render("Cante e SEGURE esta nota:", True, TEXT_SECONDARY)
+    if PHRASE_MODE:
+        target_label = FONT_SMALL.render("Cante a frase inteira:", True, TEXT_SECONDARY)
+        phrase = [n[0] for n in current_song_seq[:current_index + 1]]
+        target_surf = FONT_HEADING.render(" ".join(phrase[-10:]), True, WARNING)
+        instruction = FONT_TINY.render("Cante todas as notas em sequência, no ritmo", True, TEXT_SECONDARY)
+    else:
+        target_label = FONT_SMALL.render("Cante e SEGURE esta nota:", True, TEXT_SECONDARY)
+        target_surf = FONT_TITLE.render(target, True, WARNING)
+        instruction = FONT_TINY.render("Mantenha a nota estável por 1 segundo", True, TEXT_SECONDARY)
     screen.blit(target_label, (card_target.x + 30, card_target.y + 25))
-
-    target_surf = FONT_TITLE.render(target, True, WARNING)
     screen.blit(target_surf, (card_target.x + 30, card_target.y + 60))
-
-    instruction = FONT_TINY.render("Mantenha a nota estável por 1 segundo", True, TEXT_SECONDARY)
     screen.blit(instruction, (card_target.x + 30, card_target.y + 160))
 
     # Card de detecção com gradiente
@@ -1313,21 +1455,25 @@ def draw_detector():
 
     detect_label = FONT_SMALL.render("Detecção em tempo real:", True, TEXT_SECONDARY)
     screen.blit(detect_label, (card_detect.x + 30, card_detect.y + 25))
-    target_freq = NOTE_FREQS.get(target)
+    target_freq = get_note_table(A4_TUNING, TUNING_OFFSET).freqs[sounding] if sounding is not None else None
     gauge_rect = (card_detect.x + 30, card_detect.y + 120, card_detect.w - 60, 120)
 
     if detected_name:
         detected_surf = FONT_HEADING.render(detected_name, True, SUCCESS)
-        freq_surf = FONT_SMALL.render(f"{detected_freq:.1f} Hz", True, TEXT_SECONDARY)
+        freq_text = f"{detected_freq:.1f} Hz"
+        if detected_deviation_cents is not None:
+            freq_text += f" ({detected_deviation_cents:+.0f} cents)"
+        freq_surf = FONT_SMALL.render(freq_text, True, TEXT_SECONDARY)
         screen.blit(detected_surf, (card_detect.x + 30, card_detect.y + 60))
         screen.blit(freq_surf, (card_detect.x + 30, card_detect.y + 95))
 
-        deviation_to_use = detected_deviation_hz if detected_deviation_hz is not None else (detected_freq - target_freq if target_freq else None)
-
+        # A agulha desliza até a leitura nova ao longo de um hop do detector
+        active = phrase_detector if PHRASE_MODE else detector
+        needle_smoother.duration = active.BUFFER_SIZE / active.RATE
         draw_needle_gauge(
             screen,
             gauge_rect,
-            detected_freq,
+            needle_smoother.update(detected_freq),
             target_freq,
             tolerance_hz=30.0,
             min_freq=0.0,
@@ -1336,6 +1482,7 @@ def draw_detector():
 
     else:
         no_detect = FONT.render("Aguardando entrada...", True, TEXT_SECONDARY)
+        needle_smoother.update(None)
         screen.blit(no_detect, (card_detect.x + 30, card_detect.y + 60))
         draw_needle_gauge(
             screen,
@@ -1353,7 +1500,7 @@ def draw_detector():
 
     # Mensagem de status
     msg_y = card_detect.y + 215
-    msg_color = WARNING if detector.running else TEXT_SECONDARY
+    msg_color = WARNING if detector.running or phrase_detector.running else TEXT_SECONDARY
     if detector_result is True: msg_color = SUCCESS
     elif detector_result is False: msg_color = DANGER
     msg_surf = FONT_SMALL.render(message, True, msg_color)
@@ -1368,6 +1515,16 @@ def draw_detector():
         btn_start_listen.hover = (0, 200, 0)       
 
 
+    # Traço do pitch nos últimos segundos, com a faixa da nota alvo
+    card_trace = draw_card(screen, (WIDTH-280, 360, 240, 210), BG_CARD)
+    active = phrase_detector if PHRASE_MODE else detector
+    pitch_trace.update(active.ring)
+    trace_pos = (card_trace.x + 40, card_trace.y + 15)
+    pitch_trace.draw(screen, trace_pos, sounding % 12 if sounding is not None else None)
+    for row, label in pitch_trace.octave_labels():
+        label_surf = FONT_TINY.render(label, True, TEXT_SECONDARY)
+        screen.blit(label_surf, (card_trace.x + 8, trace_pos[1] + row - label_surf.get_height() // 2))
+
     # Botões de controle (lado direito)
     btn_play_target.draw(screen)
     btn_start_listen.draw(screen)
@@ -1375,287 +1532,410 @@ def draw_detector():
 
     btn_back.draw(screen)
 
+# ==============================================================================
+# INICIALIZAÇÃO
+# ==============================================================================
+def init():
+    """
+    Inicializa o pygame e monta o que o jogo aberto usa: perfil do cantor,
+    detectores, fontes, botões e sprites. O processo filho do detector
+    reimporta este módulo e não chama init().
+    """
+    global singer_profile, detector, phrase_detector, CLOCK, pitch_trace, success_atlas
+    global FONT_TITLE, FONT_TITLE_LARGE, FONT_SUBTITLE, FONT_HEADING, FONT, FONT_SMALL, FONT_TINY
+    global btn_start, btn_rules, btn_conf, btn_back, btn_singer, btn_menu
+    global btn_repeat, btn_action_sing, btn_guess, btn_play_target, btn_start_listen, btn_skip_confirm
+
+    singer_profile = transposition.load_singer()
+
+    detector = PitchDetector(a4=A4_TUNING, tuning_offset=TUNING_OFFSET, use_process=DETECTOR_IN_PROCESS, use_vad=DETECTOR_VAD,
+                             decimation=DETECTOR_DECIMATION, backend=DETECTOR_BACKEND, record_dir=RECORDINGS_DIR)
+
+    # Detector do modo frase: hop curto (notas de 0.3 s) e histórico longo no ring
+    phrase_detector = PitchDetector(a4=A4_TUNING, tuning_offset=TUNING_OFFSET, use_process=DETECTOR_IN_PROCESS, use_vad=DETECTOR_VAD,
+                                    decimation=DETECTOR_DECIMATION, buffer_size=1024, window_factor=4, backend=DETECTOR_BACKEND,
+                                    ring_capacity=8192, record_dir=RECORDINGS_DIR)
+
+    # Aumentei o buffer para 4096 para evitar "estalos" (crackling)
+    pygame.mixer.pre_init(frequency=SAMPLE_RATE, size=-16, channels=2, buffer=4096)
+    pygame.init()
+
+    # Inicializa as fontes com Montserrat (ou fallback)
+    FONT_TITLE = get_font("Montserrat", 72, bold=True)  # Aumentado de 56 para 72
+    FONT_TITLE_LARGE = get_font("Montserrat", 96, bold=True)  # Fonte extra grande para animação
+    FONT_SUBTITLE = get_font("Montserrat", 32, bold=True)
+    FONT_HEADING = get_font("Montserrat", 28, bold=True)
+    FONT = get_font("Montserrat", 22, bold=False)
+    FONT_SMALL = get_font("Montserrat", 18, bold=False)
+    FONT_TINY = get_font("Montserrat", 14, bold=False)
+    CLOCK = pygame.time.Clock()
+
+    # Gráfico rolante dos últimos segundos cantados (tela do detector)
+    pitch_trace = PitchTrace((190, 180), seconds=6.0, a4=A4_TUNING * TUNING_MULTIPLIER, background=BG_CARD)
+
+    btn_start = Button("INICIAR", (WIDTH//2 - 160, 220, 320, 70), color=ACCENT, font=FONT_HEADING)
+    btn_rules = Button("REGRAS", (WIDTH//2 - 160, 310, 320, 60), color=(100, 70, 150), hover=(120, 90, 170), font=FONT)
+    btn_conf = Button("CONFIGURAÇÕES", (WIDTH//2 - 160, 390, 320, 60), color=(100, 70, 150), hover=(120, 90, 170), font=FONT)
+    btn_back = Button("VOLTAR", (30, HEIGHT-80, 140, 50), color=GRAY_700, hover=(100, 90, 130), font=FONT_SMALL)
+    btn_singer = Button("TROCAR VOZ", (WIDTH//2 + 20, 225, 200, 45), color=ACCENT, font=FONT_SMALL)
+    btn_menu = Button("MENU", (WIDTH-180, HEIGHT-80, 150, 50), color=DANGER, hover=DANGER_HOVER, font=FONT_SMALL)
+
+    btn_repeat = Button("Repetir Notas", (60, 280, 300, 60), color=(80, 60, 120), hover=(100, 80, 140))
+    btn_action_sing = Button("CANTAR NOTA", (60, 360, 300, 60), color=WARNING)
+    btn_guess = Button("ADVINHAR MÚSICA", (60, 440, 300, 60), color=ACCENT)
+
+    btn_play_target = Button("Ouvir Nota Alvo", (WIDTH-280, 140, 240, 55), color=WARNING)
+    btn_start_listen = Button("Gravar (Mic)", (WIDTH-280, 215, 240, 55), color=SUCCESS)
+    btn_skip_confirm = Button("Confirmar", (WIDTH-280, 290, 240, 55), color=ACCENT)
+
+    # Construído uma vez, depois das fontes, para que o primeiro acerto não pague a renderização
+    success_atlas = SuccessAtlas()
+
+
 # ==============================================================================
 # LOOP PRINCIPAL
 # ==============================================================================
-running = True
-play_here_button = None 
-
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        if state == 'menu':
-            if btn_start.clicked(event):
-                lives = 3
-                score = 0
-                start_round()
-                if current_song_seq:
-                    primeira_nota = current_song_seq[0]
-                    threading.Thread(target=play_note, args=(NOTE_FREQS[primeira_nota[0]], primeira_nota[1]), daemon=True).start()
-                state = 'play'
-            if btn_rules.clicked(event):
-                state = 'rules'
-            if btn_conf.clicked(event):
-                state = 'settings'
-
-        elif state in ('rules', 'settings'):
-            if btn_back.clicked(event):
-                state = 'menu'
-
-        elif state == 'play':
-            if btn_menu.clicked(event):
-                detector.stop()
-                input_active = False
-                user_text = ""
-                message = ""
-                state = 'menu'
-
-            if btn_repeat.clicked(event):
-                def replay():
-                    notas_reveladas = current_song_seq[:current_index]
-                    for nota_nome, duracao in notas_reveladas:
-                        play_note(NOTE_FREQS[nota_nome], duracao, record=False)
-                threading.Thread(target=replay, daemon=True).start()
-
-            if play_here_button and play_here_button.clicked(event):
-                if current_index < len(current_song_seq):
-                    n = current_song_seq[current_index]
-                    threading.Thread(target=play_note, args=(NOTE_FREQS[n[0]], n[1]), daemon=True).start()
-
-            if btn_action_sing.clicked(event):
-                state = 'detector'
-                detector_result = None
-                detected_name = None
-                message = "Clique em Gravar e segure a nota por 1s."
-
-            if btn_guess.clicked(event):
-                guess_modal_open = True
-                input_active = True
-                user_text = ""  # Limpa o texto anterior
-                continue  # Pula o processamento de eventos neste frame para evitar conflitos
-
-            # Processa eventos do modal de adivinhar música
-            if guess_modal_open:
-                # Fecha o modal se clicar fora dele (no overlay)
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    modal_width = 600
-                    modal_height = 350
-                    modal_x = (WIDTH - modal_width) // 2
-                    modal_y = (HEIGHT - modal_height) // 2
-                    modal_rect = pygame.Rect(modal_x, modal_y, modal_width, modal_height)
-                    if not modal_rect.collidepoint(event.pos):
-                        # Clicou fora do modal, fecha
-                        guess_modal_open = False
-                        input_active = False
-                        user_text = ""
+if __name__ == "__main__":
+    # Necessário para o processo do detector no executável do PyInstaller
+    multiprocessing.freeze_support()
+    init()
+    # No modo processo, os filhos dos detectores nascem agora e servem todas as rodadas
+    detector.open()
+    phrase_detector.open()
+
+    if DETECTOR_AUTO_TUNE:
+        start_auto_tune()
+
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Solfejo - Jogo Musical Interativo")
+
+    running = True
+    play_here_button = None 
+
+    # Renderização guiada por mudança: telas sem animação só são redesenhadas
+    # quando há evento ou o estado do jogo muda
+    needs_redraw = True
+
+    def mark_dirty(changed, snapshot):
+        global needs_redraw
+        needs_redraw = True
+
+    game_state.subscribe(mark_dirty)
+
+    while running:
+        for event in pygame.event.get():
+            needs_redraw = True
+            if event.type == pygame.QUIT:
+                running = False
+
+            if state == 'menu':
+                if btn_start.clicked(event):
+                    game_state.set(lives=3, score=0)
+                    start_round()
+                    if current_song_seq:
+                        threading.Thread(target=play_song_note, args=(current_song, 0), daemon=True).start()
+                    state = 'play'
+                if btn_rules.clicked(event):
+                    state = 'rules'
+                if btn_conf.clicked(event):
+                    state = 'settings'
+
+            elif state in ('rules', 'settings'):
+                if btn_back.clicked(event):
+                    state = 'menu'
+                if state == 'settings' and btn_singer.clicked(event):
+                    # Original -> baixo -> ... -> soprano -> Original; as músicas já
+                    # tocadas continuam no cache e só as próximas são transpostas
+                    voices = [None, *transposition.VOICE_TYPES]
+                    current = singer_profile.nome if singer_profile else None
+                    voice = voices[(voices.index(current) + 1) % len(voices)] if current in voices else None
+                    singer_profile = transposition.voice_profile(voice) if voice else None
+                    transposition.save_singer(singer_profile)
+
+            elif state == 'play':
+                if btn_menu.clicked(event):
+                    detector.stop()
+                    input_active = False
+                    user_text = ""
+                    game_state.set(message="")
+                    state = 'menu'
+
+                if btn_repeat.clicked(event):
+                    def replay(song, count):
+                        for k in range(count):
+                            play_song_note(song, k, record=False)
+                    threading.Thread(target=replay, args=(current_song, game_state.get("current_index")), daemon=True).start()
+
+                if play_here_button and play_here_button.clicked(event):
+                    current_index = game_state.get("current_index")
+                    if current_index < len(current_song_seq):
+                        threading.Thread(target=play_song_note, args=(current_song, current_index), daemon=True).start()
+
+                if btn_action_sing.clicked(event):
+                    state = 'detector'
+                    game_state.set(detector_result=None, detected_name=None,
+                                   message="Clique em Gravar e cante a frase." if PHRASE_MODE else "Clique em Gravar e segure a nota por 1s.")
+
+                if btn_guess.clicked(event):
+                    guess_modal_open = True
+                    input_active = True
+                    user_text = ""  # Limpa o texto anterior
+                    update_guess_suggestions(reset=True)
+                    continue  # Pula o processamento de eventos neste frame para evitar conflitos
+
+                # Processa eventos do modal de adivinhar música
+                if guess_modal_open:
+                    # Fecha o modal se clicar fora dele (no overlay)
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        modal_width, modal_height = GUESS_MODAL_SIZE
+                        modal_x = (WIDTH - modal_width) // 2
+                        modal_y = (HEIGHT - modal_height) // 2
+                        modal_rect = pygame.Rect(modal_x, modal_y, modal_width, modal_height)
+                        if not modal_rect.collidepoint(event.pos):
+                            # Clicou fora do modal, fecha
+                            guess_modal_open = False
+                            input_active = False
+                            user_text = ""
+                        else:
+                            for k, row in enumerate(suggestion_rects):
+                                if row.collidepoint(event.pos) and k < len(guess_suggestions):
+                                    user_text = guess_suggestions[k][1]
+                                    update_guess_suggestions()
+                                    break
                 
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        # Fecha o modal ao pressionar ESC
-                        guess_modal_open = False
-                        input_active = False
-                        user_text = ""
-                    elif event.key == pygame.K_RETURN:
-                        # Processa o palpite ao pressionar ENTER
-                        guess = user_text.strip()
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_ESCAPE:
+                            # Fecha o modal ao pressionar ESC
+                            guess_modal_open = False
+                            input_active = False
+                            user_text = ""
+                        elif event.key in (pygame.K_DOWN, pygame.K_UP):
+                            if guess_suggestions:
+                                step = 1 if event.key == pygame.K_DOWN else -1
+                                guess_selected = (guess_selected + step) % len(guess_suggestions)
+                        elif event.key == pygame.K_TAB:
+                            # Completa com a sugestão destacada (ou a primeira)
+                            if guess_suggestions:
+                                user_text = guess_suggestions[max(guess_selected, 0)][1]
+                                update_guess_suggestions()
+                        elif event.key == pygame.K_RETURN:
+                            # Processa o palpite ao pressionar ENTER (a sugestão destacada, se houver)
+                            if 0 <= guess_selected < len(guess_suggestions):
+                                user_text = guess_suggestions[guess_selected][1]
+                            guess = user_text.strip()
+                        
+                            # Não processa se o palpite estiver vazio
+                            if not guess:
+                                game_state.set(message="⚠ Digite o nome da música antes de confirmar!")
+                                continue
+                        
+                            real = current_song_data.nome or ""
+
+                            if is_similar_enough(guess, real):
+                                game_state.add("score", 5)
+                                song_scheduler.scheduler().record(current_song_index, True)
+                                song_scheduler.scheduler().save()
+                                similarity = calculate_similarity(guess, real)
+
+                                # Mensagem diferente se acertou exatamente ou com pequenos erros
+                                if similarity == 1.0:
+                                    message = f"PERFEITO: {current_song_data.nome}!"
+                                else:
+                                    message = f"ACERTOU: {current_song_data.nome}!"
+
+                                game_state.set(message=message)
+                                start_round()
+                                if current_song_seq:
+                                    threading.Thread(target=play_song_note, args=(current_song, 0), daemon=True).start()
+                            else:
+                                lives = game_state.add("lives", -1)
+                                song_scheduler.scheduler().record(current_song_index, False)
+                                song_scheduler.scheduler().save()
+                                similarity = calculate_similarity(guess, real)
+                                game_state.set(message=f"Errou! Vidas: {lives}")
+                                if lives <= 0:
+                                    state = 'gameover'
                         
+                            user_text = ""
+                            input_active = False
+                            guess_modal_open = False
+                        elif event.key == pygame.K_BACKSPACE:
+                            user_text = user_text[:-1]
+                            update_guess_suggestions()
+                        else:
+                            if len(user_text) < 40 and event.unicode.isprintable():
+                                user_text += event.unicode
+                                update_guess_suggestions()
+                
+                    # Verifica cliques nos botões do modal
+                    if btn_modal_confirm and btn_modal_confirm.clicked(event):
+                        # Processa o palpite
+                        guess = user_text.strip()
+                    
                         # Não processa se o palpite estiver vazio
                         if not guess:
-                            message = "⚠ Digite o nome da música antes de confirmar!"
+                            game_state.set(message="Digite o nome da música antes de confirmar!")
                             continue
-                        
+                    
                         real = current_song_data.nome or ""
 
                         if is_similar_enough(guess, real):
-                            score += 5
+                            game_state.add("score", 5)
+                            song_scheduler.scheduler().record(current_song_index, True)
+                            song_scheduler.scheduler().save()
                             similarity = calculate_similarity(guess, real)
 
-                            # Mensagem diferente se acertou exatamente ou com pequenos erros
                             if similarity == 1.0:
                                 message = f"PERFEITO: {current_song_data.nome}!"
                             else:
                                 message = f"ACERTOU: {current_song_data.nome}!"
 
+                            game_state.set(message=message)
                             start_round()
                             if current_song_seq:
-                                n = current_song_seq[0]
-                                threading.Thread(target=play_note, args=(NOTE_FREQS[n[0]], n[1]), daemon=True).start()
+                                threading.Thread(target=play_song_note, args=(current_song, 0), daemon=True).start()
                         else:
-                            lives -= 1
+                            lives = game_state.add("lives", -1)
+                            song_scheduler.scheduler().record(current_song_index, False)
+                            song_scheduler.scheduler().save()
                             similarity = calculate_similarity(guess, real)
-                            message = f"Errou! Vidas: {lives}"
+                            game_state.set(message=f"Errou! Vidas: {lives}")
                             if lives <= 0:
                                 state = 'gameover'
-                        
+                    
                         user_text = ""
                         input_active = False
                         guess_modal_open = False
-                    elif event.key == pygame.K_BACKSPACE:
-                        user_text = user_text[:-1]
-                    else:
-                        if len(user_text) < 40: 
-                            user_text += event.unicode
-                
-                # Verifica cliques nos botões do modal
-                if btn_modal_confirm and btn_modal_confirm.clicked(event):
-                    # Processa o palpite
-                    guess = user_text.strip()
-                    
-                    # Não processa se o palpite estiver vazio
-                    if not guess:
-                        message = "Digite o nome da música antes de confirmar!"
-                        continue
-                    
-                    real = current_song_data.nome or ""
-
-                    if is_similar_enough(guess, real):
-                        score += 5
-                        similarity = calculate_similarity(guess, real)
-
-                        if similarity == 1.0:
-                            message = f"PERFEITO: {current_song_data.nome}!"
-                        else:
-                            message = f"ACERTOU: {current_song_data.nome}!"
-
-                        start_round()
-                        if current_song_seq:
-                            n = current_song_seq[0]
-                            threading.Thread(target=play_note, args=(NOTE_FREQS[n[0]], n[1]), daemon=True).start()
-                    else:
-                        lives -= 1
-                        similarity = calculate_similarity(guess, real)
-                        message = f"Errou! Vidas: {lives}"
-                        if lives <= 0:
-                            state = 'gameover'
-                    
-                    user_text = ""
-                    input_active = False
-                    guess_modal_open = False
                 
-                if btn_modal_cancel and btn_modal_cancel.clicked(event):
-                    # Fecha o modal sem processar
-                    guess_modal_open = False
-                    input_active = False
-                    user_text = ""
+                    if btn_modal_cancel and btn_modal_cancel.clicked(event):
+                        # Fecha o modal sem processar
+                        guess_modal_open = False
+                        input_active = False
+                        user_text = ""
 
 
-        elif state == 'detector':
-            if btn_back.clicked(event):
-                detector.stop()
-                state = 'play'
+            elif state == 'detector':
+                if btn_back.clicked(event):
+                    detector.stop()
+                    phrase_detector.stop()
+                    state = 'play'
 
-            if btn_play_target.clicked(event):
-                if current_index < len(current_song_seq):
-                    n = current_song_seq[current_index]
-                    threading.Thread(target=play_note, args=(NOTE_FREQS[n[0]], n[1]), daemon=True).start()
+                current_index = game_state.get("current_index")
+                if btn_play_target.clicked(event):
+                    if current_index < len(current_song_seq):
+                        threading.Thread(target=play_song_note, args=(current_song, current_index), daemon=True).start()
 
-            cooldown_active = time.time() < button_cooldown_until
+                cooldown_active = time.time() < button_cooldown_until
 
-            if not cooldown_active and btn_start_listen.clicked(event):
-                if current_index < len(current_song_seq):
-                    target_name = current_song_seq[current_index][0]
-                    start_detector_thread(target_name)
+                if not cooldown_active and btn_start_listen.clicked(event):
+                    if current_index < len(current_song_seq):
+                        start_detector_thread(*song_target(current_index))
 
-                button_cooldown_until = time.time() + 10
+                    button_cooldown_until = time.time() + 10
 
-            if btn_skip_confirm.clicked(event):
-                if detector_result is True:
-                    # Ativa a animação de sucesso
-                    show_success_animation = True
-                    success_animation_start_time = pygame.time.get_ticks()
+                if btn_skip_confirm.clicked(event):
+                    if game_state.get("detector_result") is True:
+                        # Ativa a animação de sucesso
+                        show_success_animation = True
+                        success_animation_start_time = pygame.time.get_ticks()
                     
-                    current_index += 1
-                    message = "Nota desbloqueada!"
-                    state = 'play'
-                else:
-                    message = "Segure a nota por 1s até aparecer ACERTOU."
+                        game_state.set(current_index=current_index + 1, message="Nota desbloqueada!")
+                        state = 'play'
+                    else:
+                        game_state.set(message="Segure a nota por 1s até aparecer ACERTOU.")
 
-        elif state == 'gameover':
-            # Calcula as mesmas coordenadas usadas no desenho
-            card_y = HEIGHT//2 - 250
-            btn_y1 = card_y + 390
-            btn_y2 = card_y + 465
+            elif state == 'gameover':
+                # Calcula as mesmas coordenadas usadas no desenho
+                card_y = HEIGHT//2 - 250
+                btn_y1 = card_y + 390
+                btn_y2 = card_y + 465
             
-            # Verifica cliques nos botões do game over
-            btn_play_again = Button("JOGAR NOVAMENTE", (WIDTH//2 - 150, btn_y1, 300, 60), 
-                                   color=SUCCESS, hover=SUCCESS_HOVER, font=FONT_HEADING)
-            btn_menu_gameover = Button("MENU PRINCIPAL", (WIDTH//2 - 150, btn_y2, 300, 60), 
-                                      color=ACCENT, hover=ACCENT_HOVER, font=FONT_HEADING)
+                # Verifica cliques nos botões do game over
+                btn_play_again = Button("JOGAR NOVAMENTE", (WIDTH//2 - 150, btn_y1, 300, 60), 
+                                       color=SUCCESS, hover=SUCCESS_HOVER, font=FONT_HEADING)
+                btn_menu_gameover = Button("MENU PRINCIPAL", (WIDTH//2 - 150, btn_y2, 300, 60), 
+                                          color=ACCENT, hover=ACCENT_HOVER, font=FONT_HEADING)
             
-            if btn_play_again.clicked(event):
-                lives = 3
-                score = 0
-                start_round(force_new=True)  # Força escolher uma música diferente
-                if current_song_seq:
-                    primeira_nota = current_song_seq[0]
-                    threading.Thread(target=play_note, args=(NOTE_FREQS[primeira_nota[0]], primeira_nota[1]), daemon=True).start()
-                state = 'play'
-            if btn_menu_gameover.clicked(event):
-                state = 'menu'
-
-    if state == 'menu': draw_menu()
-    elif state == 'rules': draw_rules()
-    elif state == 'settings': draw_settings()
-    elif state == 'play': draw_play()
-    elif state == 'detector': draw_detector()
-    elif state == 'gameover':
-        # Background com gradiente roxo-azul
-        purple_start = (60, 20, 80)  # Roxo escuro
-        blue_end = (20, 40, 100)     # Azul escuro
-        draw_gradient(screen, (0, 0, WIDTH, HEIGHT), purple_start, blue_end, vertical=True)
-
-        # Card central de game over com gradiente
-        card = draw_card(screen, (WIDTH//2 - 300, HEIGHT//2 - 250, 600, 500), BG_CARD, gradient=True)
+                if btn_play_again.clicked(event):
+                    game_state.set(lives=3, score=0)
+                    start_round()
+                    if current_song_seq:
+                        threading.Thread(target=play_song_note, args=(current_song, 0), daemon=True).start()
+                    state = 'play'
+                if btn_menu_gameover.clicked(event):
+                    state = 'menu'
+
+        # Aplica o que as threads de trabalho enfileiraram (chama mark_dirty se algo mudou)
+        game_state.apply_pending()
+        if not (needs_redraw or state in ANIMATED_SCREENS or show_success_animation):
+            CLOCK.tick(30)
+            continue
+        needs_redraw = False
+
+        if state == 'menu': draw_menu()
+        elif state == 'rules': draw_rules()
+        elif state == 'settings': draw_settings()
+        elif state == 'play': draw_play()
+        elif state == 'detector': draw_detector()
+        elif state == 'gameover':
+            # Background com gradiente roxo-azul
+            purple_start = (60, 20, 80)  # Roxo escuro
+            blue_end = (20, 40, 100)     # Azul escuro
+            draw_gradient(screen, (0, 0, WIDTH, HEIGHT), purple_start, blue_end, vertical=True)
+
+            # Card central de game over com gradiente
+            card = draw_card(screen, (WIDTH//2 - 300, HEIGHT//2 - 250, 600, 500), BG_CARD, gradient=True)
         
-        # Borda brilhante no card
-        pygame.draw.rect(screen, DANGER, card, width=3, border_radius=20)
-
-        # Título com sombra
-        title_surf = FONT_TITLE.render("FIM DE JOGO", True, DANGER)
-        title_shadow = FONT_TITLE.render("FIM DE JOGO", True, (0, 0, 0))
-        screen.blit(title_shadow, (WIDTH//2 - title_surf.get_width()//2 + 2, card.y + 52))
-        screen.blit(title_surf, (WIDTH//2 - title_surf.get_width()//2, card.y + 50))
-
-        # Pontuação com destaque - estilo game
-        score_label = FONT_SMALL.render("PONTUAÇÃO FINAL", True, TEXT_SECONDARY)
-        screen.blit(score_label, (WIDTH//2 - score_label.get_width()//2, card.y + 130))
-
-        # Card para pontuação
-        score_card = draw_card(screen, (WIDTH//2 - 150, card.y + 160, 300, 80), BG_SURFACE, border_radius=15, gradient=True)
-        pygame.draw.rect(screen, (255, 215, 0), score_card, width=2, border_radius=15)
+            # Borda brilhante no card
+            pygame.draw.rect(screen, DANGER, card, width=3, border_radius=20)
+
+            # Título com sombra
+            title_surf = FONT_TITLE.render("FIM DE JOGO", True, DANGER)
+            title_shadow = FONT_TITLE.render("FIM DE JOGO", True, (0, 0, 0))
+            screen.blit(title_shadow, (WIDTH//2 - title_surf.get_width()//2 + 2, card.y + 52))
+            screen.blit(title_surf, (WIDTH//2 - title_surf.get_width()//2, card.y + 50))
+
+            # Pontuação com destaque - estilo game
+            score_label = FONT_SMALL.render("PONTUAÇÃO FINAL", True, TEXT_SECONDARY)
+            screen.blit(score_label, (WIDTH//2 - score_label.get_width()//2, card.y + 130))
+
+            # Card para pontuação
+            score_card = draw_card(screen, (WIDTH//2 - 150, card.y + 160, 300, 80), BG_SURFACE, border_radius=15, gradient=True)
+            pygame.draw.rect(screen, (255, 215, 0), score_card, width=2, border_radius=15)
         
-        score_surf = FONT_TITLE.render(f"{score}", True, (255, 215, 0))  # Dourado
-        score_shadow = FONT_TITLE.render(f"{score}", True, (0, 0, 0))
-        screen.blit(score_shadow, (WIDTH//2 - score_surf.get_width()//2 + 2, card.y + 187))
-        screen.blit(score_surf, (WIDTH//2 - score_surf.get_width()//2, card.y + 185))
+            score = game_state.get("score")
+            score_surf = FONT_TITLE.render(f"{score}", True, (255, 215, 0))  # Dourado
+            score_shadow = FONT_TITLE.render(f"{score}", True, (0, 0, 0))
+            screen.blit(score_shadow, (WIDTH//2 - score_surf.get_width()//2 + 2, card.y + 187))
+            screen.blit(score_surf, (WIDTH//2 - score_surf.get_width()//2, card.y + 185))
         
-        # Pontos ou Ponto (singular/plural)
-        pontos_text = "pontos" if score != 1 else "ponto"
-        pontos_surf = FONT_SMALL.render(pontos_text, True, TEXT_SECONDARY)
-        screen.blit(pontos_surf, (WIDTH//2 - pontos_surf.get_width()//2, card.y + 245))
-
-        # Música revelada
-        music_name = current_song_data.nome if current_song_data else "Desconhecida"
-        music_label = FONT_SMALL.render("A MÚSICA ERA", True, TEXT_SECONDARY)
-        screen.blit(music_label, (WIDTH//2 - music_label.get_width()//2, card.y + 280))
+            # Pontos ou Ponto (singular/plural)
+            pontos_text = "pontos" if score != 1 else "ponto"
+            pontos_surf = FONT_SMALL.render(pontos_text, True, TEXT_SECONDARY)
+            screen.blit(pontos_surf, (WIDTH//2 - pontos_surf.get_width()//2, card.y + 245))
+
+            # Música revelada
+            music_name = current_song_data.nome if current_song_data else "Desconhecida"
+            music_label = FONT_SMALL.render("A MÚSICA ERA", True, TEXT_SECONDARY)
+            screen.blit(music_label, (WIDTH//2 - music_label.get_width()//2, card.y + 280))
         
-        # Card para nome da música
-        music_card = draw_card(screen, (WIDTH//2 - 200, card.y + 310, 400, 50), BG_SURFACE, border_radius=15)
-        music_surf = FONT_HEADING.render(music_name, True, WARNING)
-        screen.blit(music_surf, (WIDTH//2 - music_surf.get_width()//2, card.y + 320))
-
-        # Botões de ação - estilo game
-        btn_play_again = Button("JOGAR NOVAMENTE", (WIDTH//2 - 150, card.y + 390, 300, 60), 
-                               color=SUCCESS, hover=SUCCESS_HOVER, font=FONT_HEADING)
-        btn_menu_gameover = Button("MENU PRINCIPAL", (WIDTH//2 - 150, card.y + 465, 300, 60), 
-                                  color=ACCENT, hover=ACCENT_HOVER, font=FONT_HEADING)
+            # Card para nome da música
+            music_card = draw_card(screen, (WIDTH//2 - 200, card.y + 310, 400, 50), BG_SURFACE, border_radius=15)
+            music_surf = FONT_HEADING.render(music_name, True, WARNING)
+            screen.blit(music_surf, (WIDTH//2 - music_surf.get_width()//2, card.y + 320))
+
+            # Botões de ação - estilo game
+            btn_play_again = Button("JOGAR NOVAMENTE", (WIDTH//2 - 150, card.y + 390, 300, 60), 
+                                   color=SUCCESS, hover=SUCCESS_HOVER, font=FONT_HEADING)
+            btn_menu_gameover = Button("MENU PRINCIPAL", (WIDTH//2 - 150, card.y + 465, 300, 60), 
+                                      color=ACCENT, hover=ACCENT_HOVER, font=FONT_HEADING)
         
-        btn_play_again.draw(screen)
-        btn_menu_gameover.draw(screen)
+            btn_play_again.draw(screen)
+            btn_menu_gameover.draw(screen)
 
-    pygame.display.flip()
-    CLOCK.tick(30)
+        pygame.display.flip()
+        CLOCK.tick(30)
 
-pygame.quit()
\ No newline at end of file
+    detector.close()
+    phrase_detector.close()
+    pygame.quit()
\ No newline at end of file
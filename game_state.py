@@ -0,0 +1,82 @@
+"""
+Estado do jogo compartilhado entre a thread do render e as threads de
+detector e de reprodução.
+
+As threads de trabalho não escrevem no estado: elas enfileiram mudanças com
+post(), e o loop principal aplica a fila uma vez por frame (apply_pending).
+Quem desenha lê um snapshot() imutável, coerente entre os campos, e pode
+pular o frame se a versão não mudou; subscribe() avisa a cada mudança.
+"""
+import queue
+import threading
+from collections import namedtuple
+
+
+class GameStore:
+    def __init__(self, **initial):
+        self._lock = threading.Lock()
+        self._values = dict(initial)
+        self._pending = queue.SimpleQueue()
+        self._listeners = []
+        self._version = 0
+        self._snapshot_type = namedtuple("GameSnapshot", ["version", *initial])
+        self._snapshot = self._snapshot_type(0, **initial)
+
+    @property
+    def version(self):
+        """Cresce a cada mudança aplicada."""
+        return self._version
+
+    def snapshot(self):
+        """Todos os campos de uma vez (namedtuple), de uma mesma versão."""
+        # Substituído inteiro a cada mudança: ler a referência já é atômico
+        return self._snapshot
+
+    def get(self, key):
+        return getattr(self._snapshot, key)
+
+    def set(self, **changes):
+        """Aplica as mudanças já (thread principal). Retorna os campos que mudaram."""
+        changed, _ = self._commit(lambda values: changes)
+        return changed
+
+    def add(self, key, delta):
+        """Soma delta ao campo numérico de forma atômica e retorna o novo valor."""
+        _, snapshot = self._commit(lambda values: {key: values[key] + delta})
+        return getattr(snapshot, key)
+
+    def post(self, **changes):
+        """Enfileira mudanças vindas de uma thread de trabalho."""
+        self._pending.put(changes)
+
+    def apply_pending(self):
+        """Aplica, numa versão só, tudo o que foi enfileirado desde a última chamada."""
+        merged = {}
+        while True:
+            try:
+                merged.update(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return self.set(**merged) if merged else set()
+
+    def subscribe(self, listener):
+        """listener(campos que mudaram, snapshot) é chamado a cada mudança aplicada."""
+        self._listeners.append(listener)
+
+    def _commit(self, make_changes):
+        """Calcula e aplica as mudanças sob o lock; avisa os listeners fora dele."""
+        with self._lock:
+            changes = make_changes(self._values)
+            unknown = set(changes) - set(self._values)
+            if unknown:
+                raise KeyError(f"Campos desconhecidos no estado do jogo: {sorted(unknown)}")
+            changed = {key for key, value in changes.items() if self._values[key] != value}
+            if changed:
+                self._values.update(changes)
+                self._version += 1
+                self._snapshot = self._snapshot_type(self._version, **self._values)
+            snapshot = self._snapshot
+        if changed:
+            for listener in list(self._listeners):
+                listener(changed, snapshot)
+        return changed, snapshot
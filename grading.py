@@ -0,0 +1,238 @@
+"""
+Correção em lote de gravações de alunos.
+
+Cada arquivo WAV é uma tentativa de cantar uma música da BIBLIOTECA. O
+detector roda offline (audio_sources.WavFileSource, mais rápido que o tempo
+real) e cada nota da música recebe aprovado/reprovado pela mesma regra de
+estabilidade do jogo, o erro mediano em cents e o atraso do ataque em relação
+ao tempo esperado. As tentativas são distribuídas num pool de processos e os
+resultados vão para o arquivo de saída à medida que terminam; rodar de novo
+com a mesma saída continua de onde parou.
+
+Uso:
+    python grading.py PASTA --out notas.csv [--song "Asa Branca"] [--workers 8]
+
+Sem --song, o nome da pasta de cada arquivo precisa ser o nome da música.
+Saída .csv tem uma linha por nota; .jsonl tem uma linha (objeto) por tentativa.
+"""
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from audio_sources import WavFileSource
+from Musicas import BIBLIOTECA
+from pitch_detector import PitchDetector
+from stability import CONFIRMED, HOLDING, StabilityEvaluator
+import title_match
+
+# Hop curto: as notas das músicas duram 0.3 s ou mais
+GRADING_BUFFER = 1024
+GRADING_WINDOW_FACTOR = 4
+# Fração da duração da nota que precisa ser sustentada no alvo (limitada pelo REQUIRED_STABILITY do jogo)
+HOLD_FRACTION = 0.5
+REQUIRED_STABILITY = 1.0
+# Folga (s) em volta da janela esperada de cada nota ao procurar o ataque
+TIMING_SLACK = 0.15
+
+CSV_FIELDS = ["take", "song", "notes_total", "note_index", "target", "expected_start", "onset",
+              "timing_error", "cents_error", "passed", "error"]
+
+
+def find_song(name):
+    try:
+        return BIBLIOTECA[BIBLIOTECA.find(name)]
+    except KeyError:
+        similar = [m.nome for m in title_match.search(name, k=3)]
+        hint = f" (parecidas: {', '.join(similar)})" if similar else ""
+        raise KeyError(f"música não encontrada: {name!r}{hint}") from None
+
+
+def detect_take(path, a4=440.0, tuning_offset=0, backend="auto"):
+    """Roda o detector num WAV. Retorna (detector, tempos, freqs) com o tempo no centro de cada janela."""
+    source = WavFileSource(path)
+    decimation = next(d for d in (4, 2, 1) if source.rate % d == 0)
+    detector = PitchDetector(a4=a4, tuning_offset=tuning_offset, backend=backend, decimation=decimation,
+                             buffer_size=GRADING_BUFFER, window_factor=GRADING_WINDOW_FACTOR, source=source)
+    half_window = GRADING_BUFFER * GRADING_WINDOW_FACTOR / source.rate / 2
+    times, freqs = [], []
+    for timestamp, freq, _, _ in detector.iter_frames():
+        times.append(timestamp - half_window)
+        freqs.append(freq)
+    return detector, np.asarray(times), np.asarray(freqs)
+
+
+def grade_take(path, musica, a4=440.0, tuning_offset=0, backend="auto"):
+    """
+    Corrige uma tentativa. Retorna uma lista de dicts, um por nota.
+
+    O tempo zero da música é o primeiro frame com nota detectada; cada nota
+    é procurada na sua janela esperada (mais TIMING_SLACK de cada lado).
+    """
+    detector, times, freqs = detect_take(path, a4, tuning_offset, backend)
+    table = detector.note_table
+    voiced = np.flatnonzero(table.lookup_array(freqs)["midi"] >= 0)
+    t0 = times[voiced[0]] if len(voiced) else None
+
+    rows = []
+    expected = 0.0
+    previous = None
+    for index, (target, duration) in enumerate(musica.notas):
+        row = {"note_index": index, "target": target, "expected_start": round(expected, 3),
+               "onset": None, "timing_error": None, "cents_error": None, "passed": False}
+        if t0 is not None:
+            # Nota repetida: a folga antes do ataque cairia na nota anterior
+            early = 0.0 if target == previous else TIMING_SLACK
+            start, end = t0 + expected - early, t0 + expected + duration + TIMING_SLACK
+            lo, hi = np.searchsorted(times, [start, end])
+            evaluator = StabilityEvaluator(target, min(REQUIRED_STABILITY, HOLD_FRACTION * duration), table)
+            cents = []
+            for t, freq in zip(times[lo:hi], freqs[lo:hi]):
+                status = evaluator.update(t, freq)
+                if status.state in (CONFIRMED, HOLDING):
+                    if row["onset"] is None:
+                        row["onset"] = round(t - t0, 3)
+                    cents.append(status.deviation_cents)
+                row["passed"] |= status.state == CONFIRMED
+            if row["onset"] is not None:
+                row["timing_error"] = round(row["onset"] - expected, 3)
+                row["cents_error"] = round(float(np.median(cents)), 1)
+        rows.append(row)
+        expected += duration
+        previous = target
+    return rows
+
+
+def _grade_job(job):
+    path, song, options = job
+    try:
+        notes = grade_take(path, find_song(song), **options)
+        error = None
+    except Exception as e:
+        notes, error = [], f"{type(e).__name__}: {e}"
+    return {"take": path, "song": song, "notes": notes, "error": error}
+
+
+def collect_takes(root, song=None, pattern=".wav"):
+    """(caminho, música) de cada arquivo, em ordem estável."""
+    takes = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(pattern):
+                takes.append((os.path.join(dirpath, name), song or os.path.basename(dirpath)))
+    return takes
+
+
+class ResultWriter:
+    """
+    Grava resultados em CSV (uma linha por nota) ou JSON Lines (uma por
+    tentativa), com flush a cada tentativa.
+
+    Ao abrir um arquivo existente, descarta a cauda de uma escrita
+    interrompida e devolve em done as tentativas já completas.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.is_csv = path.lower().endswith(".csv")
+        self.done = self._recover()
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if self.is_csv:
+            self._csv = csv.DictWriter(self._file, CSV_FIELDS)
+            if new:
+                self._csv.writeheader()
+
+    def _recover(self):
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, encoding="utf-8", newline="") as f:
+            text = f.read()
+        # Uma linha sem \n no fim é uma escrita interrompida
+        text = text[:text.rfind("\n") + 1]
+        done = set()
+        if self.is_csv:
+            rows = list(csv.DictReader(io.StringIO(text)))
+            by_take = {}
+            for row in rows:
+                by_take.setdefault(row["take"], []).append(row)
+            # Tentativa com erro ocupa uma linha só (notes_total = 0)
+            done = {take for take, take_rows in by_take.items()
+                    if len(take_rows) == max(1, int(take_rows[0]["notes_total"] or 0))}
+            buf = io.StringIO()
+            writer = csv.DictWriter(buf, CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(row for row in rows if row["take"] in done)
+            text = buf.getvalue()
+        else:
+            for line in text.splitlines():
+                if line.strip():
+                    done.add(json.loads(line)["take"])
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
+        return done
+
+    def write(self, result):
+        if self.is_csv:
+            base = {"take": result["take"], "song": result["song"], "error": result["error"] or "",
+                    "notes_total": len(result["notes"])}
+            if result["notes"]:
+                self._csv.writerows({**base, **note} for note in result["notes"])
+            else:
+                self._csv.writerow(base)
+        else:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self.done.add(result["take"])
+
+    def close(self):
+        self._file.close()
+
+
+def grade_directory(root, out, song=None, workers=None, options=None, verbose=False):
+    """Corrige todas as tentativas de root que ainda não estão em out. Retorna quantas foram corrigidas agora."""
+    writer = ResultWriter(out)
+    takes = [t for t in collect_takes(root, song) if t[0] not in writer.done]
+    jobs = [(path, name, options or {}) for path, name in takes]
+    start = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    try:
+        with ctx.Pool(workers) as pool:
+            for i, result in enumerate(pool.imap_unordered(_grade_job, jobs, chunksize=4), 1):
+                writer.write(result)
+                if verbose:
+                    passed = sum(n["passed"] for n in result["notes"])
+                    status = result["error"] or f"{passed}/{len(result['notes'])} notas"
+                    rate = i / (time.perf_counter() - start) * 3600
+                    print(f"[{i}/{len(jobs)}] {result['take']}: {status}  ({rate:.0f} arquivos/h)")
+    finally:
+        writer.close()
+    return len(jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="pasta com as gravações (busca recursiva por .wav)")
+    parser.add_argument("--out", required=True, help="arquivo de saída (.csv ou .jsonl)")
+    parser.add_argument("--song", default=None, help="nome da música em BIBLIOTECA (padrão: nome da pasta)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--a4", type=float, default=440.0)
+    parser.add_argument("--tuning-offset", type=int, default=0)
+    parser.add_argument("--backend", default="auto")
+    args = parser.parse_args()
+
+    options = {"a4": args.a4, "tuning_offset": args.tuning_offset, "backend": args.backend}
+    n = grade_directory(args.root, args.out, args.song, args.workers, options, verbose=True)
+    print(f"{n} tentativas corrigidas; resultados em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
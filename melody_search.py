@@ -0,0 +1,175 @@
+"""
+Busca de músicas por melodia cantada ou tocada ("query by humming").
+
+As músicas e a consulta viram sequências de intervalos entre notas
+seguidas, em semitons dobrados para -6..+5: assim a busca não depende do tom
+em que se canta nem da oitava. Notas repetidas são juntadas antes, porque
+quem cantarola liga as repetições.
+
+Índice invertido: cada trigrama de intervalos (3 intervalos, 4 notas) aponta
+para as músicas que o contêm. Uma consulta soma os trigramas em comum por
+música com um bincount e só as CANDIDATES músicas com mais acertos vão para
+o reranqueamento: distância de edição semi-global (o trecho pode estar em
+qualquer ponto da música) entre os intervalos, calculada para todos os
+candidatos de uma vez, linha a linha, com operações NumPy sobre a matriz
+(candidatos x posições).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from note_table import NOTE_MIDI
+from phrase import segment_track
+
+NGRAM = 3
+ALPHABET = 12
+CANDIDATES = 1024
+# Custo de trocar um intervalo por outro a um semitom dele (desafinação comum
+# ao cantar); troca maior, inserção e remoção custam 1
+SEMITONE_COST = 0.5
+
+# Resultado de uma busca: posição na biblioteca, nome, distância normalizada
+# pelo tamanho da consulta (0 = trecho idêntico) e trigramas em comum
+Match = namedtuple("Match", ["index", "nome", "distancia", "trigramas"])
+
+
+def _collapse(midi):
+    """Junta notas repetidas seguidas."""
+    midi = np.asarray(midi, dtype=np.int16)
+    if len(midi) == 0:
+        return midi
+    return midi[np.concatenate(([True], midi[1:] != midi[:-1]))]
+
+
+def _interval_codes(midi):
+    """Intervalos entre notas seguidas como códigos 0..11 (intervalo + 6)."""
+    return ((np.diff(midi) + 6) % 12).astype(np.int16)
+
+
+def _ngram_codes(codes):
+    grams = np.zeros(len(codes) - NGRAM + 1, dtype=np.int32)
+    for k in range(NGRAM):
+        grams = grams * ALPHABET + codes[k:len(codes) - NGRAM + 1 + k]
+    return grams
+
+
+def query_notes(notas):
+    """
+    Notas MIDI da consulta. Aceita nomes ("F#", "F#3"), números MIDI ou notas
+    cantadas de phrase.segment_track (qualquer coisa com .midi).
+    """
+    midi = []
+    for nota in notas:
+        if isinstance(nota, str):
+            midi.append(NOTE_MIDI[nota])
+        elif hasattr(nota, "midi"):
+            midi.append(int(nota.midi))
+        else:
+            midi.append(int(nota))
+    return midi
+
+
+class MelodyIndex:
+    """Índice de trigramas de intervalos sobre uma biblioteca (SongLibrary ou lista de Musica)."""
+
+    def __init__(self, library):
+        if hasattr(library, "inicio"):
+            # SongLibrary: direto das colunas do corpus, sem montar uma Musica por música
+            midi, inicio = np.asarray(library.midi), np.asarray(library.inicio)
+            self.nomes = library.nomes
+        else:
+            self.nomes = [m.nome for m in library]
+            midi = np.concatenate([m.midi for m in library] or [np.zeros(0, np.uint8)])
+            inicio = np.concatenate(([0], np.cumsum([len(m.midi) for m in library]))).astype(np.int64)
+        n_songs = len(inicio) - 1
+        song = np.repeat(np.arange(n_songs, dtype=np.int32), np.diff(inicio))
+        midi = midi.astype(np.int16)
+
+        # Notas repetidas juntadas, dentro de cada música
+        keep = np.ones(len(midi), dtype=bool)
+        keep[1:] = (midi[1:] != midi[:-1]) | (song[1:] != song[:-1])
+        midi, song = midi[keep], song[keep]
+
+        # Intervalos de cada música em sequência, com a tabela de início
+        same = song[1:] == song[:-1]
+        self.intervals = _interval_codes(midi)[same]
+        interval_song = song[:-1][same]
+        self.interval_start = np.zeros(n_songs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(interval_song, minlength=n_songs), out=self.interval_start[1:])
+
+        # Listas invertidas: pares (trigrama, música) distintos ordenados por trigrama
+        if len(self.intervals) >= NGRAM:
+            grams = _ngram_codes(self.intervals)
+            gram_song = interval_song[:len(grams)]
+            inside = gram_song == interval_song[NGRAM - 1:]
+            pairs = np.sort(grams[inside].astype(np.int64) * max(n_songs, 1) + gram_song[inside])
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        else:
+            pairs = np.zeros(0, dtype=np.int64)
+        self.postings = (pairs % max(n_songs, 1)).astype(np.int32)
+        self.gram_start = np.searchsorted(pairs // max(n_songs, 1), np.arange(ALPHABET ** NGRAM + 1))
+        self.n_songs = n_songs
+
+    def candidates(self, codes, limit=CANDIDATES):
+        """(músicas, trigramas em comum) das limit músicas com mais trigramas da consulta."""
+        grams = np.unique(_ngram_codes(codes))
+        lists = [self.postings[self.gram_start[g]:self.gram_start[g + 1]] for g in grams.tolist()]
+        hits = np.bincount(np.concatenate(lists), minlength=self.n_songs)
+        found = np.flatnonzero(hits)
+        if len(found) > limit:
+            found = found[np.argpartition(hits[found], -limit)[-limit:]]
+        return found, hits[found]
+
+    def distances(self, codes, songs):
+        """Distância de edição semi-global da consulta a cada música (vetorizada)."""
+        starts = self.interval_start[songs]
+        lengths = self.interval_start[songs + 1] - starts
+        width = int(lengths.max())
+        cols = np.arange(width)
+        valid = cols[None, :] < lengths[:, None]
+        target = np.where(valid, self.intervals[np.minimum(starts[:, None] + cols, len(self.intervals) - 1)], -1)
+
+        # D[j] = custo de alinhar a consulta até a linha atual terminando na
+        # posição j da música; a linha 0 é zero (o trecho pode começar em qualquer lugar)
+        row = np.zeros((len(songs), width + 1))
+        offsets = np.arange(width + 1)
+        for code in codes.tolist():
+            d = np.abs(target - code) % 12
+            d = np.minimum(d, 12 - d)
+            sub = np.where(d == 0, 0.0, np.where(d == 1, SEMITONE_COST, 1.0))
+            step = row + 1.0                       # intervalo da consulta sem par na música
+            step[:, 1:] = np.minimum(step[:, 1:], row[:, :-1] + np.where(valid, sub, 1.0))
+            # Intervalos da música sem par na consulta: mínimo acumulado de (step - j) + j
+            row = np.minimum.accumulate(step - offsets, axis=1) + offsets
+        # O trecho pode terminar em qualquer ponto da música (dentro dela)
+        row[:, 1:][~valid] = np.inf
+        return row.min(axis=1)
+
+    def search(self, notas, limit=10):
+        """Lista de Match, da mais parecida para a menos; vazia se a consulta tem menos de 4 notas distintas."""
+        codes = _interval_codes(_collapse(query_notes(notas)))
+        if len(codes) < NGRAM:
+            return []
+        songs, hits = self.candidates(codes)
+        if len(songs) == 0:
+            return []
+        dist = self.distances(codes, songs) / len(codes)
+        order = np.lexsort((-hits, dist))[:limit]
+        return [Match(int(songs[k]), self.nomes[int(songs[k])], float(dist[k]), int(hits[k])) for k in order]
+
+
+_index = None
+
+
+def search(notas, limit=10):
+    """Busca na BIBLIOTECA (o índice é montado na primeira chamada)."""
+    global _index
+    if _index is None:
+        from Musicas import BIBLIOTECA
+        _index = MelodyIndex(BIBLIOTECA)
+    return _index.search(notas, limit)
+
+
+def search_track(times, freqs, note_table, limit=10):
+    """Atalho: segmenta uma trilha de pitch cantada (phrase.segment_track) e busca."""
+    return search(segment_track(times, freqs, note_table), limit)
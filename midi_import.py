@@ -0,0 +1,356 @@
+"""
+Importação de arquivos MIDI (SMF tipo 0 e 1) para a biblioteca de músicas.
+
+Cada arquivo é lido em streaming: os chunks são percorridos com um buffer de
+tamanho fixo e só os eventos de nota e de andamento são guardados (o arquivo
+inteiro nunca fica em memória). Cada par (trilha, canal) é uma voz
+candidata; a melodia é a mais aguda entre as vozes quase monofônicas e
+movimentadas (bateria, canal 10, fica de fora), reduzida a uma nota por vez
+pela mais aguda ("skyline"). Os ticks viram segundos pelo mapa de andamentos e o resultado é
+uma sequência (nome com oitava, duração) como a de Musica; as pausas são
+somadas à nota anterior, para os ataques continuarem no tempo certo.
+
+Uso:
+    python midi_import.py PASTA [--out musicas/midi.jsonl] [--workers 8] [--retry-failed]
+
+Os arquivos são distribuídos num pool de processos e cada música entra no
+.jsonl (formato da biblioteca, veja song_library.py) assim que termina. Os
+arquivos que falham vão, com o erro, para um arquivo ao lado da saída
+(midi.jsonl.erros, fora dos formatos que a biblioteca lê). Rodar de novo com a
+mesma saída pula os arquivos já importados e os que falharam; --retry-failed
+tenta estes de novo.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import struct
+import time
+
+import numpy as np
+
+from Musicas import DIRETORIO_MUSICAS
+from note_table import NOTE_NAMES
+
+READ_BLOCK = 64 * 1024
+EVENT_HEADER = 10
+DEFAULT_TEMPO = 500000  # microssegundos por semínima (120 BPM)
+DRUM_CHANNEL = 9
+MIN_NOTES = 4
+# Voz candidata a melodia: quase sem notas simultâneas e com ao menos essa
+# fração das notas da voz mais movimentada
+MELODY_MONOPHONY = 0.9
+MELODY_SHARE = 0.25
+# Notas mais curtas que isso (em segundos) são ornamentos/ruído de edição
+MIN_NOTE_SECONDS = 0.03
+# Sufixo do arquivo de falhas ao lado da saída
+FAILED_SUFFIX = ".erros"
+
+
+class MidiError(ValueError):
+    pass
+
+
+class _ChunkReader:
+    """Entrega os bytes de um chunk aos blocos, sem carregar o chunk inteiro."""
+
+    def __init__(self, f, length):
+        self._f = f
+        self._left = length  # bytes do chunk ainda no arquivo
+
+    def window(self, buf, pos, need):
+        """
+        (buf, pos) com ao menos need bytes a partir de pos, ou com tudo o que
+        resta do chunk se for menos que isso.
+        """
+        if len(buf) - pos >= need or not self._left:
+            return buf, pos
+        data = self._f.read(min(max(READ_BLOCK, need), self._left))
+        if not data:
+            raise MidiError("chunk truncado")
+        self._left -= len(data)
+        return buf[pos:] + data, 0
+
+    def skip(self, buf, pos, n):
+        """Pula n bytes (dados de meta-evento/sysex); o que ainda não foi lido é pulado com seek."""
+        available = len(buf) - pos
+        if n <= available:
+            return buf, pos + n
+        n -= available
+        if n > self._left:
+            raise MidiError("chunk truncado")
+        self._f.seek(n, os.SEEK_CUR)
+        self._left -= n
+        return b"", 0
+
+    def finish(self):
+        """Pula o que sobrou do chunk (eventos depois do fim de trilha)."""
+        self._f.seek(self._left, os.SEEK_CUR)
+        self._left = 0
+
+
+def _varlen(buf, pos):
+    value = 0
+    for _ in range(4):
+        b = buf[pos]
+        pos += 1
+        value = (value << 7) | (b & 0x7F)
+        if not b & 0x80:
+            return value, pos
+    raise MidiError("quantidade de tamanho variável inválida")
+
+
+def _read_track(reader, tempos):
+    """
+    Eventos de nota de uma trilha como {canal: [(tick_on, tick_off, nota)]};
+    os andamentos vão para tempos.
+    """
+    voices = {}
+    open_notes = {}
+    tick = 0
+    status = None
+    buf, pos = b"", 0
+    window = reader.window
+    try:
+        while True:
+            # Cabeçalho de evento mais longo: delta (4) + FF tipo tamanho (6)
+            buf, pos = window(buf, pos, EVENT_HEADER)
+            if pos >= len(buf):
+                break
+            delta, pos = _varlen(buf, pos)
+            tick += delta
+            b = buf[pos]
+            pos += 1
+            if b == 0xFF:
+                kind = buf[pos]
+                length, pos = _varlen(buf, pos + 1)
+                if kind == 0x51 and length == 3:
+                    buf, pos = window(buf, pos, 3)
+                    tempos.append((tick, int.from_bytes(buf[pos:pos + 3], "big")))
+                elif kind == 0x2F:
+                    break
+                buf, pos = reader.skip(buf, pos, length)
+                continue
+            if b == 0xF0 or b == 0xF7:
+                length, pos = _varlen(buf, pos)
+                buf, pos = reader.skip(buf, pos, length)
+                continue
+            if b & 0x80:
+                status = b
+                first = buf[pos]
+                pos += 1
+            elif status is None:
+                raise MidiError("running status sem evento anterior")
+            else:
+                first = b  # running status: b já é o primeiro dado
+            kind = status & 0xF0
+            if kind == 0xC0 or kind == 0xD0:
+                continue
+            second = buf[pos]
+            pos += 1
+            if kind == 0x90 and second > 0:
+                open_notes.setdefault((status & 0x0F, first), []).append(tick)
+            elif kind == 0x80 or kind == 0x90:
+                starts = open_notes.get((status & 0x0F, first))
+                if starts:
+                    voices.setdefault(status & 0x0F, []).append((starts.pop(0), tick, first))
+    except IndexError:
+        raise MidiError("evento truncado no fim da trilha") from None
+    reader.finish()
+    return voices
+
+
+def read_midi(path):
+    """(divisão, andamentos [(tick, us por semínima)], vozes {(trilha, canal): [(on, off, nota)]})."""
+    with open(path, "rb") as f:
+        header = f.read(14)
+        if len(header) < 14 or header[:4] != b"MThd":
+            raise MidiError("não é um arquivo MIDI padrão")
+        length, fmt, ntracks, division = struct.unpack(">IHHH", header[4:])
+        if fmt not in (0, 1):
+            raise MidiError(f"SMF tipo {fmt} não suportado")
+        f.seek(length - 6, os.SEEK_CUR)
+        tempos = []
+        voices = {}
+        for track in range(ntracks):
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                break
+            kind, length = chunk[:4], struct.unpack(">I", chunk[4:])[0]
+            reader = _ChunkReader(f, length)
+            if kind != b"MTrk":
+                reader.finish()
+                continue
+            for channel, notes in _read_track(reader, tempos).items():
+                voices[(track, channel)] = notes
+    return division, sorted(tempos), voices
+
+
+def ticks_to_seconds(ticks, division, tempos):
+    """Converte ticks (array) em segundos seguindo o mapa de andamentos."""
+    ticks = np.asarray(ticks, dtype=np.float64)
+    if division & 0x8000:
+        # SMPTE: quadros por segundo (negativo no byte alto) x ticks por quadro
+        fps = 256 - (division >> 8)
+        return ticks / (fps * (division & 0xFF))
+    change_ticks = np.array([0] + [t for t, _ in tempos if t > 0], dtype=np.float64)
+    change_tempos = [DEFAULT_TEMPO]
+    for t, tempo in tempos:
+        if t > 0:
+            change_tempos.append(tempo)
+        else:
+            change_tempos[0] = tempo
+    seconds_per_tick = np.array(change_tempos, dtype=np.float64) / 1e6 / division
+    # Segundos acumulados no início de cada trecho de andamento constante
+    starts = np.concatenate(([0.0], np.cumsum(np.diff(change_ticks) * seconds_per_tick[:-1])))
+    segment = np.searchsorted(change_ticks, ticks, side="right") - 1
+    return starts[segment] + (ticks - change_ticks[segment]) * seconds_per_tick[segment]
+
+
+def skyline(notes):
+    """Reduz uma voz a uma nota por vez: em ataques simultâneos fica a mais aguda, e cada nota termina no próximo ataque."""
+    notes = np.array(sorted(notes, key=lambda n: (n[0], -n[2])), dtype=np.int64).reshape(-1, 3)
+    if len(notes) == 0:
+        return notes
+    notes = notes[np.concatenate(([True], notes[1:, 0] != notes[:-1, 0]))]
+    notes[:-1, 1] = np.minimum(notes[:-1, 1], notes[1:, 0])
+    return notes
+
+
+def pick_melody(voices):
+    """
+    Chave da voz mais parecida com uma melodia, ou None: entre as vozes quase
+    monofônicas e com uma fração razoável das notas da mais movimentada, a
+    mais aguda (acompanhamento em acordes e baixo ficam de fora).
+    """
+    candidates = []
+    for key, notes in voices.items():
+        if key[1] == DRUM_CHANNEL or len(notes) < MIN_NOTES:
+            continue
+        mono = skyline(notes)
+        # Fração das notas que sobrevivem à redução monofônica: 1.0 = voz já monofônica
+        candidates.append((key, len(mono), len(mono) / len(notes), float(np.mean(mono[:, 2]))))
+    if not candidates:
+        return None
+    busiest = max(n for _, n, _, _ in candidates)
+    melodic = [c for c in candidates if c[2] >= MELODY_MONOPHONY and c[1] >= MELODY_SHARE * busiest]
+    if not melodic:
+        return max(candidates, key=lambda c: c[1] * c[2])[0]
+    return max(melodic, key=lambda c: c[3])[0]
+
+
+def melody_notes(path):
+    """Sequência [(nome, duração em segundos)] da melodia do arquivo."""
+    division, tempos, voices = read_midi(path)
+    if division == 0:
+        raise MidiError("divisão de tempo zero")
+    key = pick_melody(voices)
+    if key is None:
+        raise MidiError("nenhuma voz melódica encontrada")
+    mono = skyline(voices[key])
+    onsets = ticks_to_seconds(mono[:, 0], division, tempos)
+    offsets = ticks_to_seconds(mono[:, 1], division, tempos)
+    keep = offsets - onsets >= MIN_NOTE_SECONDS
+    onsets, pitches = onsets[keep], mono[keep, 2]
+    if len(onsets) < MIN_NOTES:
+        raise MidiError("melodia curta demais")
+    # Cada nota dura até o próximo ataque (a pausa entra na nota anterior); a última, até soltar
+    durations = np.append(np.diff(onsets), offsets[keep][-1] - onsets[-1])
+    return [(NOTE_NAMES[p], round(float(d), 3)) for p, d in zip(pitches.tolist(), durations)]
+
+
+def _import_job(job):
+    path, relpath, genero = job
+    try:
+        notas = melody_notes(path)
+        song = {"nome": os.path.splitext(os.path.basename(path))[0], "genero": genero,
+                "notas": notas, "origem": relpath}
+        return song, None
+    except Exception as e:
+        # Qualquer arquivo malformado vira um erro dele, nunca da importação inteira
+        return {"origem": relpath}, f"{type(e).__name__}: {e}"
+
+
+def collect_midi(root):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith((".mid", ".midi")):
+                path = os.path.join(dirpath, name)
+                files.append((path, os.path.relpath(path, root)))
+    return files
+
+
+def _imported(out):
+    """Arquivos (campo origem) já gravados em out; descarta a cauda de uma escrita interrompida."""
+    if not os.path.exists(out):
+        return set()
+    with open(out, "rb") as f:
+        data = f.read()
+    complete = data[:data.rfind(b"\n") + 1]
+    if len(complete) != len(data):
+        with open(out, "r+b") as f:
+            f.truncate(len(complete))
+    done = set()
+    for line in complete.splitlines():
+        if line.strip():
+            done.add(json.loads(line).get("origem"))
+    return done
+
+
+def import_directory(root, out=None, workers=None, genero="MIDI", verbose=False, retry_failed=False):
+    """
+    Importa os MIDI de root para out (.jsonl da biblioteca). Retorna (importados, com erro).
+
+    Pula os arquivos já em out e os que já falharam (out + FAILED_SUFFIX), a
+    menos que retry_failed peça para tentar estes de novo.
+    """
+    out = out or os.path.join(DIRETORIO_MUSICAS, "midi.jsonl")
+    failures = out + FAILED_SUFFIX
+    done = _imported(out)
+    if retry_failed:
+        # Quem falhar de novo é gravado de novo
+        if os.path.exists(failures):
+            os.remove(failures)
+    else:
+        done |= _imported(failures)
+    jobs = [(path, rel, genero) for path, rel in collect_midi(root) if rel not in done]
+    imported = failed = 0
+    start = time.perf_counter()
+    ctx = multiprocessing.get_context("spawn")
+    with open(out, "a", encoding="utf-8") as f, open(failures, "a", encoding="utf-8") as errors, \
+            ctx.Pool(workers) as pool:
+        for i, (song, error) in enumerate(pool.imap_unordered(_import_job, jobs, chunksize=16), 1):
+            if error is None:
+                f.write(json.dumps(song, ensure_ascii=False) + "\n")
+                f.flush()
+                imported += 1
+            else:
+                errors.write(json.dumps({"origem": song["origem"], "erro": error}, ensure_ascii=False) + "\n")
+                errors.flush()
+                failed += 1
+            if verbose and (error or i % 100 == 0 or i == len(jobs)):
+                rate = i / (time.perf_counter() - start)
+                status = error or f"{len(song['notas'])} notas"
+                print(f"[{i}/{len(jobs)}] {song['origem']}: {status}  ({rate:.0f} arquivos/s)")
+    return imported, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("root", help="pasta com os arquivos .mid (busca recursiva)")
+    parser.add_argument("--out", default=None, help="arquivo .jsonl de saída (padrão: musicas/midi.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos da máquina)")
+    parser.add_argument("--genre", default="MIDI", help="gênero gravado nas músicas importadas")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="tenta de novo os arquivos que falharam nas execuções anteriores")
+    args = parser.parse_args()
+
+    imported, failed = import_directory(args.root, args.out, args.workers, args.genre, verbose=True,
+                                        retry_failed=args.retry_failed)
+    print(f"{imported} músicas importadas, {failed} arquivos com erro")
+
+
+if __name__ == "__main__":
+    main()
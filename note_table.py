@@ -0,0 +1,99 @@
+import math
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+NOTAS = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
+PITCH_CLASS = {nome: i for i, nome in enumerate(NOTAS)}
+MIDI_RANGE = 128
+# Oitava de uma nota escrita sem ela ("D" = D4)
+DEFAULT_OCTAVE = 4
+# Nome com oitava de cada nota MIDI ("C4" = 60)
+NOTE_NAMES = [f"{NOTAS[m % 12]}{m // 12 - 1}" for m in range(MIDI_RANGE)]
+# Nota MIDI de cada nome aceito nos dados: com oitava ("D5", "C#-1") ou sem
+NOTE_MIDI = {nome: (DEFAULT_OCTAVE + 1) * 12 + pc for nome, pc in PITCH_CLASS.items()}
+NOTE_MIDI.update({nome: m for m, nome in enumerate(NOTE_NAMES)})
+
+# Resultado de uma consulta: nota MIDI, classe (0 = C ... 11 = B), oitava e
+# desvio em cents (-50 a +50) em relação à nota afinada mais próxima
+NoteInfo = namedtuple("NoteInfo", ["midi", "pitch_class", "octave", "cents"])
+
+NOTE_DTYPE = np.dtype([("midi", "<i2"), ("pitch_class", "i1"), ("octave", "i1"), ("cents", "<f4")])
+
+
+class NoteTable:
+    """
+    Tabela pré-calculada de frequência -> nota para uma afinação.
+
+    O limite superior de cada nota MIDI (meio semitom acima) fica num vetor
+    ordenado, então achar a nota é uma busca binária; os nomes ("C#4") também
+    são montados uma vez só. TUNING_OFFSET desloca a referência do mesmo jeito
+    que desloca o sintetizador, então a nota que o jogador ouve é a que o
+    detector reconhece.
+    """
+
+    def __init__(self, a4=440.0, tuning_offset=0):
+        self.a4 = a4
+        self.tuning_offset = tuning_offset
+        self.reference = a4 * 2 ** (tuning_offset / 12.0)
+        midi = np.arange(MIDI_RANGE)
+        self.freqs = self.reference * 2 ** ((midi - 69) / 12.0)
+        self.edges = self.reference * 2 ** ((midi - 69 + 0.5) / 12.0)
+        self.names = list(NOTE_NAMES)
+        self._freqs = self.freqs.tolist()
+        self._edges = self.edges.tolist()
+
+    def lookup(self, freq):
+        """NoteInfo da frequência, ou None para silêncio / fora da faixa MIDI."""
+        if freq <= 0:
+            return None
+        midi = bisect_left(self._edges, freq)
+        if midi >= MIDI_RANGE:
+            return None
+        return NoteInfo(midi, midi % 12, midi // 12 - 1, 1200.0 * math.log2(freq / self._freqs[midi]))
+
+    def lookup_array(self, freqs):
+        """
+        Versão vetorizada de lookup para um array de frequências.
+
+        Retorna um array estruturado NOTE_DTYPE; entradas inválidas (<= 0 ou
+        acima da faixa) ficam com midi = -1 e cents = NaN.
+        """
+        freqs = np.asarray(freqs, dtype=np.float64)
+        midi = np.searchsorted(self.edges, freqs)
+        valid = (freqs > 0) & (midi < MIDI_RANGE)
+        midi = np.where(valid, midi, -1)
+        safe = np.clip(midi, 0, MIDI_RANGE - 1)
+        out = np.empty(freqs.shape, dtype=NOTE_DTYPE)
+        out["midi"] = midi
+        out["pitch_class"] = np.where(valid, safe % 12, -1)
+        out["octave"] = np.where(valid, safe // 12 - 1, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out["cents"] = np.where(valid, 1200.0 * np.log2(freqs / self.freqs[safe]), np.nan)
+        return out
+
+    def name(self, midi):
+        return self.names[midi]
+
+    def freq(self, nome, octave=DEFAULT_OCTAVE):
+        """Frequência afinada de um nome de nota ("F#" na oitava pedida, ou "F#3")."""
+        if nome in PITCH_CLASS:
+            return self._freqs[(octave + 1) * 12 + PITCH_CLASS[nome]]
+        return self._freqs[NOTE_MIDI[nome]]
+
+
+@lru_cache(maxsize=8)
+def get_note_table(a4=440.0, tuning_offset=0):
+    """Tabela para a afinação pedida; mudar A4 ou o offset gera (e guarda) outra."""
+    return NoteTable(a4, tuning_offset)
+
+
+def pitch_class_distance(pitch_class, cents, target_pitch_class):
+    """
+    Distância em cents até a ocorrência mais próxima da classe alvo, em
+    qualquer oitava (negativo = abaixo do alvo).
+    """
+    semitones = (pitch_class - target_pitch_class + 6) % 12 - 6
+    return semitones * 100.0 + cents
@@ -0,0 +1,173 @@
+"""
+Modo frase: o aluno canta a frase revelada inteira de uma vez.
+
+A trilha de pitch (tempo, frequência) é dividida em notas pelos ataques
+(início de voz ou troca de semitom sustentada) e a sequência de notas cantadas
+é alinhada com a da música por DTW. O DTW percorre a matriz por
+antidiagonais: todas as células de uma antidiagonal dependem só das duas
+anteriores, então cada passo é uma operação NumPy sobre o vetor inteiro em vez
+de um laço duplo em Python.
+"""
+from collections import namedtuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from note_table import PITCH_CLASS, pitch_class_distance
+
+# Nota cantada: início e fim (s), nota MIDI, classe e desvio médio em cents
+Segment = namedtuple("Segment", ["start", "end", "midi", "pitch_class", "cents"])
+
+# Resultado por nota da música; onset/timing_error/cents são None se a nota não foi achada
+NoteScore = namedtuple("NoteScore", ["index", "target", "passed", "cents", "onset", "timing_error"])
+
+MIN_SEGMENT = 0.08   # segundos; trechos mais curtos são ruído de transição
+SMOOTH_FRAMES = 3    # mediana móvel sobre a nota MIDI de cada frame
+STEP_PENALTY = 0.5   # custo extra de uma nota cantada a mais/a menos no DTW
+
+
+def segment_track(times, freqs, note_table, min_duration=MIN_SEGMENT, smooth=SMOOTH_FRAMES):
+    """Lista de Segment da trilha de pitch (tempos crescentes, freq 0 = silêncio)."""
+    times = np.asarray(times, dtype=np.float64)
+    if len(times) == 0:
+        return []
+    info = note_table.lookup_array(freqs)
+    midi = info["midi"].astype(np.int64)
+    if smooth > 1 and len(midi) >= smooth:
+        pad = smooth // 2
+        padded = np.pad(midi, pad, mode="edge")
+        midi = np.median(sliding_window_view(padded, smooth), axis=1).astype(np.int64)
+    period = float(np.median(np.diff(times))) if len(times) > 1 else 0.0
+
+    # Um ataque em cada troca de nota (ou de voz/silêncio)
+    bounds = np.flatnonzero(np.diff(midi)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(midi)]))
+    # Cents em relação à nota já suavizada, dobrados para a oitava dela (um
+    # erro de oitava do estimador não vira -1200); frames sem pitch ficam fora
+    freqs = np.asarray(freqs, dtype=np.float64)
+    valid = (midi >= 0) & (freqs > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cents = 1200.0 * np.log2(freqs / note_table.freqs[np.clip(midi, 0, None)])
+        cents = np.where(valid, (cents + 600.0) % 1200.0 - 600.0, 0.0)
+    mean_cents = np.add.reduceat(cents, starts) / np.maximum(np.add.reduceat(valid.astype(np.int64), starts), 1)
+
+    segments = []
+    for s, e, c in zip(starts, ends, mean_cents):
+        m = int(midi[s])
+        start, end = times[s], times[e - 1] + period
+        if m < 0 or end - start < min_duration:
+            continue
+        last = segments[-1] if segments else None
+        if last is not None and last.midi == m and start - last.end < min_duration:
+            # Mesma nota partida por um trecho curto descartado: junta
+            weight = (last.end - last.start) / (end - last.start)
+            segments[-1] = last._replace(end=end, cents=last.cents * weight + c * (1 - weight))
+        else:
+            segments.append(Segment(start, end, m, m % 12, float(c)))
+    return segments
+
+
+def pitch_cost(sung_pcs, target_pcs):
+    """Matriz (cantadas x alvo) da distância em semitons entre classes de nota (0 a 6)."""
+    d = np.abs(np.asarray(sung_pcs)[:, None] - np.asarray(target_pcs)[None, :]) % 12
+    return np.minimum(d, 12 - d).astype(np.float64)
+
+
+def dtw_align(cost, step_penalty=STEP_PENALTY):
+    """
+    Alinhamento DTW de custo mínimo entre as linhas e colunas de cost.
+
+    Retorna (custo total, caminho) com o caminho como lista de (linha, coluna)
+    do início ao fim.
+    """
+    n, m = cost.shape
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(
+            acc[i - 1, j - 1], np.minimum(acc[i - 1, j], acc[i, j - 1]) + step_penalty)
+
+    # Backtracking: O(n + m) passos
+    path = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        path.append((i - 1, j - 1))
+        diag, up, left = acc[i - 1, j - 1], acc[i - 1, j] + step_penalty, acc[i, j - 1] + step_penalty
+        if diag <= up and diag <= left:
+            i, j = i - 1, j - 1
+        elif up <= left:
+            i -= 1
+        else:
+            j -= 1
+    path.reverse()
+    return float(acc[n, m]), path
+
+
+def score_phrase(segments, notes, target_midi=None):
+    """
+    Pontua cada nota de notes (lista de (nome, duração)) contra as notas cantadas.
+
+    Uma nota passa se alguma nota cantada alinhada a ela tem a mesma classe;
+    com target_midi (nota MIDI de cada nota, como em StabilityEvaluator) ela
+    precisa estar também na mesma oitava. O alinhamento é sempre pelas classes.
+    O atraso é medido contra o tempo esperado reescalado para o andamento do
+    aluno (quem canta tudo mais devagar, mas no ritmo, não é penalizado).
+    """
+    if target_midi is None:
+        targets = [PITCH_CLASS.get(name, -1) for name, _ in notes]
+    else:
+        targets = [int(m) % 12 for m in target_midi]
+    if not segments or not notes:
+        return [NoteScore(k, name, False, None, None, None) for k, (name, _) in enumerate(notes)]
+
+    _, path = dtw_align(pitch_cost([s.pitch_class for s in segments], targets))
+    matched = {}
+    for i, j in path:
+        seg = segments[i]
+        best = matched.get(j)
+        hit = seg.pitch_class == targets[j] if target_midi is None else seg.midi == target_midi[j]
+        if hit and (best is None or seg.end - seg.start > best.end - best.start):
+            matched[j] = seg
+
+    t0 = segments[0].start
+    expected = np.concatenate(([0.0], np.cumsum([d for _, d in notes])))
+    scale = (segments[-1].end - t0) / expected[-1] if expected[-1] > 0 else 1.0
+
+    # Notas repetidas cantadas ligadas viram uma nota cantada só, alinhada a
+    # várias notas da música: o trecho é repartido pelas durações esperadas
+    onsets = {}
+    k = 0
+    while k < len(notes):
+        seg = matched.get(k)
+        if seg is None:
+            k += 1
+            continue
+        last = k
+        while matched.get(last + 1) is seg:
+            last += 1
+        span = expected[last + 1] - expected[k]
+        for q in range(k, last + 1):
+            onsets[q] = seg.start + (seg.end - seg.start) * (expected[q] - expected[k]) / span if span else seg.start
+        k = last + 1
+
+    scores = []
+    for k, (name, _) in enumerate(notes):
+        seg = matched.get(k)
+        if seg is None:
+            scores.append(NoteScore(k, name, False, None, None, None))
+            continue
+        onset = float(onsets[k] - t0)
+        if target_midi is None:
+            cents = pitch_class_distance(seg.pitch_class, seg.cents, targets[k])
+        else:
+            cents = (seg.midi - target_midi[k]) * 100.0 + seg.cents
+        scores.append(NoteScore(k, name, True, float(cents), onset, float(onset - expected[k] * scale)))
+    return scores
+
+
+def score_track(times, freqs, notes, note_table, target_midi=None):
+    """Atalho: segmenta a trilha e pontua as notas."""
+    return score_phrase(segment_track(times, freqs, note_table), notes, target_midi)
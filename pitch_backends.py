@@ -0,0 +1,144 @@
+import numpy as np
+
+
+class PitchBackend:
+    """
+    Interface dos estimadores de pitch usados pelo PitchDetector.
+
+    Cada chamada recebe um hop de amostras float32 (o estimador guarda a
+    janela deslizante internamente) e retorna a frequência em Hz, ou 0.0 se
+    não houver pitch. A confiança da última estimativa fica em `confidence`.
+    """
+    name = None
+
+    def __init__(self, win_size, hop_size, rate):
+        self.win_size = win_size
+        self.hop_size = hop_size
+        self.rate = rate
+        self.confidence = 0.0
+
+    def __call__(self, samples):
+        raise NotImplementedError
+
+
+class AubioBackend(PitchBackend):
+    """Qualquer método do aubio.pitch (default, yin, yinfft, yinfast, mcomb, schmitt, fcomb, specacf)."""
+    name = "aubio"
+
+    def __init__(self, win_size, hop_size, rate, method="default", tolerance=None):
+        super().__init__(win_size, hop_size, rate)
+        import aubio
+
+        self.method = method
+        self._pitch = aubio.pitch(method, win_size, hop_size, rate)
+        self._pitch.set_unit("Hz")
+        if tolerance is not None:
+            self._pitch.set_tolerance(tolerance)
+
+    def __call__(self, samples):
+        freq = float(self._pitch(samples)[0])
+        self.confidence = float(self._pitch.get_confidence())
+        return freq
+
+
+class YinBackend(PitchBackend):
+    """
+    YIN em NumPy puro, sem dependências compiladas.
+
+    A função diferença d(tau) = sum (x[j] - x[j+tau])^2 é expandida em
+    energia - 2 * autocorrelação; a autocorrelação sai de uma única FFT e as
+    energias de uma soma cumulativa, então o custo é O(W log W) por hop em vez
+    de O(W * tau_max).
+    """
+    name = "yin"
+
+    def __init__(self, win_size, hop_size, rate, threshold=0.15, fmin=60.0, fmax=1200.0):
+        super().__init__(win_size, hop_size, rate)
+        self.threshold = threshold
+        self.tau_min = max(2, int(rate / fmax))
+        self.tau_max = min(win_size // 2, int(np.ceil(rate / fmin)) + 1)
+        # Integra sobre tudo o que cabe na janela para o maior atraso buscado
+        self._length = win_size - self.tau_max
+        self._n_fft = 1 << int(np.ceil(np.log2(win_size)))
+        self._taus = np.arange(self.tau_max + 1)
+        self._buffer = np.zeros(win_size, dtype=np.float64)
+
+    def _cmnd(self, x):
+        """Função diferença normalizada pela média cumulativa (passo 3 do YIN)."""
+        length, tau_max, n = self._length, self.tau_max, self._n_fft
+        spectrum = np.fft.rfft(x, n)
+        head = np.fft.rfft(x[:length], n)
+        corr = np.fft.irfft(np.conj(head) * spectrum, n)[:tau_max + 1]
+        energy = np.concatenate(([0.0], np.cumsum(x * x)))
+        diff = energy[length] + (energy[self._taus + length] - energy[self._taus]) - 2 * corr
+        diff[0] = 0.0
+        cmnd = np.ones_like(diff)
+        running = np.cumsum(diff[1:])
+        cmnd[1:] = diff[1:] * self._taus[1:] / np.maximum(running, 1e-12)
+        return cmnd
+
+    def __call__(self, samples):
+        hop = len(samples)
+        if hop >= self.win_size:
+            self._buffer[:] = samples[-self.win_size:]
+        else:
+            self._buffer[:-hop] = self._buffer[hop:]
+            self._buffer[-hop:] = samples
+
+        x = self._buffer
+        if np.dot(x[:self._length], x[:self._length]) < 1e-10:
+            self.confidence = 0.0
+            return 0.0
+
+        cmnd = self._cmnd(x)
+        lo, hi = self.tau_min, self.tau_max
+        below = np.flatnonzero(cmnd[lo:hi] < self.threshold)
+        if below.size:
+            tau = lo + int(below[0])
+            # Desce até o fundo do vale que cruzou o limiar
+            rising = np.flatnonzero(np.diff(cmnd[tau:hi]) >= 0)
+            tau += int(rising[0]) if rising.size else 0
+        else:
+            tau = lo + int(np.argmin(cmnd[lo:hi]))
+            if cmnd[tau] > 2 * self.threshold:
+                self.confidence = 0.0
+                return 0.0
+
+        # Interpolação parabólica em torno do mínimo
+        shift = 0.0
+        if lo < tau < hi - 1:
+            a, b, c = cmnd[tau - 1], cmnd[tau], cmnd[tau + 1]
+            denom = a - 2 * b + c
+            if denom > 0:
+                shift = 0.5 * (a - c) / denom
+        self.confidence = float(max(0.0, 1.0 - cmnd[tau]))
+        return float(self.rate / (tau + shift))
+
+
+BACKENDS = {
+    AubioBackend.name: AubioBackend,
+    YinBackend.name: YinBackend,
+}
+
+
+def aubio_available():
+    try:
+        import aubio  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_backend(name, win_size, hop_size, rate, **options):
+    """
+    Instancia o estimador pelo nome ("aubio", "yin" ou "auto").
+
+    "auto" usa o aubio quando ele está instalado e o YIN em NumPy caso contrário.
+    """
+    if name == "auto":
+        name = AubioBackend.name if aubio_available() else YinBackend.name
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Backend de pitch desconhecido: {name!r} (opções: auto, {', '.join(BACKENDS)})")
+    return cls(win_size, hop_size, rate, **options)
@@ -0,0 +1,479 @@
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from vad import VoiceActivityGate
+from decimator import Decimator
+from pitch_backends import create_backend
+from note_table import NOTAS, get_note_table
+from recorder import SessionRecorder
+from audio_sources import MicSource
+
+# Layout de cada frame publicado pelo detector
+FRAME_DTYPE = np.dtype([
+    ("seq", "<u8"),         # número de sequência (0 = slot sendo escrito)
+    ("timestamp", "<f8"),   # time.time() da análise
+    ("freq", "<f4"),        # frequência detectada em Hz (0 = nada)
+    ("confidence", "<f4"),  # confiança reportada pelo estimador
+    ("voiced", "u1"),       # 0 = bloco descartado pelo porteiro de voz (silêncio)
+])
+
+# ==============================================================================
+# RING BUFFER DE FRAMES (UM PRODUTOR, LEITORES SEM LOCK)
+# ==============================================================================
+class PitchRing:
+    """
+    Ring buffer de frames de pitch, opcionalmente em memória compartilhada.
+
+    Só existe um produtor (a thread ou o processo do detector). Ele marca o
+    slot com seq=0, escreve os campos, grava o seq definitivo e só então
+    avança o contador do cabeçalho. Os leitores nunca travam: conferem o seq
+    do slot antes e depois da leitura e tentam de novo se ele mudou.
+    """
+    HEADER_BYTES = 64  # contador de escrita + folga para alinhamento
+
+    def __init__(self, capacity=256, name=None, create=True, shared=True):
+        self.capacity = capacity
+        nbytes = self.HEADER_BYTES + capacity * FRAME_DTYPE.itemsize
+        self._shm = None
+        if shared:
+            if create:
+                self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            else:
+                self._shm = _attach_shared_memory(name)
+            buf = self._shm.buf
+        else:
+            buf = bytearray(nbytes)
+        self._head = np.ndarray((1,), dtype="<u8", buffer=buf)
+        self._frames = np.ndarray((capacity,), dtype=FRAME_DTYPE, buffer=buf, offset=self.HEADER_BYTES)
+        if create:
+            self._head[0] = 0
+            self._frames["seq"] = 0
+
+    @property
+    def name(self):
+        return self._shm.name if self._shm is not None else None
+
+    @property
+    def head(self):
+        """Número de sequência do último frame publicado (0 = nenhum)."""
+        head = self._head
+        return int(head[0]) if head is not None else 0
+
+    def publish(self, timestamp, freq, confidence=0.0, voiced=True):
+        seq = int(self._head[0]) + 1
+        slot = self._frames[seq % self.capacity]
+        slot["seq"] = 0
+        slot["timestamp"] = timestamp
+        slot["freq"] = freq
+        slot["confidence"] = confidence
+        slot["voiced"] = voiced
+        slot["seq"] = seq
+        self._head[0] = seq
+
+    def latest(self):
+        """Retorna (seq, timestamp, freq, confidence, voiced) do último frame, ou None."""
+        head, frames = self._head, self._frames
+        if head is None:
+            return None
+        for _ in range(8):
+            seq = int(head[0])
+            if seq == 0:
+                return None
+            slot = frames[seq % self.capacity]
+            timestamp, freq, confidence = float(slot["timestamp"]), float(slot["freq"]), float(slot["confidence"])
+            voiced = bool(slot["voiced"])
+            if int(slot["seq"]) == seq:
+                return seq, timestamp, freq, confidence, voiced
+        return None
+
+    def reset(self):
+        """Esvazia o ring (só com o produtor parado)."""
+        self._frames["seq"] = 0
+        self._head[0] = 0
+
+    def frames(self):
+        """
+        View somente leitura de todos os slots (sem cópia).
+
+        Os slots válidos têm seq > 0; a ordem temporal é dada pelo próprio seq.
+        Quem precisa de consistência deve descartar slots com seq > head.
+        """
+        view = self._frames.view()
+        view.flags.writeable = False
+        return view
+
+    def snapshot(self):
+        """Cópia dos frames válidos ainda no ring, em ordem de seq (mais antigo primeiro)."""
+        frames = self._frames
+        if frames is None:
+            return np.zeros(0, dtype=FRAME_DTYPE)
+        head = self.head
+        copy = frames.copy()
+        # Slots em escrita (seq 0) ou reescritos depois de lido o head ficam de fora
+        copy = copy[(copy["seq"] > 0) & (copy["seq"] <= head) & (copy["seq"] > head - self.capacity)]
+        return np.sort(copy, order="seq")
+
+    def since(self, seq):
+        """Cópia só dos frames com seq maior que o dado, em ordem (para leitores incrementais)."""
+        frames = self._frames
+        if frames is None:
+            return np.zeros(0, dtype=FRAME_DTYPE)
+        head = self.head
+        first = max(seq + 1, head - self.capacity + 1, 1)
+        if first > head:
+            return np.zeros(0, dtype=FRAME_DTYPE)
+        wanted = np.arange(first, head + 1, dtype=np.uint64)
+        copy = frames[wanted % self.capacity]
+        return copy[copy["seq"] == wanted]
+
+    def close(self):
+        # As views precisam morrer antes do mmap ser fechado
+        self._head = None
+        self._frames = None
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # Algum leitor ainda segura uma view; o mmap é liberado junto com ela
+                pass
+
+    def unlink(self):
+        if self._shm is not None:
+            self._shm.unlink()
+
+
+def _attach_shared_memory(name):
+    """Abre um bloco existente criado pelo processo do jogo."""
+    # O filho herda o resource_tracker do pai (o registro é um conjunto), então
+    # anexar não cria um segundo dono: quem faz unlink continua sendo o pai.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+# ==============================================================================
+# DETECTOR
+# ==============================================================================
+class PitchDetector:
+    # Parâmetros de análise que um perfil de calibração pode sobrescrever
+    PROFILE_KEYS = ("backend", "backend_options", "buffer_size", "window_factor", "decimation")
+
+    def __init__(self, a4=440.0, use_process=False, ring_capacity=256, use_vad=True, decimation=1,
+                 backend="auto", backend_options=None, buffer_size=8192, window_factor=4, tuning_offset=0,
+                 record_dir=None, source=None):
+        self.BUFFER_SIZE = buffer_size
+        self.CHANNELS = 1
+        self.RATE = 44100
+        self.window_factor = window_factor
+        self.decimation = decimation
+        self.backend = backend
+        self.backend_options = dict(backend_options or {})
+        self._check_decimation()
+        self.A4 = a4
+        self.tuning_offset = tuning_offset
+        self.NOTAS = NOTAS
+        self.use_process = use_process
+        # Fonte de áudio (audio_sources); None = microfone padrão
+        self.source = source
+        if source is not None:
+            self.RATE = source.rate
+        self.record_dir = record_dir
+        self.last_recording = None
+        self._record_path = None
+        self.ring_capacity = ring_capacity
+        self.use_vad = use_vad
+        self.running = False
+        self._ring = None
+        self._thread = None
+        self._process = None
+        self._stop_event = None
+        # Modo processo: um filho só, reaproveitado entre sessões (veja start)
+        self._shared_ring = None
+        self._commands = None
+        self._idle_event = None
+        self._pending_profile = None
+
+    def _check_decimation(self):
+        if self.BUFFER_SIZE % self.decimation or self.RATE % self.decimation:
+            raise ValueError(f"decimation={self.decimation} precisa dividir BUFFER_SIZE e RATE")
+
+    def apply_profile(self, profile):
+        """
+        Aplica os parâmetros de análise de um perfil de calibração.
+
+        Se o detector estiver rodando, o perfil só vale a partir do próximo start().
+        """
+        if self.running:
+            self._pending_profile = profile
+            return
+        for key in self.PROFILE_KEYS:
+            if key not in profile:
+                continue
+            if key == "buffer_size":
+                self.BUFFER_SIZE = int(profile[key])
+            elif key == "backend_options":
+                self.backend_options = dict(profile[key])
+            else:
+                setattr(self, key, profile[key])
+        self._check_decimation()
+
+    def load_profile(self, path=None):
+        """Carrega o perfil calibrado para esta máquina, se existir. Retorna True se aplicou."""
+        from calibration import load_profile
+
+        profile = load_profile(path)
+        if profile is None:
+            return False
+        self.apply_profile(profile)
+        return True
+
+    def _settings(self):
+        """Parâmetros necessários para recriar o detector em outro processo."""
+        return {"a4": self.A4, "tuning_offset": self.tuning_offset, "ring_capacity": self.ring_capacity, "use_vad": self.use_vad,
+                "decimation": self.decimation, "backend": self.backend,
+                "backend_options": self.backend_options, "buffer_size": self.BUFFER_SIZE,
+                "window_factor": self.window_factor, "source": self.source}
+
+    @property
+    def note_table(self):
+        """Tabela de notas da afinação atual (refeita se A4 ou tuning_offset mudarem)."""
+        return get_note_table(self.A4, self.tuning_offset)
+
+    def _freq_para_nota(self, freq):
+        table = self.note_table
+        info = table.lookup(freq)
+        return table.names[info.midi] if info else None
+
+    def _keep_running(self):
+        if self._stop_event is not None and self._stop_event.is_set():
+            return False
+        return self.running
+
+    def _create_pitch(self):
+        # Janela e hop acompanham a taxa decimada: mesma duração em segundos
+        hop = self.BUFFER_SIZE // self.decimation
+        return create_backend(self.backend, hop*self.window_factor, hop, self.RATE // self.decimation, **self.backend_options)
+
+    def _reset_analysis(self):
+        self._pitch = self._create_pitch()
+        self._gate = VoiceActivityGate() if self.use_vad else None
+        self._decimator = Decimator(self.decimation) if self.decimation > 1 else None
+        self._was_voiced = True
+
+    def _analyze(self, samples):
+        """Retorna (freq, confidence, voiced) de um bloco de amostras."""
+        if self._gate is not None and not self._gate(samples):
+            self._was_voiced = False
+            return 0.0, 0.0, False
+        if not self._was_voiced:
+            # A janela do estimador ainda guarda a voz de antes do silêncio;
+            # recomeçar do zero equivale a tê-la alimentado com o silêncio.
+            self._pitch = self._create_pitch()
+            if self._decimator is not None:
+                self._decimator.reset()
+            self._was_voiced = True
+        if self._decimator is not None:
+            samples = self._decimator(samples)
+        freq = self._pitch(samples)
+        return freq, self._pitch.confidence, True
+
+    def iter_frames(self, keep_running=lambda: True):
+        """
+        Analisa a fonte na thread atual, gerando (timestamp, freq, confidence, voiced).
+
+        Com o microfone o timestamp é o time.time() da análise; nas demais
+        fontes é o tempo de áudio (segundos desde o início) ao fim do bloco,
+        o que torna execuções mais rápidas que o tempo real determinísticas.
+        """
+        source = self.source if self.source is not None else MicSource(self.RATE, self.CHANNELS)
+        hop_seconds = self.BUFFER_SIZE / self.RATE
+        self._reset_analysis()
+        recorder = None
+        if self._record_path:
+            recorder = SessionRecorder(self._record_path, self.RATE, self.CHANNELS)
+
+        try:
+            for i, samples in enumerate(source.blocks(self.BUFFER_SIZE, keep_running)):
+                if recorder is not None:
+                    recorder.write(samples)
+                try:
+                    freq, confidence, voiced = self._analyze(samples)
+                except Exception:
+                    continue
+                yield (time.time() if source.live else (i + 1) * hop_seconds), freq, confidence, voiced
+        finally:
+            if recorder is not None:
+                recorder.close()
+
+    def _listen_loop(self):
+        try:
+            for timestamp, freq, confidence, voiced in self.iter_frames(self._keep_running):
+                self._ring.publish(timestamp, freq, confidence, voiced)
+        except Exception as e:
+            print(f"Erro no detector: {e}")
+
+    def _new_record_path(self, tag=None):
+        name = time.strftime("%Y%m%d_%H%M%S")
+        if tag:
+            name += "_" + "".join(c if c.isalnum() or c in "#-" else "_" for c in str(tag))
+        return os.path.join(self.record_dir, name + ".wav")
+
+    def start(self, tag=None):
+        """
+        Inicia a captura. Com record_dir definido, a sessão é gravada em
+        record_dir/<data>_<tag>.wav (caminho em last_recording).
+        """
+        if self.running:
+            return
+        if self._pending_profile is not None:
+            profile, self._pending_profile = self._pending_profile, None
+            self.apply_profile(profile)
+        self._record_path = self._new_record_path(tag) if self.record_dir else None
+        self.last_recording = self._record_path
+        self.running = True
+        if self.use_process:
+            self.open()
+            # O filho está ocioso (stop esperou a sessão anterior acabar): o ring
+            # é dele, mas dá para esvaziar daqui antes de mandar a nova sessão
+            self._shared_ring.reset()
+            self._ring = self._shared_ring
+            self._stop_event.clear()
+            self._idle_event.clear()
+            self._commands.put((self._settings(), self._record_path))
+        else:
+            self._ring = PitchRing(self.ring_capacity, shared=False)
+            self._thread = threading.Thread(target=self._listen_loop, daemon=True)
+            self._thread.start()
+
+    def open(self):
+        """No modo processo, cria o filho já (senão ele nasce no primeiro start)."""
+        if self.use_process and (self._process is None or not self._process.is_alive()):
+            self._spawn()
+
+    def _spawn(self):
+        """
+        Cria o processo filho do detector. Ele vive até close() e roda uma
+        sessão por start(): com spawn, cada filho novo reimporta o módulo
+        principal e o aubio, o que custaria parte da escuta de toda rodada.
+        """
+        self._close_process()
+        ctx = multiprocessing.get_context("spawn")
+        self._shared_ring = PitchRing(self.ring_capacity, create=True, shared=True)
+        self._commands = ctx.Queue()
+        self._stop_event = ctx.Event()
+        self._idle_event = ctx.Event()
+        self._process = ctx.Process(
+            target=_run_detector_process,
+            args=(type(self), self._shared_ring.name, self._commands, self._stop_event, self._idle_event),
+            daemon=True,
+        )
+        self._process.start()
+
+    def _close_process(self, timeout=2.0):
+        process, self._process = self._process, None
+        if process is not None:
+            if process.is_alive():
+                self._commands.put(None)
+                process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=timeout)
+            self._commands.close()
+        self._commands = None
+        self._stop_event = None
+        self._idle_event = None
+        ring, self._shared_ring = self._shared_ring, None
+        if ring is not None:
+            ring.close()
+            ring.unlink()
+
+    def stop(self):
+        self.running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        ring, self._ring = self._ring, None
+        if self.use_process:
+            # O filho e o ring ficam para a próxima sessão; se o filho não voltar
+            # a ficar ocioso a tempo, é encerrado e o próximo start() cria outro
+            if self._process is not None and not self._idle_event.wait(timeout=2.0):
+                self._close_process()
+        elif ring is not None:
+            ring.close()
+
+    def close(self):
+        """Para a sessão e encerra o processo filho (no modo processo)."""
+        self.stop()
+        self._close_process()
+
+    def is_alive(self):
+        """True enquanto a thread/processo de captura estiver rodando (fontes finitas terminam sozinhas)."""
+        if self._process is not None:
+            return self._process.is_alive() and not self._idle_event.is_set()
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def ring(self):
+        """Ring buffer com o histórico de frames da sessão atual (ou None)."""
+        return self._ring
+
+    @property
+    def current_freq(self):
+        ring = self._ring
+        frame = ring.latest() if ring is not None else None
+        return frame[2] if frame else 0.0
+
+    @property
+    def current_voiced(self):
+        """False quando o último bloco foi marcado como silêncio pelo porteiro de voz."""
+        ring = self._ring
+        frame = ring.latest() if ring is not None else None
+        return frame[4] if frame else False
+
+    @property
+    def current_note(self):
+        return self._freq_para_nota(self.current_freq)
+
+    @property
+    def current_note_info(self):
+        """NoteInfo (midi, classe, oitava, cents) da frequência atual, ou None."""
+        return self.note_table.lookup(self.current_freq)
+
+    def get_note(self): return self.current_note
+    def get_note_info(self): return self.current_note_info
+    def get_freq(self): return self.current_freq
+
+
+def _run_detector_process(cls, ring_name, commands, stop_event, idle_event):
+    """
+    Ponto de entrada do processo filho: a cada (settings, record_path) da fila
+    captura, analisa e publica no ring até stop_event; None encerra.
+    """
+    ring = None
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            settings, record_path = command
+            detector = cls(**settings)
+            if ring is None:
+                ring = PitchRing(detector.ring_capacity, name=ring_name, create=False, shared=True)
+            detector._ring = ring
+            detector._stop_event = stop_event
+            detector._record_path = record_path
+            detector.running = True
+            try:
+                detector._listen_loop()
+            finally:
+                idle_event.set()
+    finally:
+        if ring is not None:
+            ring.close()
@@ -0,0 +1,166 @@
+"""
+Gráfico rolante do pitch cantado nos últimos segundos.
+
+O traço vive numa Surface persistente. A cada frame da tela ela rola para a
+esquerda o equivalente ao tempo passado (Surface.scroll, um blit interno) e só
+as colunas dos frames novos do detector (PitchRing.since) são pintadas, via
+surfarray; o histórico nunca é redesenhado. A faixa da nota alvo (todas as
+oitavas, ±50 cents) é uma Surface pré-renderizada por alvo, desenhada por
+baixo do traço.
+"""
+import math
+import time
+
+import numpy as np
+import pygame
+
+# Frames mais distantes que isso não são ligados por uma linha (houve silêncio)
+MAX_GAP = 0.5
+
+
+class PitchTrace:
+    def __init__(self, size, seconds=6.0, midi_low=45, midi_high=79, a4=440.0,
+                 color=(255, 180, 100), background=(45, 35, 70), band_color=(80, 200, 180, 70)):
+        self.width, self.height = size
+        self.seconds = seconds
+        self.px_per_second = self.width / seconds
+        self.midi_low, self.midi_high = midi_low, midi_high
+        self.a4 = a4
+        self.color = color
+        self.background = background
+        self.band_color = band_color
+        self.surface = pygame.Surface(size)
+        self.surface.set_colorkey(background)
+        self._bands = {}
+        self.reset()
+
+    def reset(self):
+        """Apaga o traço (por exemplo, ao trocar de nota alvo)."""
+        self.surface.fill(self.background)
+        self._ring = None
+        self._last_seq = 0
+        self._prev = None
+        self._origin = None   # instante da coluna absoluta 0
+        self._scrolled = 0    # colunas absolutas já roladas (a borda direita)
+        self._offset = None   # relógio dos frames -> relógio da tela
+
+    def _row_positions(self, freqs):
+        """Posição vertical (escala logarítmica, sem arredondar nem cortar) de cada frequência > 0."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            midi = 69 + 12 * np.log2(np.asarray(freqs, dtype=np.float64) / self.a4)
+        return (self.midi_high - midi) / (self.midi_high - self.midi_low) * (self.height - 1)
+
+    def _rows(self, freqs):
+        """Linha da tela de cada frequência; -1 = fora da faixa ou silêncio."""
+        freqs = np.asarray(freqs, dtype=np.float64)
+        pos = self._row_positions(freqs)
+        inside = (freqs > 0) & (pos >= -0.5) & (pos <= self.height - 0.5)
+        return np.where(inside, np.round(np.nan_to_num(pos)), -1).astype(np.int64)
+
+    def _col(self, timestamps):
+        # Colunas em coordenadas absolutas inteiras: um ponto já desenhado cai
+        # sempre na mesma coluna depois de rolado, sem erro de arredondamento
+        absolute = np.floor((np.asarray(timestamps) + self._offset - self._origin) * self.px_per_second)
+        return (self.width - 1 - (self._scrolled - absolute)).astype(np.int64)
+
+    def _scroll(self, now):
+        if self._origin is None:
+            self._origin = now
+            return
+        dx = int((now - self._origin) * self.px_per_second) - self._scrolled
+        if dx <= 0:
+            return
+        if dx >= self.width:
+            self.surface.fill(self.background)
+        else:
+            self.surface.scroll(-dx, 0)
+            self.surface.fill(self.background, (self.width - dx, 0, dx, self.height))
+        self._scrolled += dx
+
+    def update(self, ring, now=None):
+        """Rola até now e pinta os frames novos do ring (ring None = só rola)."""
+        now = time.time() if now is None else now
+        if ring is not self._ring:
+            # Sessão nova: o seq recomeça, e o último ponto não deve ser ligado ao novo
+            self._ring = ring
+            self._last_seq = 0
+            self._prev = None
+            self._offset = None
+        self._scroll(now)
+        if ring is None:
+            return
+        frames = ring.since(self._last_seq)
+        if len(frames) == 0:
+            return
+        self._last_seq = int(frames["seq"][-1])
+        if self._offset is None:
+            # O primeiro frame da sessão entra na borda direita; daí em diante
+            # os frames seguem o relógio dele (time.time() do microfone ou
+            # tempo de áudio de uma fonte offline)
+            self._offset = self._origin + (self._scrolled + 0.5) / self.px_per_second - float(frames["timestamp"][-1])
+        rows = self._rows(np.where(frames["voiced"] > 0, frames["freq"], 0.0))
+        cols = self._col(frames["timestamp"])
+        ahead = int(cols[-1]) - (self.width - 1)
+        if ahead > 0:
+            # Frame chegou adiantado em relação à âncora: atrasa o relógio dos
+            # frames em vez de perder as colunas além da borda
+            self._offset -= ahead / self.px_per_second
+            cols = self._col(frames["timestamp"])
+
+        pixels = pygame.surfarray.pixels2d(self.surface)
+        value = self.surface.map_rgb(self.color)
+        prev = self._prev
+        for timestamp, col, row in zip(frames["timestamp"], cols, rows):
+            if row >= 0:
+                start = col
+                if prev is not None and prev[1] >= 0 and timestamp - prev[0] < MAX_GAP:
+                    # Coluna recalculada: o ponto anterior pode já ter rolado
+                    start = int(self._col(prev[0])) + 1
+                    # Liga ao ponto anterior: degrau vertical na coluna de início
+                    lo, hi = sorted((prev[1], row))
+                    if 0 <= start < self.width:
+                        pixels[start, max(lo - 1, 0):hi + 2] = value
+                x0, x1 = max(start, 0), min(col + 1, self.width)
+                if x0 < x1:
+                    pixels[x0:x1, max(row - 1, 0):row + 2] = value
+            prev = (timestamp, row)
+        self._prev = prev
+        del pixels  # libera o lock da Surface
+
+    def _band(self, pitch_class):
+        band = self._bands.get(pitch_class)
+        if band is None:
+            band = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+            for octave in range(-1, 10):
+                midi = (octave + 1) * 12 + pitch_class
+                if not self.midi_low - 1 <= midi <= self.midi_high + 1:
+                    continue
+                freq = self.a4 * 2 ** ((midi - 69) / 12.0)
+                top, bottom = self._row_positions([freq * 2 ** (50 / 1200.0), freq * 2 ** (-50 / 1200.0)])
+                if bottom < 0 or top > self.height - 1:
+                    continue
+                top, bottom = int(max(top, 0)), int(min(bottom, self.height - 1))
+                band.fill(self.band_color, (0, top, self.width, bottom - top + 1))
+                center = self._rows([freq])[0]
+                if center >= 0:
+                    band.fill(self.band_color[:3] + (160,), (0, center, self.width, 1))
+            self._bands[pitch_class] = band
+        return band
+
+    def octave_labels(self):
+        """(linha, nome) do C de cada oitava visível, para rótulos no eixo."""
+        labels = []
+        for midi in range(math.ceil(self.midi_low / 12) * 12, self.midi_high + 1, 12):
+            row = self._rows([self.a4 * 2 ** ((midi - 69) / 12.0)])[0]
+            if row >= 0:
+                labels.append((int(row), f"C{midi // 12 - 1}"))
+        return labels
+
+    def draw(self, surf, pos, pitch_class=None):
+        rect = pygame.Rect(pos, (self.width, self.height))
+        surf.fill(self.background, rect)
+        if pitch_class is not None:
+            surf.blit(self._band(pitch_class), rect)
+        surf.blit(self.surface, rect)
+        return rect
+
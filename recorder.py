@@ -0,0 +1,183 @@
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+WAVE_FORMAT_IEEE_FLOAT = 3
+# Tempo máximo que close() espera a thread de escrita (quem chama é o detector)
+CLOSE_TIMEOUT = 2.0
+
+
+class SessionRecorder:
+    """
+    Grava os blocos float32 do microfone em disco sem travar a captura.
+
+    write() só coloca o bloco numa fila limitada; uma thread separada escreve
+    no arquivo. Se o disco atrasar e a fila encher, o bloco é descartado e a
+    quantidade de amostras perdidas vira silêncio no próximo bloco aceito, de
+    modo que a linha do tempo da gravação continua batendo com a sessão.
+
+    Arquivos .wav são gravados em WAV float32; qualquer outra extensão vira
+    float32 cru com um .json ao lado (taxa e canais). Os dois formatos podem
+    ser abertos com open_recording() via memmap.
+
+    Um erro de escrita (disco cheio, por exemplo) fica em error e encerra a
+    gravação, mas não a sessão: a thread continua só esvaziando a fila.
+    """
+
+    def __init__(self, path, rate, channels=1, max_blocks=64):
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.is_wav = path.lower().endswith(".wav")
+        self.dropped_samples = 0
+        self.error = None
+        self._closed = False
+        self._gap = 0
+        self._frames = 0
+        self._queue = queue.Queue(maxsize=max_blocks)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "wb")
+        if self.is_wav:
+            self._file.write(_wav_header(rate, channels, 0))
+        else:
+            with open(path + ".json", "w", encoding="utf-8") as f:
+                json.dump({"rate": rate, "channels": channels, "dtype": "<f4"}, f)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def write(self, block):
+        """Enfileira um bloco (nunca bloqueia). Retorna False se ele foi descartado."""
+        try:
+            self._queue.put_nowait((self._gap, block))
+        except queue.Full:
+            self._gap += len(block)
+            self.dropped_samples += len(block)
+            return False
+        self._gap = 0
+        return True
+
+    def _writer(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self._write_block(*item)
+            except Exception as e:
+                self.error = e
+                print(f"Erro na gravação de {self.path}: {e}")
+
+    def _write_block(self, gap, block):
+        # gap em frames (linhas dos blocos perdidos): silêncio em todos os canais
+        if gap:
+            self._file.write(np.zeros((gap, self.channels), dtype="<f4").tobytes())
+        data = np.asarray(block, dtype="<f4")
+        self._file.write(data.tobytes())
+        self._frames += gap + data.size // self.channels
+
+    def _put(self, item, deadline):
+        try:
+            self._queue.put(item, timeout=max(0.0, deadline - time.monotonic()))
+            return True
+        except queue.Full:
+            return False
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        """
+        Espera a fila esvaziar e fecha o arquivo (corrigindo o cabeçalho WAV).
+
+        Nunca espera mais que timeout segundos: se a thread de escrita não
+        terminar, o arquivo fica com ela e error diz por quê.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        if self._gap:
+            # Blocos perdidos no fim da sessão: o silêncio vai com um bloco vazio
+            self._put((self._gap, np.zeros(0, dtype="<f4")), deadline)
+            self._gap = 0
+        self._put(None, deadline)
+        self._thread.join(max(0.0, deadline - time.monotonic()))
+        if self._thread.is_alive():
+            if self.error is None:
+                self.error = TimeoutError(f"gravação de {self.path} não terminou em {timeout} s")
+            return
+        try:
+            if self.is_wav:
+                self._file.seek(0)
+                self._file.write(_wav_header(self.rate, self.channels, self._frames))
+            self._file.close()
+        except OSError as e:
+            self.error = self.error or e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _wav_header(rate, channels, frames):
+    data_bytes = frames * channels * 4
+    fmt = struct.pack("<HHIIHH", WAVE_FORMAT_IEEE_FLOAT, channels, rate, rate * channels * 4, channels * 4, 32)
+    fact = struct.pack("<I", frames)
+    riff_size = 4 + (8 + len(fmt)) + (8 + len(fact)) + (8 + data_bytes)
+    return (b"RIFF" + struct.pack("<I", riff_size) + b"WAVE"
+            + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+            + b"fact" + struct.pack("<I", len(fact)) + fact
+            + b"data" + struct.pack("<I", data_bytes))
+
+
+def open_recording(path):
+    """
+    Abre uma gravação sem copiar para a memória.
+
+    Retorna (amostras, taxa): amostras é um np.memmap float32 de formato
+    (frames,) para mono ou (frames, canais).
+    """
+    if path.lower().endswith(".wav"):
+        offset, rate, channels, frames = _parse_wav(path)
+    else:
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        rate, channels, offset = meta["rate"], meta["channels"], 0
+        frames = os.path.getsize(path) // (4 * channels)
+    shape = (frames,) if channels == 1 else (frames, channels)
+    if frames == 0:
+        return np.zeros(shape, dtype="<f4"), rate
+    return np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=shape), rate
+
+
+def _parse_wav(path):
+    with open(path, "rb") as f:
+        if f.read(4) != b"RIFF":
+            raise ValueError(f"{path} não é um arquivo WAV")
+        f.read(4)
+        if f.read(4) != b"WAVE":
+            raise ValueError(f"{path} não é um arquivo WAV")
+        rate = channels = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: chunk de dados não encontrado")
+            chunk_id, size = header[:4], struct.unpack("<I", header[4:])[0]
+            if chunk_id == b"fmt ":
+                tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", f.read(16))
+                if tag != WAVE_FORMAT_IEEE_FLOAT or bits != 32:
+                    raise ValueError(f"{path}: só WAV float32 pode ser mapeado")
+                f.seek(size - 16, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                # Gravação interrompida: o cabeçalho ainda diz 0, usa o tamanho do arquivo
+                available = os.path.getsize(path) - f.tell()
+                data_bytes = size if 0 < size <= available else available
+                return f.tell(), rate, channels, data_bytes // (4 * channels)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
@@ -0,0 +1,270 @@
+"""
+Biblioteca de músicas lida de um diretório de arquivos de dados.
+
+Formatos aceitos (vários podem conviver no mesmo diretório):
+    *.jsonl  uma música por linha: {"nome", "genero", "notas": [["C", 0.5], ...]}
+             (nota sem oitava = oitava 4; com oitava, como em "C5", vale a escrita)
+    *.json   uma música (objeto) ou uma lista delas
+    *.csv    colunas nome,genero,nota,duracao; uma linha por nota, as linhas
+             de uma mesma música em sequência
+
+Na primeira abertura (ou quando algum arquivo muda de tamanho/data) os
+arquivos são lidos uma vez e compilados num corpus binário colunar em
+.corpus/: um array contíguo com as notas MIDI de todas as músicas, um com as
+durações, um com as frequências, a tabela de início de cada música e as
+tabelas de texto dos nomes e gêneros (arquivos .npy). Nas aberturas
+seguintes as colunas são mapeadas com numpy.memmap: abrir não lê as notas,
+o sistema só traz do disco as páginas tocadas, e vários processos do jogo
+compartilham o mesmo cache de páginas. Cada Musica devolvida é uma visão
+(sem cópia) das colunas.
+"""
+import csv
+import json
+import os
+from collections.abc import Sequence
+
+import numpy as np
+
+from Musicas import Musica, _FREQS_MIDI
+from note_table import NOTE_MIDI
+
+CORPUS_DIR = ".corpus"
+SIGNATURE_FILE = "assinatura.json"
+CORPUS_VERSION = 3
+FORMATS = (".jsonl", ".json", ".csv")
+CSV_COLUMNS = ["nome", "genero", "nota", "duracao"]
+# Colunas do corpus (um .npy cada) e seus tipos
+COLUMNS = {
+    "midi": np.uint8,
+    "duracoes": np.float64,
+    "freqs": np.float32,
+    "inicio": np.int64,          # início de cada música em midi/duracoes (n + 1 posições)
+    "nomes": np.uint8,           # nomes em UTF-8, separados por "\n"
+    "nomes_inicio": np.int64,    # início de cada nome em nomes (n + 1 posições)
+    "generos": np.uint8,         # gêneros distintos em UTF-8, separados por "\n"
+    "generos_inicio": np.int64,  # início de cada gênero em generos (distintos + 1 posições)
+    "genero": np.int32,          # código do gênero de cada música
+}
+
+
+def _signature(directory):
+    """{arquivo: [tamanho, mtime_ns]} dos arquivos de dados do diretório."""
+    signature = {}
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if entry.is_file() and entry.name.endswith(FORMATS) and not entry.name.startswith("."):
+            stat = entry.stat()
+            signature[entry.name] = [stat.st_size, stat.st_mtime_ns]
+    return signature
+
+
+def _scan_jsonl(path):
+    """(nome, gênero, notas) de cada música."""
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                song = json.loads(line)
+                yield song["nome"], song.get("genero", ""), song["notas"]
+
+
+def _scan_json(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for song in data if isinstance(data, list) else [data]:
+        yield song["nome"], song.get("genero", ""), song["notas"]
+
+
+def _scan_csv(path):
+    """As linhas seguidas com o mesmo nome formam uma música."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = next(reader, None)
+        if columns != CSV_COLUMNS:
+            raise ValueError(f"{path}: colunas esperadas {CSV_COLUMNS}, achadas {columns}")
+        current = None
+        for row in reader:
+            if not row:
+                continue
+            nome, genero, nota, duracao = row
+            if current is None or current[0] != nome:
+                if current is not None:
+                    yield current
+                current = (nome, genero, [])
+            current[2].append((nota, float(duracao)))
+        if current is not None:
+            yield current
+
+
+SCANNERS = {".jsonl": _scan_jsonl, ".json": _scan_json, ".csv": _scan_csv}
+
+
+def _text_table(strings):
+    """(bloco UTF-8 com as strings separadas por "\\n", início de cada uma)."""
+    encoded = [s.replace("\n", " ").encode("utf-8") for s in strings]
+    starts = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) + 1 for b in encoded], out=starts[1:])
+    return np.frombuffer(b"\n".join(encoded), dtype=np.uint8), starts
+
+
+def build_corpus(directory):
+    """Lê todos os arquivos de dados e grava o corpus em .corpus/; retorna as colunas."""
+    signature = _signature(directory)
+    midi, duracoes, tamanhos, nomes, generos = [], [], [], [], []
+    for name in signature:
+        scan = SCANNERS[os.path.splitext(name)[1]]
+        for nome, genero, notas in scan(os.path.join(directory, name)):
+            midi.extend(NOTE_MIDI[nota] for nota, _ in notas)
+            duracoes.extend(duracao for _, duracao in notas)
+            tamanhos.append(len(notas))
+            nomes.append(nome)
+            generos.append(genero)
+    generos_unicos = sorted(set(generos))
+    codes = {genero: k for k, genero in enumerate(generos_unicos)}
+    midi = np.array(midi, dtype=np.uint8)
+    inicio = np.zeros(len(tamanhos) + 1, dtype=np.int64)
+    np.cumsum(tamanhos, out=inicio[1:])
+    nomes_bloco, nomes_inicio = _text_table(nomes)
+    generos_bloco, generos_inicio = _text_table(generos_unicos)
+    columns = {
+        "midi": midi,
+        "duracoes": np.array(duracoes, dtype=np.float64),
+        "freqs": _FREQS_MIDI[midi],
+        "inicio": inicio,
+        "nomes": nomes_bloco,
+        "nomes_inicio": nomes_inicio,
+        "generos": generos_bloco,
+        "generos_inicio": generos_inicio,
+        "genero": np.array([codes[g] for g in generos], dtype=np.int32),
+    }
+    try:
+        _write_corpus(directory, columns, signature)
+    except OSError as e:
+        # Diretório só de leitura: o corpus fica só na memória desta execução
+        print(f"Aviso: corpus da biblioteca não foi gravado ({e})")
+    return columns
+
+
+def _write_corpus(directory, columns, signature):
+    corpus = os.path.join(directory, CORPUS_DIR)
+    os.makedirs(corpus, exist_ok=True)
+    # Cada coluna entra por os.replace: um processo que já mapeou a versão
+    # antiga continua lendo o arquivo antigo até fechar
+    for key, array in columns.items():
+        path = os.path.join(corpus, key + ".npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, array)
+        os.replace(path + ".tmp", path)
+    # A assinatura vai por último: um corpus sem assinatura válida é refeito
+    sig_path = os.path.join(corpus, SIGNATURE_FILE)
+    with open(sig_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"versao": CORPUS_VERSION, "arquivos": signature}, f)
+    os.replace(sig_path + ".tmp", sig_path)
+
+
+def _open_corpus(directory):
+    """Colunas mapeadas do corpus em disco, ou None se ele não existe ou está desatualizado."""
+    corpus = os.path.join(directory, CORPUS_DIR)
+    try:
+        with open(os.path.join(corpus, SIGNATURE_FILE), encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("versao") != CORPUS_VERSION or stored.get("arquivos") != _signature(directory):
+            return None
+        columns = {key: np.load(os.path.join(corpus, key + ".npy"), mmap_mode="r") for key in COLUMNS}
+    except (OSError, ValueError):
+        return None
+    if any(columns[key].dtype != dtype for key, dtype in COLUMNS.items()):
+        return None
+    return columns
+
+
+class TextTable(Sequence):
+    """Strings de um bloco UTF-8 mapeado; cada uma é decodificada quando pedida."""
+
+    def __init__(self, block, starts):
+        self._block = block
+        self._starts = starts
+
+    def __len__(self):
+        return len(self._starts) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = self._starts[index], self._starts[index + 1] - 1
+        return self._block[start:end].tobytes().decode("utf-8")
+
+    def tolist(self):
+        """Todas as strings de uma vez (um decode e um split do bloco inteiro)."""
+        return self._block.tobytes().decode("utf-8").split("\n") if len(self) else []
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+
+class SongLibrary(Sequence):
+    """
+    Sequência de Musica (len, índice, random.choice, iteração) sobre o corpus
+    mapeado em memória; cada música é uma visão das colunas, sem cópia.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        if not os.path.isdir(directory):
+            raise FileNotFoundError(f"diretório de músicas não encontrado: {directory}")
+        columns = _open_corpus(directory)
+        if columns is None:
+            columns = build_corpus(directory)
+        self.midi = columns["midi"]
+        self.duracoes = columns["duracoes"]
+        self.freqs = columns["freqs"]
+        self.inicio = columns["inicio"]
+        self.nomes = TextTable(columns["nomes"], columns["nomes_inicio"])
+        # Pelas posições de início, não pelo texto: um gênero "" (músicas sem
+        # gênero) é um texto vazio e continua sendo um gênero
+        self._generos = TextTable(columns["generos"], columns["generos_inicio"]).tolist()
+        self._genero = columns["genero"]
+        self._by_name = None
+
+    @property
+    def tamanhos(self):
+        """Número de notas de cada música."""
+        return np.diff(self.inicio)
+
+    @property
+    def generos(self):
+        """Gêneros distintos, em ordem alfabética."""
+        return self._generos
+
+    @property
+    def codigos_genero(self):
+        """Posição em generos do gênero de cada música."""
+        return self._genero
+
+    def genero(self, index):
+        return self._generos[self._genero[index]]
+
+    def __len__(self):
+        return len(self.inicio) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[k] for k in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = int(self.inicio[index]), int(self.inicio[index + 1])
+        return Musica.from_arrays(self.nomes[index], self.genero(index), self.midi[start:end],
+                                  self.duracoes[start:end], self.freqs[start:end])
+
+    def find(self, nome):
+        """Índice da música pelo nome exato (KeyError se não existe)."""
+        if self._by_name is None:
+            # Montado na primeira busca, não na abertura
+            self._by_name = {}
+            for k, n in enumerate(self.nomes):
+                self._by_name.setdefault(n, k)
+        return self._by_name[nome]
@@ -0,0 +1,181 @@
+"""
+Sorteio da música de cada rodada: ponderado e sem repetição recente.
+
+Cada música tem um peso, produto de três fatores:
+    gênero     gêneros grandes não engolem os pequenos: o peso cai com a raiz
+               do número de músicas do gênero (e pode ser ajustado por gênero)
+    tamanho    músicas com menos de LENGTH_PREFERRED notas saem menos (acabam
+               antes de dar para adivinhar)
+    histórico  músicas que o jogador erra voltam mais, as que ele sempre
+               acerta voltam menos (acertos e erros guardados por nome em
+               HISTORY_PATH)
+
+As WINDOW últimas músicas sorteadas ficam com peso zero e só voltam quando
+saem da janela, então não há repetição entre rodadas próximas (nem sorteio
+repetido até achar uma diferente). Os pesos ficam numa árvore de Fenwick:
+sortear é uma descida pela árvore e mudar o peso de uma música atualiza os
+prefixos que a contêm, os dois O(log n), mesmo com centenas de milhares de
+músicas.
+"""
+import json
+import os
+import random
+from collections import deque
+
+import numpy as np
+
+HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".solfejo", "historico.json")
+HISTORY_VERSION = 1
+WINDOW = 20
+LENGTH_PREFERRED = 8
+# Peso mínimo de uma música curta (fração do peso cheio)
+LENGTH_FLOOR = 0.2
+# Expoente do número de músicas do gênero no fator de gênero (0.5 = raiz)
+GENRE_BALANCE = 0.5
+
+
+class FenwickSampler:
+    """Sorteio proporcional a pesos não negativos, com pesos alteráveis."""
+
+    def __init__(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        self._n = len(weights)
+        # Nó i (base 1) guarda a soma dos pesos em (i - lowbit(i), i]
+        prefix = np.concatenate(([0.0], np.cumsum(weights)))
+        nodes = np.arange(self._n + 1)
+        tree = prefix - prefix[nodes - (nodes & -nodes)]
+        tree[0] = 0.0
+        self._tree = tree.tolist()
+        self._weights = weights.tolist()
+        self.total = float(prefix[-1])
+        self._top = 1 << max(self._n.bit_length() - 1, 0)
+
+    def __len__(self):
+        return self._n
+
+    def weight(self, index):
+        return self._weights[index]
+
+    def set(self, index, weight):
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        self.total += delta
+        tree, i = self._tree, index + 1
+        while i <= self._n:
+            tree[i] += delta
+            i += i & -i
+
+    def find(self, target):
+        """Menor índice cuja soma dos pesos até ele (inclusive) passa de target."""
+        tree, pos, step = self._tree, 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self._n and tree[nxt] <= target:
+                pos = nxt
+                target -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def sample(self, rng=random):
+        index = self.find(rng.random() * self.total)
+        # Arredondamento das somas pode cair no fim ou numa música de peso zero
+        while index >= self._n or self._weights[index] <= 0:
+            index = self.find(rng.random() * self.total)
+        return index
+
+
+def load_history(path=None):
+    """{nome: [acertos, erros]} salvo, ou {} se não existir."""
+    try:
+        with open(path or HISTORY_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != HISTORY_VERSION:
+        return {}
+    return data.get("musicas", {})
+
+
+def save_history(history, path=None):
+    path = path or HISTORY_PATH
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": HISTORY_VERSION, "musicas": history}, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def history_factor(hits, misses):
+    """De 0 a 2: 1 sem histórico, sobe com os erros e desce com os acertos."""
+    return 2 * (misses + 1) / (hits + misses + 2)
+
+
+class SongScheduler:
+    def __init__(self, library, window=WINDOW, genre_weights=None, history=None,
+                 history_path=None, rng=None):
+        self.library = library
+        self.history_path = history_path
+        self.history = load_history(history_path) if history is None else history
+        self.rng = rng or random.Random()
+        n = len(library)
+
+        codes = np.asarray(library.codigos_genero)
+        per_genre = np.bincount(codes, minlength=len(library.generos)).astype(np.float64)
+        genre = 1 / np.maximum(per_genre, 1) ** GENRE_BALANCE
+        for k, name in enumerate(library.generos):
+            genre[k] *= (genre_weights or {}).get(name, 1.0)
+        length = np.clip(np.asarray(library.tamanhos) / LENGTH_PREFERRED, LENGTH_FLOOR, 1.0)
+        self._static = genre[codes] * length
+        self._base = self._static.copy()
+        for name, (hits, misses) in self.history.items():
+            try:
+                index = library.find(name)
+            except KeyError:
+                continue
+            self._base[index] *= history_factor(hits, misses)
+
+        self.sampler = FenwickSampler(self._base)
+        # Nunca a biblioteca inteira: sempre sobra alguma música para sortear
+        self.window = min(window, n - 1) if n else 0
+        self._recent = deque()
+
+    def __len__(self):
+        return len(self.library)
+
+    def next(self):
+        """Índice da próxima música; ela fica fora do sorteio pelas próximas window rodadas."""
+        if not len(self.library):
+            raise IndexError("biblioteca de músicas vazia")
+        index = self.sampler.sample(self.rng)
+        if self.window:
+            self.sampler.set(index, 0.0)
+            self._recent.append(index)
+            if len(self._recent) > self.window:
+                back = self._recent.popleft()
+                self.sampler.set(back, float(self._base[back]))
+        return index
+
+    def record(self, index, correct):
+        """Registra um acerto (ou erro) do jogador na música e ajusta o peso dela."""
+        name = self.library.nomes[index]
+        hits, misses = self.history.get(name, (0, 0))
+        hits, misses = (hits + 1, misses) if correct else (hits, misses + 1)
+        self.history[name] = [hits, misses]
+        self._base[index] = self._static[index] * history_factor(hits, misses)
+        if index not in self._recent:
+            self.sampler.set(index, float(self._base[index]))
+
+    def save(self):
+        save_history(self.history, self.history_path)
+
+
+_scheduler = None
+
+
+def scheduler():
+    """SongScheduler da BIBLIOTECA com o histórico salvo (montado na primeira chamada)."""
+    global _scheduler
+    if _scheduler is None:
+        from Musicas import BIBLIOTECA
+        _scheduler = SongScheduler(BIBLIOTECA)
+    return _scheduler
@@ -0,0 +1,81 @@
+"""
+Avaliação de estabilidade da nota cantada.
+
+O StabilityEvaluator recebe pares (tempo, frequência) e decide se o jogador
+está segurando a classe de nota alvo (em qualquer oitava) pelo tempo exigido;
+com target_midi, só a nota naquela oitava conta (quem canta tem a música
+transposta para a sua extensão, veja transposition.py).
+Ele não sabe de onde vem o tempo: o jogo passa time.time() a cada consulta ao
+detector; run_offline() passa o tempo de áudio dos frames de uma fonte
+não-ao-vivo, então a mesma regra roda sem microfone e mais rápido que o tempo
+real.
+"""
+from collections import namedtuple
+
+from note_table import PITCH_CLASS, get_note_table, pitch_class_distance
+
+SILENCE = "silence"
+HOLDING = "holding"
+WRONG = "wrong"
+CONFIRMED = "confirmed"
+
+# state: um dos quatro acima; held: segundos segurando o alvo; info: NoteInfo
+# da frequência (None no silêncio); deviation_cents: distância até o alvo
+# (None no silêncio ou alvo desconhecido)
+StabilityStatus = namedtuple("StabilityStatus", ["state", "held", "info", "deviation_cents", "freq"])
+
+
+class StabilityEvaluator:
+    def __init__(self, target_name, required_stability=1.0, note_table=None, target_midi=None):
+        self.target_name = target_name
+        self.target_midi = target_midi
+        self.target_pc = target_midi % 12 if target_midi is not None else PITCH_CLASS.get(target_name)
+        self.required_stability = required_stability
+        self.note_table = note_table or get_note_table()
+        self.reset()
+
+    def reset(self):
+        self._stable_since = None
+        self.confirmed = False
+
+    def update(self, timestamp, freq):
+        """Registra uma leitura e retorna o StabilityStatus resultante."""
+        info = self.note_table.lookup(freq)
+        if info is None:
+            self._stable_since = None
+            return StabilityStatus(SILENCE, 0.0, None, None, freq)
+
+        deviation = None
+        if self.target_midi is not None:
+            deviation = (info.midi - self.target_midi) * 100.0 + info.cents
+            on_target = info.midi == self.target_midi
+        else:
+            if self.target_pc is not None:
+                deviation = pitch_class_distance(info.pitch_class, info.cents, self.target_pc)
+            on_target = info.pitch_class == self.target_pc
+        if not on_target:
+            self._stable_since = None
+            return StabilityStatus(WRONG, 0.0, info, deviation, freq)
+
+        if self._stable_since is None:
+            self._stable_since = timestamp
+        held = timestamp - self._stable_since
+        if held >= self.required_stability:
+            self.confirmed = True
+            return StabilityStatus(CONFIRMED, held, info, deviation, freq)
+        return StabilityStatus(HOLDING, held, info, deviation, freq)
+
+
+def run_offline(detector, target_name, required_stability=1.0, listen_duration=10.0, target_midi=None):
+    """
+    Roda o detector sobre a sua fonte (não-ao-vivo) na thread atual.
+
+    Retorna (confirmado, segundos de áudio até a confirmação ou None).
+    """
+    evaluator = StabilityEvaluator(target_name, required_stability, detector.note_table, target_midi)
+    for timestamp, freq, _, _ in detector.iter_frames():
+        if timestamp > listen_duration:
+            break
+        if evaluator.update(timestamp, freq).state == CONFIRMED:
+            return True, timestamp
+    return False, None
@@ -0,0 +1,272 @@
+"""
+Busca aproximada de nomes de música em catálogos grandes.
+
+Os nomes são normalizados uma vez só (utils.normalize_title: minúsculas,
+sem acentos, espaços normalizados) e entram num índice de trigramas de
+caracteres: o trigrama de cada posição (com marcas de início e fim) aponta
+para os nomes que o contêm. Um palpite soma os trigramas em comum por nome
+com um bincount, filtra pelo tamanho (nomes curtos ou longos demais não
+alcançam o limiar) e só os CANDIDATES mais parecidos passam pela distância de
+edição limitada, calculada para todos de uma vez com NumPy e cortada no
+máximo compatível com o limiar. Os que sobram recebem a similaridade exata de
+utils.calculate_similarity, então o resultado concorda com
+utils.is_similar_enough: similaridade >= limiar, ou palpite (com mais de 3
+letras) contido no nome.
+"""
+from bisect import bisect_left
+from collections import namedtuple
+
+import numpy as np
+
+from utils import calculate_similarity, normalize_title
+
+THRESHOLD = 0.75
+CANDIDATES = 1024
+SUGGESTIONS = 5
+# Maior que qualquer caractere: prefixo + LAST delimita o fim da faixa do prefixo
+LAST = "\U0010ffff"
+# Marcas de início e fim de nome nos trigramas (não aparecem em texto normalizado)
+START, END = "\x02", "\x03"
+
+# Resultado: posição no catálogo, nome original, similaridade com o palpite
+# normalizado e se o palpite está contido no nome
+TitleMatch = namedtuple("TitleMatch", ["index", "nome", "similaridade", "contem"])
+
+
+def _codes(text):
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+
+
+def _trigrams(codes):
+    return (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+
+
+def _padded(text):
+    return START + START + text + END
+
+
+class TitleIndex:
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self.normalized = [normalize_title(t) for t in self.titles]
+        self.lengths = np.array([len(t) for t in self.normalized], dtype=np.int64)
+        # Todos os nomes num texto só: o teste de "contido" é um find em C e os
+        # códigos dos candidatos da distância de edição saem com uma indexação
+        self._joined = "\n".join(self.normalized)
+        self._joined_codes = _codes(self._joined + "\n")
+        self._starts = np.zeros(len(self.titles) + 1, dtype=np.int64)
+        np.cumsum(self.lengths + 1, out=self._starts[1:])
+
+        padded = [_padded(t) for t in self.normalized]
+        codes = _codes("".join(padded))
+        owner = np.repeat(np.arange(len(padded), dtype=np.int64), [len(p) for p in padded])
+        grams = _trigrams(codes)
+        inside = owner[:-2] == owner[2:]
+        # Pares (trigrama, nome) distintos, ordenados por trigrama
+        n = max(len(self.titles), 1)
+        order = np.lexsort((owner[:-2][inside], grams[inside]))
+        grams, owner = grams[inside][order], owner[:-2][inside][order]
+        distinct = np.concatenate(([True], (grams[1:] != grams[:-1]) | (owner[1:] != owner[:-1])))
+        grams, self._postings = grams[distinct], owner[distinct].astype(np.int32)
+        # Cada trigrama distinto e o início da sua lista
+        first = np.concatenate(([True], grams[1:] != grams[:-1]))
+        self._gram_keys = grams[first]
+        self._gram_start = np.append(np.flatnonzero(first), len(grams))
+        # Trigramas distintos de cada nome (para o coeficiente de Dice)
+        self._gram_count = np.bincount(self._postings, minlength=n)
+        self._n = len(self.titles)
+
+    def __len__(self):
+        return self._n
+
+    def _shared_trigrams(self, query):
+        """Trigramas distintos da consulta e a contagem de trigramas em comum com cada nome."""
+        grams = np.unique(_trigrams(_codes(_padded(query))))
+        pos = np.searchsorted(self._gram_keys, grams)
+        pos = pos[(pos < len(self._gram_keys))]
+        pos = pos[np.isin(self._gram_keys[pos], grams)]
+        lists = [self._postings[self._gram_start[p]:self._gram_start[p + 1]] for p in pos.tolist()]
+        if not lists:
+            return len(grams), np.zeros(self._n, dtype=np.int64)
+        return len(grams), np.bincount(np.concatenate(lists), minlength=self._n)
+
+    def _containing(self, query):
+        """Nomes que contêm a consulta (str.find no texto único)."""
+        found = set()
+        pos = self._joined.find(query)
+        while pos >= 0:
+            k = int(np.searchsorted(self._starts, pos, side="right")) - 1
+            found.add(k)
+            # Continua depois do fim deste nome
+            pos = self._joined.find(query, int(self._starts[k + 1]))
+        return found
+
+    def edit_distances(self, query, candidates, bound):
+        """
+        Distância de Levenshtein da consulta a cada candidato, limitada: quem
+        passa de bound (array, um limite por candidato) sai do cálculo e fica
+        com bound + 1.
+        """
+        q = _codes(query)
+        lengths = self.lengths[candidates]
+        width = int(lengths.max()) if len(candidates) else 0
+        cols = np.arange(width + 1, dtype=np.int32)
+        inside = cols[None, :-1] < lengths[:, None]
+        target = np.where(inside, self._joined_codes[self._starts[candidates][:, None] + np.minimum(
+            cols[None, :-1], lengths[:, None])], -1)
+        result = bound.astype(np.int32) + 1
+        alive = np.arange(len(candidates))
+        limit = bound.astype(np.int32)
+        dist = np.broadcast_to(cols, (len(candidates), width + 1)).copy()
+        for c in q.tolist():
+            step = dist + 1
+            np.minimum(step[:, 1:], dist[:, :-1] + (target != c), out=step[:, 1:])
+            dist = np.minimum.accumulate(step - cols, axis=1) + cols
+            # O mínimo da linha nunca diminui: quem passou do limite não volta
+            keep = dist.min(axis=1) <= limit
+            if not keep.all():
+                dist, target, limit, alive = dist[keep], target[keep], limit[keep], alive[keep]
+                if not len(alive):
+                    return result
+        result[alive] = dist[np.arange(len(alive)), lengths[alive]]
+        return result
+
+    def search(self, guess, k=5, threshold=THRESHOLD):
+        """
+        Até k TitleMatch aceitos pelo critério de utils.is_similar_enough, do
+        mais parecido para o menos.
+        """
+        query = normalize_title(guess)
+        if not query or not self._n:
+            return []
+        n_grams, shared = self._shared_trigrams(query)
+        a, b = len(query), self.lengths
+        # 2 * min / (a + b) é o teto da similaridade para esses tamanhos
+        reachable = 2 * np.minimum(a, b) >= threshold * (a + b)
+        candidates = np.flatnonzero(reachable & (shared > 0))
+        if len(candidates) > CANDIDATES:
+            dice = shared[candidates] / (n_grams + self._gram_count[candidates])
+            candidates = candidates[np.argpartition(dice, -CANDIDATES)[-CANDIDATES:]]
+
+        # Similaridade >= limiar exige distância de edição <= (1 - limiar) * (a + b)
+        upper = {}
+        if len(candidates):
+            lengths = self.lengths[candidates]
+            bound = np.floor((1 - threshold) * (a + lengths) + 1e-9)
+            dist = self.edit_distances(query, candidates, bound)
+            close = dist <= bound
+            # Teto da similaridade pela distância: 1 - dist / (a + b)
+            upper = dict(zip(candidates[close].tolist(), (1 - dist[close] / (a + lengths[close])).tolist()))
+        contained = self._containing(query) if len(query) > 3 else set()
+        for idx in contained:
+            upper.setdefault(idx, 2 * a / (a + int(self.lengths[idx])))
+
+        # Similaridade exata em ordem decrescente do teto, até o k-ésimo
+        # melhor ficar acima do teto dos que faltam
+        matches = []
+        for idx, ceiling in sorted(upper.items(), key=lambda item: -item[1]):
+            if len(matches) >= k and ceiling < matches[k - 1].similaridade:
+                break
+            similarity = calculate_similarity(query, self.normalized[idx])
+            if similarity >= threshold or idx in contained:
+                matches.append(TitleMatch(idx, self.titles[idx], similarity, idx in contained))
+                matches.sort(key=lambda m: (-m.similaridade, m.index))
+        return matches[:k]
+
+
+def normalize_prefix(text):
+    """Como normalize_title, mas um espaço no fim conta ("asa " não casa com "asas")."""
+    normalized = normalize_title(text)
+    if normalized and text[-1:].isspace():
+        normalized += " "
+    return normalized
+
+
+class TitleCompleter:
+    """
+    Sugestões enquanto se digita, sobre índices ordenados dos nomes
+    normalizados: um com os nomes inteiros e outro com o resto do nome a
+    partir de cada palavra seguinte ("branca" acha "Asa Branca"). Um prefixo
+    é uma faixa contígua de cada índice; cada tecla a mais estreita a faixa
+    anterior com uma busca binária dentro dela, e apagar volta para a faixa
+    guardada do prefixo mais curto, sem varrer o catálogo.
+    """
+
+    def __init__(self, titles, limit=SUGGESTIONS):
+        self.titles = list(titles)
+        self.limit = limit
+        full, words = [], []
+        for k, title in enumerate(self.titles):
+            normalized = normalize_title(title)
+            full.append((normalized, k))
+            pos = normalized.find(" ")
+            while pos >= 0:
+                words.append((normalized[pos + 1:], k))
+                pos = normalized.find(" ", pos + 1)
+        full.sort()
+        words.sort()
+        # Chaves e donos em listas separadas: bisect compara só as strings
+        self._indexes = [([key for key, _ in full], [k for _, k in full]),
+                         ([key for key, _ in words], [k for _, k in words])]
+        self.reset()
+
+    def reset(self):
+        """Volta para o texto vazio (nenhuma sugestão)."""
+        everything = [(0, len(keys)) for keys, _ in self._indexes]
+        # Pilha de (prefixo, faixa em cada índice), do mais curto ao atual
+        self._stack = [("", everything)]
+        self.suggestions = []
+
+    def _narrow(self, prefix, ranges):
+        narrowed = []
+        for (keys, _), (lo, hi) in zip(self._indexes, ranges):
+            start = bisect_left(keys, prefix, lo, hi)
+            narrowed.append((start, bisect_left(keys, prefix + LAST, start, hi)))
+        return narrowed
+
+    def update(self, text):
+        """Sugestões [(índice, nome)] para o texto digitado até agora."""
+        prefix = normalize_prefix(text)
+        if prefix == self._stack[-1][0]:
+            return self.suggestions
+        # Apagou (ou trocou) letras: volta ao maior prefixo guardado que ainda vale
+        while len(self._stack) > 1 and not prefix.startswith(self._stack[-1][0]):
+            self._stack.pop()
+        if prefix != self._stack[-1][0]:
+            self._stack.append((prefix, self._narrow(prefix, self._stack[-1][1])))
+        self.suggestions = self._collect() if prefix else []
+        return self.suggestions
+
+    def _collect(self):
+        """Primeiro os nomes que começam com o prefixo, depois os que têm uma palavra começando com ele."""
+        seen, suggestions = set(), []
+        for (_, owners), (lo, hi) in zip(self._indexes, self._stack[-1][1]):
+            for k in owners[lo:hi]:
+                if k not in seen:
+                    seen.add(k)
+                    suggestions.append((k, self.titles[k]))
+                    if len(suggestions) == self.limit:
+                        return suggestions
+        return suggestions
+
+
+_index = None
+_completer = None
+
+
+def completer():
+    """TitleCompleter sobre os nomes da BIBLIOTECA (montado na primeira chamada)."""
+    global _completer
+    if _completer is None:
+        from Musicas import BIBLIOTECA
+        _completer = TitleCompleter(BIBLIOTECA.nomes)
+    return _completer
+
+
+def search(guess, k=5, threshold=THRESHOLD):
+    """Busca nos nomes da BIBLIOTECA (o índice é montado na primeira chamada)."""
+    global _index
+    if _index is None:
+        from Musicas import BIBLIOTECA
+        _index = TitleIndex(BIBLIOTECA.nomes)
+    return _index.search(guess, k, threshold)
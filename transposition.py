@@ -0,0 +1,174 @@
+"""
+Extensão vocal de quem canta e transposição das músicas para ela.
+
+Cada cantor tem um perfil (SingerProfile) com a nota mais grave e a mais
+aguda que canta com conforto, escolhido entre os tipos de voz de VOICE_TYPES
+e salvo em PROFILE_PATH. Cada música é transposta para a extensão do cantor
+em passos de STEP semitons (oitavas inteiras, padrão: os nomes das notas que
+o jogo pede continuam os mesmos), escolhendo o deslocamento que deixa menos
+notas fora da extensão e, no empate, a melodia mais perto do meio dela.
+
+O TranspositionCache guarda, por (música, deslocamento, afinação), as notas
+transpostas, as frequências e os buffers já sintetizados de cada nota (um
+por nota e duração distintas, sintetizado na primeira vez que toca). Cantores
+com o mesmo deslocamento para uma música dividem a entrada, e trocar de
+cantor não ressintetiza nada: só as músicas que forem tocadas depois montam
+a sua entrada. As entradas menos usadas saem quando passam de MAX_SONGS;
+os deslocamentos já calculados seguem a mesma regra, com espaço para um
+perfil de cada tipo de voz por música guardada.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from Musicas import A4_REFERENCIA, _FREQS_MIDI
+from note_table import MIDI_RANGE, NOTE_NAMES
+
+PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".solfejo", "cantor.json")
+STEP = 12
+MAX_SONGS = 16
+
+# Nota mais grave e mais aguda (MIDI) de uma extensão confortável típica
+VOICE_TYPES = {
+    "baixo": (40, 62),          # E2..D4
+    "barítono": (43, 65),       # G2..F4
+    "tenor": (48, 69),          # C3..A4
+    "contralto": (53, 74),      # F3..D5
+    "mezzo-soprano": (57, 77),  # A3..F5
+    "soprano": (60, 81),        # C4..A5
+}
+
+SingerProfile = namedtuple("SingerProfile", ["nome", "grave", "agudo"])
+
+
+def voice_profile(voice):
+    grave, agudo = VOICE_TYPES[voice]
+    return SingerProfile(voice, grave, agudo)
+
+
+def describe(profile):
+    if profile is None:
+        return "Original"
+    return f"{profile.nome} ({NOTE_NAMES[profile.grave]}-{NOTE_NAMES[profile.agudo]})"
+
+
+def load_singer(path=None):
+    """Perfil salvo, ou None (músicas na oitava original) se não existir."""
+    try:
+        with open(path or PROFILE_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+        return SingerProfile(data["nome"], int(data["grave"]), int(data["agudo"]))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_singer(profile, path=None):
+    """Grava o perfil (None apaga: volta para a oitava original)."""
+    path = path or PROFILE_PATH
+    if profile is None:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile._asdict(), f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def best_shift(midi, profile, step=STEP):
+    """Deslocamento (semitons, múltiplo de step) que põe a melodia na extensão do perfil."""
+    midi = np.asarray(midi, dtype=np.int16)
+    if profile is None or not len(midi):
+        return 0
+    low, high = int(midi.min()), int(midi.max())
+    center = (profile.grave + profile.agudo) / 2 - (low + high) / 2
+    best = None
+    for shift in range(-(low // step) * step, MIDI_RANGE - high, step):
+        outside = int(np.count_nonzero((midi + shift < profile.grave) | (midi + shift > profile.agudo)))
+        key = (outside, abs(shift - center), abs(shift))
+        if best is None or key < best[0]:
+            best = (key, shift)
+    return best[1]
+
+
+class Transposed:
+    """Uma música num deslocamento e afinação: notas, frequências e buffers já sintetizados."""
+    __slots__ = ("song", "shift", "midi", "freqs", "duracoes", "buffers")
+
+    def __init__(self, song, shift, midi, freqs, duracoes):
+        self.song = song
+        self.shift = shift
+        self.midi = midi
+        self.freqs = freqs
+        self.duracoes = duracoes
+        # (nota MIDI, duração) -> buffer
+        self.buffers = {}
+
+    def names(self):
+        """Nomes com oitava ("D3") das notas transpostas."""
+        return [NOTE_NAMES[m] for m in self.midi.tolist()]
+
+
+class TranspositionCache:
+    def __init__(self, synth, max_songs=MAX_SONGS):
+        """synth(freq, duração) -> buffer de áudio (ex.: game.synth_piano_note)."""
+        self.synth = synth
+        self.max_songs = max_songs
+        self._entries = OrderedDict()
+        self._shifts = OrderedDict()
+        self.max_shifts = max_songs * len(VOICE_TYPES)
+        # play_note roda em threads: o lock protege os dicionários e a síntese
+        # fica fora dele (duas threads na mesma nota só repetem o trabalho)
+        self._lock = threading.Lock()
+        self.synthesized = 0
+
+    def shift(self, song, musica, profile):
+        """Deslocamento da música para o perfil (calculado uma vez por par)."""
+        key = (song, profile)
+        with self._lock:
+            shift = self._shifts.get(key)
+            if shift is not None:
+                self._shifts.move_to_end(key)
+                return shift
+        shift = best_shift(musica.midi, profile)
+        with self._lock:
+            self._shifts[key] = shift
+            self._shifts.move_to_end(key)
+            while len(self._shifts) > self.max_shifts:
+                self._shifts.popitem(last=False)
+        return shift
+
+    def prepare(self, song, musica, profile, a4=A4_REFERENCIA):
+        """Transposed da música (índice song na biblioteca) para o perfil; reaproveitado se já existir."""
+        shift = self.shift(song, musica, profile)
+        key = (song, shift, a4)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        midi = np.clip(musica.midi.astype(np.int16) + shift, 0, MIDI_RANGE - 1)
+        freqs = musica.freqs if shift == 0 else _FREQS_MIDI[midi]
+        if a4 != A4_REFERENCIA:
+            freqs = (freqs * (a4 / A4_REFERENCIA)).astype(np.float32)
+        entry = Transposed(song, shift, midi, freqs, musica.duracoes)
+        with self._lock:
+            entry = self._entries.setdefault(key, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_songs:
+                self._entries.popitem(last=False)
+        return entry
+
+    def buffer(self, entry, k):
+        """Buffer sintetizado da k-ésima nota de entry (sintetiza só na primeira vez)."""
+        key = (int(entry.midi[k]), float(entry.duracoes[k]))
+        buf = entry.buffers.get(key)
+        if buf is None:
+            buf = self.synth(float(entry.freqs[k]), key[1])
+            entry.buffers[key] = buf
+            self.synthesized += 1
+        return buf
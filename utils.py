@@ -1,5 +1,15 @@
+import unicodedata
 from difflib import SequenceMatcher
 
+def normalize_title(text):
+    """
+    Forma usada para comparar nomes de música: minúsculas, sem acentos
+    ("Parabéns" -> "parabens") e com os espaços normalizados.
+    """
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return ' '.join(folded.split())
+
 def calculate_similarity(text1, text2):
     """
     Calcula a similaridade entre duas strings (0.0 a 1.0).
@@ -19,8 +29,8 @@ def is_similar_enough(guess, target, threshold=0.75):
     Returns:
         True se for similar o suficiente, False caso contrário
     """
-    guess_normalized = ' '.join(guess.lower().split())
-    target_normalized = ' '.join(target.lower().split())
+    guess_normalized = normalize_title(guess)
+    target_normalized = normalize_title(target)
 
     similarity = calculate_similarity(guess_normalized, target_normalized)
 
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class VoiceActivityGate:
+    """
+    Porteiro barato de atividade de voz, calculado sobre o bloco bruto.
+
+    Um bloco só é considerado voz se a energia (RMS) estiver claramente acima
+    do piso de ruído estimado e se o espectro não for plano (voz cantada é
+    tonal; chiado e ventilador têm flatness alta). O piso de ruído se adapta
+    sozinho: desce imediatamente quando aparece um bloco mais baixo e sobe
+    devagar durante os blocos classificados como silêncio.
+    """
+
+    def __init__(self, snr=2.0, min_rms=1e-3, max_flatness=0.3, hangover=2,
+                 floor_alpha=0.1, flatness_size=2048):
+        self.snr = snr                      # razão RMS / piso para contar como voz (2.0 ≈ 6 dB)
+        self.min_rms = min_rms              # nada abaixo disso é voz (≈ -60 dBFS)
+        self.max_flatness = max_flatness    # ruído branco fica em torno de 0.56
+        self.hangover = hangover            # blocos extras após o fim da voz
+        self.floor_alpha = floor_alpha      # velocidade de subida do piso de ruído
+        self.flatness_size = flatness_size  # amostras usadas na FFT da flatness
+        self.reset()
+
+    def reset(self):
+        self.noise_floor = self.min_rms
+        self.last_rms = 0.0
+        self.last_flatness = 1.0
+        self._hold = 0
+
+    def _flatness(self, samples):
+        seg = samples[-self.flatness_size:]
+        power = np.abs(np.fft.rfft(seg)) ** 2 + 1e-12
+        return float(np.exp(np.mean(np.log(power))) / np.mean(power))
+
+    def __call__(self, samples):
+        """Retorna True se o bloco (ou o hangover da voz anterior) deve ser analisado."""
+        rms = float(np.sqrt(np.dot(samples, samples) / max(1, len(samples))))
+        self.last_rms = rms
+
+        voiced = False
+        if rms > self.min_rms and rms > self.noise_floor * self.snr:
+            # A FFT só é calculada quando a energia já passou no primeiro teste
+            self.last_flatness = self._flatness(samples)
+            voiced = self.last_flatness < self.max_flatness
+        else:
+            self.last_flatness = 1.0
+
+        if rms < self.noise_floor:
+            self.noise_floor = max(rms, self.min_rms * 0.1)
+        elif not voiced:
+            self.noise_floor += self.floor_alpha * (rms - self.noise_floor)
+
+        if voiced:
+            self._hold = self.hangover
+            return True
+        if self._hold > 0:
+            self._hold -= 1
+            return True
+        return False